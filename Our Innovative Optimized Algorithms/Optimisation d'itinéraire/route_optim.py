@@ -83,10 +83,13 @@ def optimize_route(commandes, external_conditions):
 
 ##########################################
 # MODULE 3 : Algorithme de 3D Bin Packing (déjà présenté)
-def pack_orders(commandes, truck_length, truck_width, truck_height):
-    current_x, current_y, current_z = 0, 0, 0
-    current_row_max_width = 0  # Pour avancer en y (largeur)
-    current_layer_max_height = 0  # Pour avancer en z (hauteur)
+def pack_orders(commandes, truck_length, truck_width, truck_height, cursor=None):
+    # cursor : état du chargement après un produit déjà placé (voir repack_orders)
+    if cursor is None:
+        cursor = (0, 0, 0, 0, 0)
+    current_x, current_y, current_z = cursor[:3]
+    current_row_max_width = cursor[3]  # Pour avancer en y (largeur)
+    current_layer_max_height = cursor[4]  # Pour avancer en z (hauteur)
 
     for cmd in commandes:
         # Si le produit dépasse la longueur restante, recommencer sur une nouvelle rangée (axe y)
@@ -111,10 +114,37 @@ def pack_orders(commandes, truck_length, truck_width, truck_height):
         current_x += cmd.length
         current_row_max_width = max(current_row_max_width, cmd.width)
         current_layer_max_height = max(current_layer_max_height, cmd.height)
+        # État après ce produit : le chargement peut reprendre à partir d'ici
+        cmd.pack_cursor = (
+            current_x,
+            current_y,
+            current_z,
+            current_row_max_width,
+            current_layer_max_height,
+        )
 
     return commandes
 
 
+def repack_orders(previous_orders, new_orders, truck_length, truck_width, truck_height):
+    """
+    Recharge new_orders à partir du chargement de previous_orders.
+
+    Le chargement étant séquentiel, les commandes du plus long préfixe commun aux
+    deux ordres gardent leur position ; seules les suivantes sont replacées, en
+    reprenant le curseur de la dernière commande inchangée.
+    """
+    common = 0
+    for old, new in zip(previous_orders, new_orders):
+        if old is not new or not hasattr(old, "pack_cursor"):
+            break
+        common += 1
+
+    cursor = new_orders[common - 1].pack_cursor if common else None
+    pack_orders(new_orders[common:], truck_length, truck_width, truck_height, cursor)
+    return new_orders
+
+
 ##########################################
 # MODULE 4 : Visualisation 3D avec Plotly
 def create_box_mesh(x, y, z, l, w, h, color, name=""):
@@ -246,14 +276,15 @@ def dynamic_route_optimization(
         # Si le nouvel ordre diffère (par exemple, si un segment présente désormais un accident ou trafic intense)
         if [c.id for c in new_route] != [c.id for c in current_route]:
             print("Mise à jour de l'itinéraire détectée.")
-            current_route = new_route
-            # Réappliquer le 3D bin packing pour respecter le nouvel ordre de livraison
-            packed_orders = pack_orders(
+            # Réappliquer le 3D bin packing à partir de la première commande déplacée
+            packed_orders = repack_orders(
                 current_route,
+                new_route,
                 truck_params["length"],
                 truck_params["width"],
                 truck_params["height"],
             )
+            current_route = new_route
             # Visualiser la nouvelle configuration
             visualiser_truck(
                 packed_orders,
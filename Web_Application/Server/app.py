@@ -12,6 +12,8 @@ from math import radians, cos, sin, asin, sqrt
 from datetime import datetime, timedelta
 import sys
 from app.services.loading_optimizer.optimizer import InitialGroupingOptimizer, TruckLoadingOptimizer
+from app.services.loading_optimizer.registry import get_constraint_registry
+from app.services.loading_optimizer.plan_cache import PlanCache
 from app.models import Camion, CamionType, Palette, init_db, Session, User, Command, Product
 from werkzeug.middleware.proxy_fix import ProxyFix
 
@@ -37,12 +39,8 @@ DEFAULT_PALETTE_DIMENSION = 1.0  # dimensions par défaut (height, width, length
 THRESHOLD_DISTANCE = 10  # Threshold distance (in kilometers) to group orders and to check supplier proximity
 WAREHOUSE_COORD = "48.8566,2.3522"  # example coordinate (Paris center)
 
-# Load the JSON file with product types and their constraints
-PRODUCTS_JSON_PATH = os.path.join(parent_dir, "Web_Application/Server/products.json")
-with open(PRODUCTS_JSON_PATH, "r") as f:
-    products_data = json.load(f)
-# Build a lookup dictionary for product type info
-product_types_info = {pt["type"]: pt for pt in products_data.get("product_types", [])}
+# Product types and their constraints: shared registry (parsed once, reloaded when the file changes)
+product_constraints = get_constraint_registry()
 
 
 #######################################" CHARGEMENT"#################################################
@@ -51,6 +49,8 @@ app.wsgi_app = ProxyFix(app.wsgi_app)
 # Initialisation des optimiseurs
 initial_optimizer = InitialGroupingOptimizer('products.json')
 truck_optimizer = None  # sera initialisé avec les camions disponibles
+# Cache persistant des plans de chargement, partagé entre les requêtes
+plan_cache = PlanCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plan_cache.db'))
 
 @app.route('/')
 def index():
@@ -61,32 +61,41 @@ def optimize_loading():
     try:
         data = request.json
         print("DATA",data)
+        # Budget de temps optionnel (ms) pour toute la requête
+        time_budget_ms = data.get('time_budget_ms')
         commands = _parse_commands(data['commands'])
         print(commands)
         trucks = _parse_trucks(data['trucks'])
         print("2")
         global truck_optimizer
-        truck_optimizer = TruckLoadingOptimizer(trucks,"products.json")
+        truck_optimizer = TruckLoadingOptimizer(trucks,"products.json", plan_cache)
         
-        # Étape 1: Groupement initial
-        command_groups = initial_optimizer.optimize_grouping(commands)
-        
-        # Étape 2: Attribution des camions
+        # Groupement (date, itinéraire), attribution des camions et chargement en un seul appel,
+        # sous une même échéance
         trucks_available = [truck for truck in trucks if truck.state]
-        print ("here1")
-        truck_assignments = truck_optimizer._optimize_truck_assignment(command_groups,trucks_available)
-        print ("here2")
+        loading_plans = truck_optimizer.optimize_loading(
+            commands,
+            trucks_available,
+            time_budget_ms=time_budget_ms
+        )
+        # Camions écartés par le préfiltre, avec leur motif
+        rejected_trucks = truck_optimizer.truck_rejections
+        # Palettes qu'aucun camion disponible ne peut prendre
+        unassigned_palettes = [palette.id for palette in truck_optimizer.unassigned_palettes]
 
-        # Étape 3: Optimisation du chargement
         loading_suggestions = {}
-        for truck_id, assigned_commands in truck_assignments.items():
-            loading_plan = truck_optimizer.optimize_loading(assigned_commands)
-            if loading_plan:
-                loading_suggestions[truck_id] = _format_loading_plan(loading_plan)
+        not_fully_optimized = []
+        for truck_id, loading_plan in loading_plans.items():
+            loading_suggestions[truck_id] = _format_loading_plan(loading_plan)
+            if not loading_plan.fully_optimized:
+                not_fully_optimized.append(truck_id)
         
         return jsonify({
             'success': True,
-            'loading_plans': loading_suggestions
+            'loading_plans': loading_suggestions,
+            'not_fully_optimized': not_fully_optimized,
+            'rejected_trucks': rejected_trucks,
+            'unassigned_palettes': unassigned_palettes
         })
         
     except Exception as e:
@@ -116,6 +125,13 @@ def get_loading_preview(truck_id):
             'error': str(e)
         }), 400
 
+@app.route('/api/plan-cache/stats', methods=['GET'])
+def get_plan_cache_stats():
+    return jsonify({
+        'success': True,
+        'stats': plan_cache.stats()
+    })
+
 from datetime import datetime
 
 def _parse_commands(commands_data):
@@ -201,7 +217,8 @@ def _format_loading_plan(loading_plan):
         'metrics': {
             'weight_distribution_score': loading_plan.weight_distribution_score,
             'space_utilization': loading_plan.space_utilization,
-            'estimated_cost': loading_plan.estimated_cost
+            'estimated_cost': loading_plan.estimated_cost,
+            'fully_optimized': loading_plan.fully_optimized
         }
     }
 
@@ -0,0 +1,259 @@
+"""
+Banc d'essai reproductible de l'optimiseur de chargement.
+
+Génère des chargements synthétiques à partir d'une graine (mélanges de palettes
+EUR/US, types de produits tirés de products.json, proportions de produits
+fragiles et non rotatifs) et mesure pour chaque camion : temps de calcul,
+placements par seconde, pic mémoire, taux d'utilisation de l'espace et score
+de répartition du poids. Tout tourne en mémoire, sans base de données.
+
+    python app/scripts/benchmark_loading.py --seeds 5 --output bench.json
+    python app/scripts/benchmark_loading.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from statistics import mean
+from typing import Dict, List, Optional
+
+# Dossier Server dans le chemin Python (imports 'app.')
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+
+from app.models import Camion, CamionType, PaletteType
+from app.services.loading_optimizer.models import LoadingOptions
+from app.services.loading_optimizer.optimizer import TruckLoadingOptimizer
+from app.services.loading_optimizer.registry import DEFAULT_PRODUCTS_PATH, get_constraint_registry
+
+# Emprises au sol (m) des palettes standard
+FOOTPRINTS = {
+    PaletteType.EUROPEAN: (1.2, 0.8),
+    PaletteType.AMERICAN: (1.2, 1.0),
+}
+
+
+@dataclass
+class Scenario:
+    """Paramètres d'un chargement synthétique."""
+    name: str
+    truck_type: CamionType
+    palettes: int
+    eur_ratio: float = 1.0  # Part de palettes EUR (le reste en US)
+    fragile_ratio: float = 0.0  # Part de produits fragiles
+    non_rotatable_ratio: float = 0.0  # Part de produits non rotatifs (non fragiles)
+    heights: tuple = (1.2,)  # Hauteurs possibles des palettes (m)
+    min_weight: float = 150.0
+    max_weight: float = 900.0
+    destinations: int = 3
+
+
+SCENARIOS = [
+    Scenario('eur_floor_semi', CamionType.SEMI_STANDARD, 33),
+    Scenario('mixed_semi', CamionType.SEMI_STANDARD, 28, eur_ratio=0.6, fragile_ratio=0.2,
+             non_rotatable_ratio=0.1, heights=(1.0, 1.2, 1.4)),
+    Scenario('stacked_mega', CamionType.MEGA, 50, eur_ratio=0.8, fragile_ratio=0.1,
+             heights=(0.8, 1.0, 1.2, 1.4)),
+    Scenario('porteur_moyen', CamionType.PORTEUR_MOYEN, 14, eur_ratio=0.7, fragile_ratio=0.3,
+             non_rotatable_ratio=0.2, heights=(1.0, 1.5)),
+]
+
+
+@dataclass
+class SyntheticProduct:
+    type: str
+
+
+@dataclass
+class SyntheticCommand:
+    destination: str
+
+
+@dataclass
+class SyntheticPalette:
+    """Palette en mémoire exposant les attributs lus par l'optimiseur."""
+    id: int
+    palette_type: PaletteType
+    weight: float
+    length: float
+    width: float
+    height: float
+    product: SyntheticProduct
+    command: SyntheticCommand
+
+    @property
+    def volume(self) -> float:
+        return self.length * self.width * self.height
+
+
+def generate_palettes(scenario: Scenario, seed: int, products_path: str = DEFAULT_PRODUCTS_PATH) -> List[SyntheticPalette]:
+    """Palettes d'un scénario ; la même graine donne toujours le même chargement."""
+    rng = random.Random(seed)
+    constraints = get_constraint_registry(products_path).constraints
+    fragile = [name for name, c in constraints.items() if c.fragility]
+    non_rotatable = [name for name, c in constraints.items() if not c.fragility and not c.rotatable]
+    regular = [name for name, c in constraints.items() if not c.fragility and c.rotatable]
+
+    palettes = []
+    for i in range(scenario.palettes):
+        draw = rng.random()
+        if draw < scenario.fragile_ratio and fragile:
+            product_type = rng.choice(fragile)
+        elif draw < scenario.fragile_ratio + scenario.non_rotatable_ratio and non_rotatable:
+            product_type = rng.choice(non_rotatable)
+        else:
+            product_type = rng.choice(regular)
+
+        palette_type = PaletteType.EUROPEAN if rng.random() < scenario.eur_ratio else PaletteType.AMERICAN
+        length, width = FOOTPRINTS[palette_type]
+        palettes.append(SyntheticPalette(
+            id=i + 1,
+            palette_type=palette_type,
+            weight=round(rng.uniform(scenario.min_weight, scenario.max_weight), 1),
+            length=length,
+            width=width,
+            height=rng.choice(scenario.heights),
+            product=SyntheticProduct(product_type),
+            command=SyntheticCommand(f"DEST-{rng.randrange(scenario.destinations)}")
+        ))
+    return palettes
+
+
+def make_truck(truck_type: CamionType, truck_id: int = 1) -> Camion:
+    """Camion non persisté (aucune session)."""
+    truck = Camion(
+        type_camion=truck_type,
+        mark="Benchmark",
+        immatriculation=f"BENCH-{truck_id}",
+        state=True,
+        transport_cost=1000.0
+    )
+    truck.id = truck_id
+    return truck
+
+
+def run_case(optimizer: TruckLoadingOptimizer, scenario: Scenario, seed: int,
+             options: LoadingOptions, measure_memory: bool = True) -> Dict:
+    """Un chargement : une passe chronométrée, puis une passe sous tracemalloc pour le pic mémoire."""
+    palettes = generate_palettes(scenario, seed)
+    truck = make_truck(scenario.truck_type)
+
+    started = time.perf_counter()
+    plan = optimizer._optimize_loading_arrangement(palettes, truck, options)
+    wall_time = time.perf_counter() - started
+
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        optimizer._optimize_loading_arrangement(palettes, truck, options)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    placed = len(plan.loaded_palettes) if plan else 0
+    return {
+        'scenario': scenario.name,
+        'seed': seed,
+        'palettes': len(palettes),
+        'loaded': plan is not None,
+        'wall_time_s': wall_time,
+        'placements_per_s': placed / wall_time if wall_time > 0 else None,
+        'peak_memory_bytes': peak_memory,
+        'space_utilization': plan.space_utilization if plan else None,
+        'weight_distribution_score': plan.weight_distribution_score if plan else None,
+    }
+
+
+def summarize(results: List[Dict]) -> Dict[str, Dict]:
+    """Moyennes par scénario (les métriques de qualité sur les chargements réussis)."""
+    summary = {}
+    for name in dict.fromkeys(r['scenario'] for r in results):
+        runs = [r for r in results if r['scenario'] == name]
+        loaded = [r for r in runs if r['loaded']]
+        summary[name] = {
+            'runs': len(runs),
+            'loaded_ratio': len(loaded) / len(runs),
+            'mean_wall_time_s': mean(r['wall_time_s'] for r in runs),
+            'mean_placements_per_s': mean(r['placements_per_s'] for r in loaded) if loaded else None,
+            'max_peak_memory_bytes': max((r['peak_memory_bytes'] or 0) for r in runs) or None,
+            'mean_space_utilization': mean(r['space_utilization'] for r in loaded) if loaded else None,
+            'mean_weight_distribution_score': mean(r['weight_distribution_score'] for r in loaded) if loaded else None,
+        }
+    return summary
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict]):
+    """Affiche les écarts relatifs des moyennes par rapport à un résultat précédent."""
+    for name, metrics in current.items():
+        if name not in baseline:
+            continue
+        print(f"\n{name}")
+        for metric, value in metrics.items():
+            previous = baseline[name].get(metric)
+            if isinstance(value, (int, float)) and isinstance(previous, (int, float)) and previous:
+                print(f"  {metric:<32} {previous:>14.6g} -> {value:<14.6g} ({(value - previous) / previous:+.1%})")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'optimiseur de chargement")
+    parser.add_argument('--seeds', type=int, default=3, help="Nombre de graines par scénario")
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help="Scénario à exécuter (tous par défaut, option répétable)")
+    parser.add_argument('--output', help="Fichier JSON des résultats (sortie standard par défaut)")
+    parser.add_argument('--compare', help="Résultats JSON précédents à comparer")
+    parser.add_argument('--space-mode', default='voxel')
+    parser.add_argument('--candidate-mode', default='extreme_points')
+    parser.add_argument('--starts', type=int, default=1)
+    parser.add_argument('--no-floor-patterns', action='store_true')
+    parser.add_argument('--no-memory', action='store_true', help="Ne pas mesurer le pic mémoire")
+    args = parser.parse_args(argv)
+
+    options = LoadingOptions(
+        space_mode=args.space_mode,
+        candidate_mode=args.candidate_mode,
+        starts=args.starts,
+        max_workers=1,
+        use_floor_patterns=not args.no_floor_patterns
+    )
+    optimizer = TruckLoadingOptimizer(None, DEFAULT_PRODUCTS_PATH)
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+
+    results = [
+        run_case(optimizer, scenario, seed, options, not args.no_memory)
+        for scenario in scenarios
+        for seed in range(args.seeds)
+    ]
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'seeds': args.seeds,
+            'options': asdict(options),
+        },
+        'scenarios': {s.name: {**asdict(s), 'truck_type': s.truck_type.value} for s in scenarios},
+        'results': results,
+        'summary': summarize(results),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats écrits dans {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report['summary'], json.load(f)['summary'])
+
+
+if __name__ == "__main__":
+    main()
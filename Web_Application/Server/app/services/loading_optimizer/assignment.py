@@ -0,0 +1,134 @@
+# services/loading_optimizer/assignment.py
+from math import ceil, floor, gcd
+from typing import Dict, List, Optional, Sequence, Tuple
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # Solveur optionnel : l'affectation gloutonne reste disponible sans lui
+    cp_model = None
+
+# Coûts exprimés en centimes dans le modèle (coefficients entiers)
+COST_SCALE = 100
+
+
+def _palette_kind(palette: 'Palette') -> str:
+    return getattr(palette.palette_type, 'value', palette.palette_type)
+
+
+def solver_available() -> bool:
+    """Vrai si OR-Tools (CP-SAT) est installé."""
+    return cp_model is not None
+
+
+def assignment_cost(assignments: Dict[int, List['Palette']], trucks: Sequence['Camion'],
+                    palette_count: int) -> Tuple[int, float]:
+    """(palettes non affectées, coût de transport) d'une affectation, pour comparer deux solutions."""
+    costs = {truck.id: truck.transport_cost or 0.0 for truck in trucks}
+    assigned = sum(len(palettes) for palettes in assignments.values())
+    return palette_count - assigned, sum(costs[truck_id] for truck_id in assignments)
+
+
+def solve_truck_assignment(
+    groups: List[List['Palette']],
+    suitable: List[List['Camion']],
+    conflicts: List[Tuple[int, int]],
+    time_limit: float,
+    hint: Optional[Dict[int, List['Palette']]] = None
+) -> Optional[Tuple[Dict[int, List['Palette']], bool]]:
+    """
+    Affectation exacte des palettes aux camions (CP-SAT).
+
+    Chaque palette va dans un camion adapté à son groupe (voir le préfiltre) ou
+    reste non affectée, avec une pénalité supérieure au coût de toute la flotte.
+    Par camion utilisé : poids <= charge utile, volume <= volume utile, et
+    nombre de palettes <= capacite_palettes par couche empilable (parts de
+    plancher exactes entre EUR et US). Deux groupes en conflit (types
+    incompatibles ou températures disjointes) ne partagent pas un camion.
+    L'objectif minimise les palettes non affectées, puis le coût de transport
+    des camions utilisés, puis leur nombre.
+
+    Retourne (affectation camion -> palettes, optimalité prouvée), ou None si
+    aucune solution n'a été trouvée dans le temps imparti. Nécessite OR-Tools
+    (voir solver_available).
+    """
+    trucks = {truck.id: truck for group_trucks in suitable for truck in group_trucks}
+    if not trucks:
+        return None
+    specs = {truck_id: truck.specifications for truck_id, truck in trucks.items()}
+    palettes = [(g, palette) for g, group in enumerate(groups) for palette in group]
+    min_height = min(palette.height for _, palette in palettes)
+
+    model = cp_model.CpModel()
+    used = {truck_id: model.NewBoolVar(f"used_{truck_id}") for truck_id in trucks}
+    group_uses = {}
+    placed = {}  # (indice palette, camion) -> variable
+    # Mêmes variables indexées par palette et par camion (sans reparcourir `placed`)
+    by_palette: List[List] = [[] for _ in palettes]
+    by_truck: Dict[int, List[Tuple['Palette', object]]] = {truck_id: [] for truck_id in trucks}
+    for i, (g, palette) in enumerate(palettes):
+        for truck in suitable[g]:
+            var = placed[i, truck.id] = model.NewBoolVar(f"x_{i}_{truck.id}")
+            by_palette[i].append(var)
+            by_truck[truck.id].append((palette, var))
+            if (g, truck.id) not in group_uses:
+                group_uses[g, truck.id] = model.NewBoolVar(f"z_{g}_{truck.id}")
+                model.AddImplication(group_uses[g, truck.id], used[truck.id])
+            model.AddImplication(var, group_uses[g, truck.id])
+
+    unplaced = []
+    for i, options in enumerate(by_palette):
+        missing = model.NewBoolVar(f"unplaced_{i}")
+        model.AddExactlyOne(options + [missing])
+        unplaced.append(missing)
+
+    for truck_id, truck in trucks.items():
+        spec = specs[truck_id]
+        items = by_truck[truck_id]
+
+        model.Add(sum(ceil(p.weight) * var for p, var in items) <= floor(spec['charge_utile']) * used[truck_id])
+        if spec['volume'] is not None:
+            model.Add(sum(ceil(p.volume * 1000) * var for p, var in items)
+                      <= floor(spec['volume'] * 1000) * used[truck_id])
+
+        # Parts de plancher : une palette de type k occupe 1 / capacite_palettes(k)
+        kinds = {_palette_kind(p) for p, _ in items}
+        capacities = {kind: truck.capacite_palettes(kind) for kind in kinds}
+        if items and all(capacities.values()) and spec['hauteur'] is not None:
+            scale = 1
+            for capacity in capacities.values():
+                scale = scale * capacity // gcd(scale, capacity)
+            levels = max(1, floor(spec['hauteur'] / min_height))
+            model.Add(sum(scale // capacities[_palette_kind(p)] * var for p, var in items)
+                      <= scale * levels * used[truck_id])
+
+    for g, h in conflicts:
+        for truck_id in trucks:
+            if (g, truck_id) in group_uses and (h, truck_id) in group_uses:
+                model.AddBoolOr([group_uses[g, truck_id].Not(), group_uses[h, truck_id].Not()])
+
+    truck_costs = {truck_id: round((truck.transport_cost or 0.0) * COST_SCALE) + 1
+                   for truck_id, truck in trucks.items()}
+    penalty = sum(truck_costs.values()) + 1
+    model.Minimize(
+        penalty * sum(unplaced) +
+        sum(cost * used[truck_id] for truck_id, cost in truck_costs.items())
+    )
+
+    # Solution gloutonne comme point de départ
+    if hint:
+        hinted = {id(palette): truck_id for truck_id, group in hint.items() for palette in group}
+        for (i, truck_id), var in placed.items():
+            model.AddHint(var, hinted.get(id(palettes[i][1])) == truck_id)
+        for truck_id, var in used.items():
+            model.AddHint(var, truck_id in hint)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+
+    assignments: Dict[int, List['Palette']] = {}
+    for (i, truck_id), var in placed.items():
+        if solver.Value(var):
+            assignments.setdefault(truck_id, []).append(palettes[i][1])
+    return assignments, status == cp_model.OPTIMAL
@@ -0,0 +1,68 @@
+# services/loading_optimizer/compatibility.py
+from typing import Dict, Iterable, List
+from .models import ProductTypeConstraints
+
+
+class CompatibilityTable:
+    """
+    Contraintes de compatibilité des types de produits compilées en masques de bits.
+
+    Chaque type reçoit un identifiant dense ; le masque d'un type a le bit j à 1
+    si ce type est incompatible avec le type j (relation rendue symétrique). Un
+    chargement garde l'OU des masques de ses types : tester une nouvelle palette
+    revient alors à un seul ET. Les noms inconnus de la configuration (types
+    jamais chargés) sont ignorés.
+    """
+
+    def __init__(self, constraints: Dict[str, ProductTypeConstraints]):
+        self.type_names: List[str] = list(constraints)
+        self.type_ids: Dict[str, int] = {name: i for i, name in enumerate(self.type_names)}
+        self.incompatible_masks: List[int] = [0] * len(self.type_names)
+        # Types dont les plages de température ne se recouvrent pas
+        self.temperature_masks: List[int] = [0] * len(self.type_names)
+
+        for name, constraint in constraints.items():
+            i = self.type_ids[name]
+            for other in constraint.incompatible_types:
+                j = self.type_ids.get(other)
+                if j is not None:
+                    self.incompatible_masks[i] |= 1 << j
+                    self.incompatible_masks[j] |= 1 << i
+
+        for name, constraint in constraints.items():
+            i = self.type_ids[name]
+            for other_name, other in constraints.items():
+                if not self._temperatures_overlap(constraint, other):
+                    self.temperature_masks[i] |= 1 << self.type_ids[other_name]
+
+    @staticmethod
+    def _temperatures_overlap(first: ProductTypeConstraints, second: ProductTypeConstraints) -> bool:
+        """Recouvrement des plages de température (borne absente = non bornée)."""
+        low = max(t for t in (first.min_temperature, second.min_temperature, float('-inf')) if t is not None)
+        high = min(t for t in (first.max_temperature, second.max_temperature, float('inf')) if t is not None)
+        return low <= high
+
+    def bit(self, product_type: str) -> int:
+        """Bit du type de produit."""
+        return 1 << self.type_ids[product_type]
+
+    def mask(self, product_type: str) -> int:
+        """Masque des types incompatibles avec ce type de produit."""
+        return self.incompatible_masks[self.type_ids[product_type]]
+
+    def combined_mask(self, product_types: Iterable[str]) -> int:
+        """OU des masques d'incompatibilité d'un ensemble de types."""
+        mask = 0
+        for product_type in product_types:
+            mask |= self.mask(product_type)
+        return mask
+
+    def is_compatible(self, product_type: str, incompatible_mask: int) -> bool:
+        """Vrai si le type n'est pas interdit par le masque cumulé d'un chargement."""
+        return not (incompatible_mask & self.bit(product_type))
+
+    def can_group(self, first_type: str, second_type: str) -> bool:
+        """Deux types peuvent voyager ensemble : compatibles et plages de température communes."""
+        i = self.type_ids[first_type]
+        bit = 1 << self.type_ids[second_type]
+        return not ((self.incompatible_masks[i] | self.temperature_masks[i]) & bit)
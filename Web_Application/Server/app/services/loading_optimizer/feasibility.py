@@ -0,0 +1,186 @@
+# services/loading_optimizer/feasibility.py
+from time import perf_counter_ns
+from typing import List, Sequence, Tuple
+import numpy as np
+from .models import LoadedPalette
+
+# Tolérance (mètres) pour les comparaisons de faces en contact
+EPSILON = 1e-6
+
+# Nombre maximum de candidats traités par bloc (limite la taille des tableaux N x M)
+CHUNK_SIZE = 4096
+
+
+def palettes_to_arrays(loaded_palettes: List[LoadedPalette]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convertit les palettes chargées en tableaux (origines (M,3), tailles (M,3), poids (M,))."""
+    count = len(loaded_palettes)
+    origins = np.empty((count, 3), dtype=np.float64)
+    sizes = np.empty((count, 3), dtype=np.float64)
+    weights = np.empty(count, dtype=np.float64)
+
+    for i, palette in enumerate(loaded_palettes):
+        origins[i] = (palette.position.x, palette.position.y, palette.position.z)
+        sizes[i] = (palette.dimensions['length'], palette.dimensions['width'], palette.dimensions['height'])
+        weights[i] = palette.weight
+
+    return origins, sizes, weights
+
+
+def batch_feasibility_mask(
+    candidates: Sequence[Tuple[float, float, float]],
+    size: Tuple[float, float, float],
+    weight: float,
+    fragile: bool,
+    limits: Tuple[float, float, float],
+    origins: np.ndarray,
+    sizes: np.ndarray,
+    weights: np.ndarray,
+    check_collisions: bool = True,
+    check_stacking: bool = True
+) -> np.ndarray:
+    """
+    Calcule le masque de faisabilité de N positions candidates en une passe.
+
+    Reprend les règles de _is_within_bounds, _has_collision, _is_weight_stack_valid
+    et _check_fragility_constraints avec des tests de chevauchement diffusés (N x M).
+    `check_collisions=False` / `check_stacking=False` laissent ces règles à un
+    modèle d'espace externe (table de sommes préfixées, carte des hauteurs).
+    """
+    candidates = np.asarray(candidates, dtype=np.float64).reshape(-1, 3)
+    mask = np.empty(len(candidates), dtype=bool)
+
+    for start in range(0, len(candidates), CHUNK_SIZE):
+        chunk = candidates[start:start + CHUNK_SIZE]
+        mask[start:start + CHUNK_SIZE] = _chunk_feasibility_mask(
+            chunk, size, weight, fragile, limits, origins, sizes, weights,
+            check_collisions, check_stacking
+        )
+
+    return mask
+
+
+def _chunk_feasibility_mask(candidates, size, weight, fragile, limits, origins, sizes, weights,
+                            check_collisions, check_stacking) -> np.ndarray:
+    """Masque de faisabilité pour un bloc de candidats."""
+    size = np.asarray(size, dtype=np.float64)
+    ends = candidates + size
+
+    # Limites du camion
+    mask = (np.all(candidates >= -EPSILON, axis=1) &
+            np.all(ends <= np.asarray(limits, dtype=np.float64) + EPSILON, axis=1))
+
+    if len(origins) == 0:
+        return mask
+
+    tops = origins + sizes
+
+    # Chevauchement par axe pour chaque couple (candidat, palette chargée)
+    overlap = ((candidates[:, None, :] < tops[None, :, :] - EPSILON) &
+               (ends[:, None, :] > origins[None, :, :] + EPSILON))
+    horizontal = overlap[..., 0] & overlap[..., 1]
+
+    # Collisions
+    if check_collisions:
+        mask &= ~(horizontal & overlap[..., 2]).any(axis=1)
+
+    # Empilement : pas de palette plus légère directement en dessous, ni plus lourde posée dessus
+    if check_stacking:
+        contact = np.abs(tops[None, :, 2] - candidates[:, None, 2]) < EPSILON
+        lighter = weights[None, :] < weight
+        resting = np.abs(origins[None, :, 2] - ends[:, None, 2]) < EPSILON
+        heavier = weights[None, :] > weight
+        mask &= ~(horizontal & ((contact & lighter) | (resting & heavier))).any(axis=1)
+
+    # Fragilité : rien au-dessus d'une palette fragile
+    if fragile:
+        above = origins[None, :, 2] > candidates[:, None, 2]
+        mask &= ~(horizontal & above).any(axis=1)
+
+    return mask
+
+
+def batch_constraint_masks(
+    candidates: Sequence[Tuple[float, float, float]],
+    size: Tuple[float, float, float],
+    weight: float,
+    fragile: bool,
+    limits: Tuple[float, float, float],
+    origins: np.ndarray,
+    sizes: np.ndarray,
+    weights: np.ndarray,
+    check_collisions: bool = True,
+    check_stacking: bool = True
+) -> List[Tuple[str, np.ndarray, int]]:
+    """
+    Même règles que batch_feasibility_mask, évaluées séparément et chronométrées.
+
+    Retourne (règle, masque, durée en ns) pour chaque règle appliquée ; le ET
+    des masques est égal au masque de batch_feasibility_mask. Chaque règle
+    calcule ses propres chevauchements, pour mesurer son coût seule. Les
+    candidats sont traités par blocs de CHUNK_SIZE ; les durées des blocs s'additionnent.
+    Utilisé par l'instrumentation (LoadingOptions.profile_constraints).
+    """
+    candidates = np.asarray(candidates, dtype=np.float64).reshape(-1, 3)
+    masks, durations = {}, {}
+
+    # Au moins un bloc, pour que la règle des limites figure même sans candidat
+    for start in range(0, max(len(candidates), 1), CHUNK_SIZE):
+        chunk = candidates[start:start + CHUNK_SIZE]
+        for rule, mask, elapsed in _chunk_constraint_masks(
+            chunk, size, weight, fragile, limits, origins, sizes, weights,
+            check_collisions, check_stacking
+        ):
+            if rule not in masks:
+                masks[rule] = np.empty(len(candidates), dtype=bool)
+                durations[rule] = 0
+            masks[rule][start:start + CHUNK_SIZE] = mask
+            durations[rule] += elapsed
+
+    return [(rule, mask, durations[rule]) for rule, mask in masks.items()]
+
+
+def _chunk_constraint_masks(candidates, size, weight, fragile, limits, origins, sizes, weights,
+                            check_collisions, check_stacking) -> List[Tuple[str, np.ndarray, int]]:
+    """Masques chronométrés de chaque règle pour un bloc de candidats."""
+    size = np.asarray(size, dtype=np.float64)
+    results = []
+
+    started = perf_counter_ns()
+    ends = candidates + size
+    mask = (np.all(candidates >= -EPSILON, axis=1) &
+            np.all(ends <= np.asarray(limits, dtype=np.float64) + EPSILON, axis=1))
+    results.append(('bounds', mask, perf_counter_ns() - started))
+
+    if len(origins) == 0:
+        return results
+    tops = origins + sizes
+
+    def horizontal_overlap():
+        return ((candidates[:, None, 0] < tops[None, :, 0] - EPSILON) &
+                (ends[:, None, 0] > origins[None, :, 0] + EPSILON) &
+                (candidates[:, None, 1] < tops[None, :, 1] - EPSILON) &
+                (ends[:, None, 1] > origins[None, :, 1] + EPSILON))
+
+    if check_collisions:
+        started = perf_counter_ns()
+        vertical = ((candidates[:, None, 2] < tops[None, :, 2] - EPSILON) &
+                    (ends[:, None, 2] > origins[None, :, 2] + EPSILON))
+        mask = ~(horizontal_overlap() & vertical).any(axis=1)
+        results.append(('collision', mask, perf_counter_ns() - started))
+
+    if check_stacking:
+        started = perf_counter_ns()
+        contact = np.abs(tops[None, :, 2] - candidates[:, None, 2]) < EPSILON
+        lighter = weights[None, :] < weight
+        resting = np.abs(origins[None, :, 2] - ends[:, None, 2]) < EPSILON
+        heavier = weights[None, :] > weight
+        mask = ~(horizontal_overlap() & ((contact & lighter) | (resting & heavier))).any(axis=1)
+        results.append(('weight_stack', mask, perf_counter_ns() - started))
+
+    if fragile:
+        started = perf_counter_ns()
+        above = origins[None, :, 2] > candidates[:, None, 2]
+        mask = ~(horizontal_overlap() & above).any(axis=1)
+        results.append(('fragility', mask, perf_counter_ns() - started))
+
+    return results
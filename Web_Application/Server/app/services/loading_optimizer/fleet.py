@@ -0,0 +1,221 @@
+# services/loading_optimizer/fleet.py
+from typing import List, Optional, Sequence
+import numpy as np
+from .models import LoadBounds, TruckRejectReason
+
+# Motifs dans l'ordre des tests de prefilter.check_truck_bounds : le premier vrai est retenu
+REJECT_ORDER = (
+    TruckRejectReason.REFRIGERATION,
+    TruckRejectReason.TEMPERATURE,
+    TruckRejectReason.WEIGHT,
+    TruckRejectReason.VOLUME,
+    TruckRejectReason.OVERSIZE,
+    TruckRejectReason.PALETTE_CAPACITY,
+    TruckRejectReason.FLOOR_AREA,
+)
+
+PALETTE_KINDS = ('european', 'american')
+
+# Taux d'utilisation visé par le score d'adéquation d'un camion
+TARGET_UTILIZATION = 0.85
+
+
+def _counts_array(counts_list: Sequence[dict]) -> np.ndarray:
+    """Nombres de palettes par type (G, K) dans l'ordre de PALETTE_KINDS."""
+    return np.array([[counts.get(kind, 0) for kind in PALETTE_KINDS] for counts in counts_list],
+                    dtype=np.float64).reshape(len(counts_list), len(PALETTE_KINDS))
+
+
+class FleetMatrix:
+    """
+    Capacités d'une flotte rangées en colonnes NumPy (un élément par camion).
+
+    Les spécifications de chaque camion (truck.specifications reconstruit un
+    grand dictionnaire à chaque lecture) ne sont lues qu'une fois, à la
+    construction. Le préfiltre de bornes et le score d'adéquation sont ensuite
+    évalués pour tous les couples (groupe, camion) par diffusion, avec les
+    mêmes résultats que check_truck_bounds et la boucle de score d'origine.
+    Les grandeurs absentes (volume des plateaux, hauteur) valent l'infini.
+    """
+
+    def __init__(self, trucks: Sequence['Camion']):
+        self.trucks = list(trucks)
+        count = len(self.trucks)
+        self.length = np.empty(count)
+        self.width = np.empty(count)
+        self.height = np.empty(count)
+        self.volume = np.empty(count)
+        self.payload = np.empty(count)
+        self.frigo = np.zeros(count, dtype=bool)
+        self.temperature_low = np.full(count, -np.inf)
+        self.temperature_high = np.full(count, np.inf)
+        self.setpoint = np.full(count, np.nan)  # Consigne réglée sur le camion (NaN si aucune)
+        self.cost = np.empty(count)
+        self.capacities = np.zeros((count, len(PALETTE_KINDS)))
+
+        for i, truck in enumerate(self.trucks):
+            specs = truck.specifications
+            self.length[i] = specs['longueur']
+            self.width[i] = specs['largeur']
+            self.height[i] = np.inf if specs['hauteur'] is None else specs['hauteur']
+            self.volume[i] = np.inf if specs['volume'] is None else specs['volume']
+            self.payload[i] = specs['charge_utile']
+            self.frigo[i] = specs.get('frigo', False)
+            if specs.get('plage_temperature') is not None:
+                self.temperature_low[i], self.temperature_high[i] = specs['plage_temperature']
+            setpoint = getattr(truck, 'temperature', None)
+            if setpoint is not None:
+                self.setpoint[i] = setpoint
+            self.cost[i] = truck.transport_cost
+            if specs['palettes_euro'] is not None:
+                self.capacities[i] = [specs['palettes_euro'], specs['palettes_us']]
+
+    def __len__(self) -> int:
+        return len(self.trucks)
+
+    def take(self, indices: Sequence[int]) -> 'FleetMatrix':
+        """Sous-flotte (ou flotte réordonnée) sans relire les spécifications."""
+        indices = np.asarray(indices, dtype=np.intp)
+        subset = object.__new__(FleetMatrix)
+        for name, value in vars(self).items():
+            setattr(subset, name, value[indices] if isinstance(value, np.ndarray) else value)
+        subset.trucks = [self.trucks[i] for i in indices]
+        return subset
+
+    def by_cost_efficiency(self) -> 'FleetMatrix':
+        """Camions triés par coût de transport par m³ (ordre stable)."""
+        return self.take(np.argsort(self.cost / self.volume, kind='stable'))
+
+    def _share(self, counts: np.ndarray) -> np.ndarray:
+        """Part du plancher (G, T) occupée selon capacite_palettes ; infinie si un type n'est pas admis."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.where(counts > 0, counts / self.capacities, 0.0)
+        return shares.sum(axis=-1)
+
+    def reject_reasons(self, bounds: List[LoadBounds]) -> np.ndarray:
+        """
+        Motifs de rejet (G, T) : indice dans REJECT_ORDER, -1 si le camion reste candidat.
+
+        Mêmes tests que check_truck_bounds ; les listes de formes et de hauteurs
+        des groupes sont mises bout à bout et réduites par groupe (reduceat).
+        """
+        groups = len(bounds)
+        if not groups or not self.trucks:
+            return np.full((groups, len(self.trucks)), -1, dtype=np.int8)
+
+        column = lambda values: np.array(values, dtype=np.float64)[:, None]
+        needs = np.array([b.needs_refrigeration for b in bounds])[:, None]
+        low = column([b.temperature_range[0] for b in bounds])
+        high = column([b.temperature_range[1] for b in bounds])
+        min_temperature = column([np.nan if b.min_temperature is None else b.min_temperature for b in bounds])
+        total_weight = column([b.total_weight for b in bounds])
+        total_volume = column([b.total_volume for b in bounds])
+        min_height = column([b.min_height for b in bounds])
+
+        refrigeration = needs & ~self.frigo
+        temperature = needs & ((self.temperature_low > high) | (self.temperature_high < low) |
+                               (self.setpoint > min_temperature))
+        weight = self.payload < total_weight
+        volume = self.volume < total_volume
+
+        # Chaque palette doit tenir dans une orientation permise
+        shapes = np.array([shape for b in bounds for shape in b.shapes], dtype=np.float64)
+        starts = np.cumsum([0] + [len(b.shapes) for b in bounds[:-1]])
+        p_length, p_width, p_height, rotatable = (shapes[:, i, None] for i in range(4))
+        fits = (p_length <= self.length) & (p_width <= self.width)
+        fits |= (rotatable > 0) & (p_width <= self.length) & (p_length <= self.width)
+        oversize = np.logical_or.reduceat(~fits | (p_height > self.height), starts, axis=0)
+
+        # Nombre de palettes : au plus `levels` couches de capacite_palettes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            levels = np.where((min_height > 0) & np.isfinite(self.height),
+                              np.floor(self.height / min_height), np.inf)
+        share = self._share(_counts_array([b.counts for b in bounds])[:, None, :])
+        palette_capacity = np.isinf(share) | (share > levels)
+
+        # Palettes non empilables entre elles : une seule couche
+        floor_area = self.length * self.width
+        fragile_share = self._share(_counts_array([b.fragile_counts for b in bounds])[:, None, :])
+        single_layer = (column([b.fragile_area for b in bounds]) > floor_area) | (fragile_share > 1)
+        heights = [entry for b in bounds for entry in b.heights]
+        starts = np.cumsum([0] + [len(b.heights) for b in bounds[:-1]])
+        tall = 2 * np.array([h for h, _, _ in heights])[:, None] > self.height
+        footprints = np.array([footprint for _, footprint, _ in heights])[:, None]
+        kinds = np.array([[kind == name for name in PALETTE_KINDS] for _, _, kind in heights], dtype=np.float64)
+        tall_area = np.add.reduceat(np.where(tall, footprints, 0.0), starts, axis=0)
+        tall_counts = np.add.reduceat(tall[:, :, None] * kinds[:, None, :], starts, axis=0)
+        single_layer |= (tall_area > floor_area) | (self._share(tall_counts) > 1)
+
+        masks = np.stack([refrigeration, temperature, weight, volume, oversize, palette_capacity, single_layer])
+        return np.where(masks.any(axis=0), masks.argmax(axis=0), -1).astype(np.int8)
+
+    def fit_scores(self, total_volumes: Sequence[float], total_weights: Sequence[float]) -> np.ndarray:
+        """
+        Score d'adéquation (G, T) des groupes aux camions, -inf si le groupe dépasse le volume ou la charge.
+
+        Taux d'utilisation proche de TARGET_UTILIZATION en volume et en poids
+        (0.4 chacun) et coût par m³·kg (0.2).
+        """
+        volume_ratio = np.asarray(total_volumes, dtype=np.float64)[:, None] / self.volume
+        weight_ratio = np.asarray(total_weights, dtype=np.float64)[:, None] / self.payload
+        volume_score = 1 - np.abs(TARGET_UTILIZATION - volume_ratio)
+        weight_score = 1 - np.abs(TARGET_UTILIZATION - weight_ratio)
+        cost_score = 1 / (1 + self.cost / (self.volume * self.payload))
+        score = 0.4 * volume_score + 0.4 * weight_score + 0.2 * cost_score
+        return np.where((volume_ratio <= 1) & (weight_ratio <= 1), score, -np.inf)
+
+    @staticmethod
+    def best(scores: np.ndarray, allowed: Optional[np.ndarray] = None) -> Optional[int]:
+        """Indice du meilleur score (le premier en cas d'égalité), None si aucun camion ne convient."""
+        if allowed is not None:
+            scores = np.where(allowed, scores, -np.inf)
+        if not len(scores):
+            return None
+        index = int(np.argmax(scores))
+        return None if scores[index] == -np.inf else index
+
+
+class CapacityTree:
+    """
+    Arbre de segments des capacités restantes de camions rangés dans des emplacements.
+
+    Chaque nœud garde, pour chaque dimension (volume, charge, places par type
+    de palette...), le maximum de son sous-arbre. first_fit descend vers
+    l'emplacement le plus à gauche dont toutes les dimensions couvrent la
+    demande, en écartant tout sous-arbre dont un maximum est insuffisant : un
+    seul chemin de O(log k) nœuds quand une dimension lie les autres, et
+    quelques retours en arrière sinon. Mise à jour en O(log k).
+    """
+
+    def __init__(self, slots: int, dimensions: int):
+        self.size = 1
+        while self.size < slots:
+            self.size *= 2
+        # Feuilles vides à -inf : aucune demande n'y tient
+        self.maxima = np.full((2 * self.size, dimensions), -np.inf)
+
+    def set(self, slot: int, capacities: Sequence[float]):
+        """Capacités restantes de l'emplacement `slot` (-inf partout pour le vider)."""
+        node = slot + self.size
+        self.maxima[node] = capacities
+        node //= 2
+        while node:
+            np.maximum(self.maxima[2 * node], self.maxima[2 * node + 1], out=self.maxima[node])
+            node //= 2
+
+    def remove(self, slot: int):
+        self.set(slot, -np.inf)
+
+    def first_fit(self, demand: Sequence[float]) -> Optional[int]:
+        """Premier emplacement dont chaque capacité est au moins la demande, None s'il n'y en a pas."""
+        demand = np.asarray(demand, dtype=np.float64)
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            if not (self.maxima[node] >= demand).all():
+                continue
+            if node >= self.size:
+                return node - self.size
+            stack.append(2 * node + 1)
+            stack.append(2 * node)
+        return None
@@ -0,0 +1,170 @@
+# services/loading_optimizer/floor_patterns.py
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+from app.models import Camion, CamionType
+
+# Empreintes au sol (longueur, largeur) en mètres, reprises de Palette.specifications
+PALETTE_FOOTPRINTS = {
+    "european": (1.2, 0.8),
+    "american": (1.2, 1.0),
+}
+
+# Pas de discrétisation de la longueur du camion (mètres)
+LENGTH_STEP = 0.1
+
+# Profondeur maximale d'un bloc de rangées (mètres)
+MAX_BLOCK_DEPTH = 3.0
+
+
+@dataclass
+class FloorBlock:
+    """Bloc transversal de colonnes d'un même type de palette, d'orientations mixtes."""
+    palette_type: str
+    depth: float
+    count: int
+    slots: List[Tuple[float, float, int]]  # (x relatif, y, rotation)
+
+
+@dataclass
+class FloorPattern:
+    """Plan de plancher : emplacements (type, x, y, rotation) pour un mélange de palettes."""
+    camion_type: CamionType
+    counts: Dict[str, int]
+    slots: List[Tuple[str, float, float, int]] = field(default_factory=list)
+
+
+def _blocks_for_type(palette_type: str, truck_width: float) -> List[FloorBlock]:
+    """Meilleur bloc transversal pour chaque profondeur possible (orientations mélangées)."""
+    length, width = PALETTE_FOOTPRINTS[palette_type]
+    epsilon = 1e-9
+    blocks = []
+
+    depths = sorted({
+        round(i * length + j * width, 6)
+        for i in range(4) for j in range(5)
+        if 0 < i * length + j * width <= MAX_BLOCK_DEPTH + epsilon
+    })
+    for depth in depths:
+        # Colonne à 0° : largeur `width`, palettes en long ; colonne à 90° : largeur `length`
+        per_column_0 = int((depth + epsilon) // length)
+        per_column_90 = int((depth + epsilon) // width)
+
+        best = None
+        max_0 = int((truck_width + epsilon) // width)
+        max_90 = int((truck_width + epsilon) // length)
+        for columns_0, columns_90 in product(range(max_0 + 1), range(max_90 + 1)):
+            if columns_0 * width + columns_90 * length > truck_width + epsilon:
+                continue
+            count = columns_0 * per_column_0 + columns_90 * per_column_90
+            if count and (best is None or count > best[0]):
+                best = (count, columns_0, columns_90)
+
+        if best is None:
+            continue
+
+        count, columns_0, columns_90 = best
+        slots = []
+        y = 0.0
+        for _ in range(columns_0):
+            slots.extend((round(k * length, 6), round(y, 6), 0) for k in range(per_column_0))
+            y += width
+        for _ in range(columns_90):
+            slots.extend((round(k * width, 6), round(y, 6), 90) for k in range(per_column_90))
+            y += length
+        blocks.append(FloorBlock(palette_type, depth, count, slots))
+
+    return blocks
+
+
+def build_floor_patterns(camion_type: CamionType) -> Dict[int, FloorPattern]:
+    """
+    Calcule, pour un type de camion, le plan de plancher optimal pour chaque
+    nombre de palettes US : nombre maximal de palettes EUR associé et emplacements.
+
+    Programmation dynamique (sac à dos non borné) sur la longueur discrétisée, les
+    blocs transversaux mélangeant les orientations.
+    """
+    dimensions = Camion(type_camion=camion_type).dimensions
+    truck_length, truck_width = dimensions["longueur"], dimensions["largeur"]
+    steps = int(round(truck_length / LENGTH_STEP))
+
+    blocks = [
+        block
+        for palette_type in PALETTE_FOOTPRINTS
+        for block in _blocks_for_type(palette_type, truck_width)
+    ]
+
+    # best[l][u] = (nb EUR max, bloc, longueur précédente) pour exactement u palettes US
+    best: List[Dict[int, Tuple[int, Optional[FloorBlock], int]]] = [dict() for _ in range(steps + 1)]
+    best[0][0] = (0, None, 0)
+    for used in range(steps + 1):
+        for us, (eur, _, _) in list(best[used].items()):
+            for block in blocks:
+                end = used + int(round(block.depth / LENGTH_STEP))
+                if end > steps:
+                    continue
+                is_us = block.palette_type == "american"
+                new_us = us + block.count if is_us else us
+                new_eur = eur if is_us else eur + block.count
+                current = best[end].get(new_us)
+                if current is None or new_eur > current[0]:
+                    best[end][new_us] = (new_eur, block, used)
+
+    patterns: Dict[int, FloorPattern] = {}
+    for end in range(steps + 1):
+        for us, (eur, _, _) in best[end].items():
+            known = patterns.get(us)
+            if known is None or eur > known.counts["european"]:
+                patterns[us] = FloorPattern(camion_type, {"european": eur, "american": us},
+                                            _reconstruct(best, end, us))
+
+    # Une configuration avec plus de palettes US et autant d'EUR couvre aussi les mélanges plus petits
+    for us in sorted(patterns, reverse=True):
+        larger = patterns.get(us + 1)
+        if larger and larger.counts["european"] >= patterns[us].counts["european"]:
+            patterns[us] = FloorPattern(camion_type, {"european": larger.counts["european"], "american": us},
+                                        larger.slots)
+    return patterns
+
+
+def _reconstruct(best, end: int, us: int) -> List[Tuple[str, float, float, int]]:
+    """Reconstitue les emplacements absolus à partir de la table de programmation dynamique."""
+    chain = []
+    while end > 0:
+        _, block, previous = best[end][us]
+        chain.append((block, previous))
+        if block.palette_type == "american":
+            us -= block.count
+        end = previous
+
+    slots = []
+    for block, start in reversed(chain):
+        offset = start * LENGTH_STEP
+        slots.extend((block.palette_type, round(offset + x, 6), y, rotation)
+                     for x, y, rotation in block.slots)
+    return slots
+
+
+@lru_cache(maxsize=None)
+def floor_patterns(camion_type: CamionType) -> Dict[int, FloorPattern]:
+    """
+    Plans de plancher d'un type de camion, par nombre de palettes US ({} s'il ne
+    transporte pas de palettes). Calculés au premier appel pour ce type, puis gardés.
+    """
+    specs = Camion(type_camion=camion_type).specifications
+    if specs["palettes_euro"] is None or specs["largeur"] is None:
+        return {}
+    return build_floor_patterns(camion_type)
+
+
+def lookup_floor_pattern(camion_type: CamionType, counts: Dict[str, int]) -> Optional[FloorPattern]:
+    """Plan de plancher pouvant recevoir le mélange `counts` ({'european': n, 'american': m})."""
+    patterns = floor_patterns(camion_type)
+    if not patterns:
+        return None
+    pattern = patterns.get(counts.get("american", 0))
+    if pattern is None or pattern.counts["european"] < counts.get("european", 0):
+        return None
+    return pattern
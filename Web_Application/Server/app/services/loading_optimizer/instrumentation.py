@@ -0,0 +1,43 @@
+# services/loading_optimizer/instrumentation.py
+from typing import Dict
+
+
+class ConstraintProfiler:
+    """
+    Compteurs des contraintes et fonctions de score du placement.
+
+    Pour chaque nom : appels, candidats examinés, candidats rejetés et durée
+    cumulée en nanosecondes. Les rejets d'une contrainte sont comptés sur tous
+    les candidats examinés (indépendamment des autres contraintes), ce qui
+    donne directement sa sélectivité. Activé par LoadingOptions.profile_constraints.
+    """
+
+    __slots__ = ('stats',)
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, name: str, elapsed_ns: int, checked: int = 1, rejected: int = 0):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = {'calls': 0, 'checked': 0, 'rejects': 0, 'ns': 0}
+        entry['calls'] += 1
+        entry['checked'] += checked
+        entry['rejects'] += rejected
+        entry['ns'] += elapsed_ns
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Compteurs avec le coût par candidat (ns) et le taux de rejet, triés par durée
+        décroissante. Pour ordonner les tests : les moins coûteux et les plus
+        sélectifs d'abord.
+        """
+        report = {}
+        for name, entry in sorted(self.stats.items(), key=lambda item: -item[1]['ns']):
+            checked = entry['checked']
+            report[name] = {
+                **entry,
+                'ns_per_candidate': entry['ns'] / checked if checked else 0.0,
+                'reject_rate': entry['rejects'] / checked if checked else 0.0,
+            }
+        return report
@@ -1,9 +1,9 @@
 # services/loading_optimizer/models.py
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
-@dataclass
+@dataclass(slots=True)
 class Position3D:
     x: float
     y: float
@@ -18,7 +18,7 @@ class LoadRequirements:
     temperature_required: Optional[float]
     num_palettes: int
 
-@dataclass
+@dataclass(slots=True)
 class LoadedPalette:
     palette_id: int
     position: Position3D
@@ -35,6 +35,28 @@ class LoadingSuggestion:
     weight_distribution_score: float
     space_utilization: float
     estimated_cost: float
+    fully_optimized: bool = True  # False si l'échéance a forcé un mode dégradé pour ce camion
+    # Appels, rejets et durées par contrainte (LoadingOptions.profile_constraints), None sinon
+    constraint_stats: Optional[Dict[str, Dict[str, float]]] = None
+
+@dataclass
+class LoadingOptions:
+    """Options d'exécution de l'optimisation du chargement, choisies à chaque appel."""
+    space_mode: str = 'voxel'  # 'voxel' (grille 3D) ou 'heightmap' (carte des hauteurs 2.5D)
+    use_floor_patterns: bool = True  # Plans de plancher précalculés avant la recherche 3D
+    starts: int = 1  # Nombre d'ordres de palettes essayés (multi-start), 1 = ordre pondéré seul
+    max_workers: Optional[int] = None  # Processus pour le multi-start (None = nombre de cœurs)
+    seed: int = 0  # Graine des ordres aléatoires, pour des résultats reproductibles
+    improvement_budget: float = 0.0  # Secondes de « ruin and recreate » après la construction (0 = désactivé)
+    candidate_mode: str = 'extreme_points'  # Candidats : 'extreme_points' ou 'grid' (recherche multi-résolution)
+    resolutions: Tuple[float, ...] = (0.1,)  # Pas de grille du plus grossier au plus fin (m) ; l'espace suit une cellule qui les divise tous (10 cm au plus)
+    refine_top_k: int = 8  # Positions gardées à chaque niveau pour être affinées au niveau suivant
+    symmetry_breaking: bool = True  # Positions symétriques et ordres équivalents (palettes identiques permutées) écartés
+    identical_palettes_forward: bool = False  # Palette identique à la précédente : positions après la sienne seulement (heuristique)
+    profile_constraints: bool = False  # Compteurs et chronométrage par contrainte, joints au plan
+    truck_workers: Optional[int] = 1  # Processus pour arranger les camions en parallèle (1 = en série, None = nombre de cœurs)
+    exact_assignment: bool = False  # Affectation palettes -> camions exacte (CP-SAT), la gloutonne en repli
+    assignment_time_limit: float = 5.0  # Temps maximal du solveur CP-SAT par groupe de routes (s)
 
 # Classe PropertyType pour les contraintes des produits
 @dataclass
@@ -63,4 +85,33 @@ class ProductTypeConstraints:
             max_stack_weight=data.get('max_stack_weight', float('inf')),
             requires_vertical=data.get('requires_vertical', False),
             loading_priority=data.get('loading_priority', 3)
-        )
\ No newline at end of file
+        )
+
+class TruckRejectReason(Enum):
+    """Motif de rejet d'un camion par le préfiltre de bornes (avant toute recherche 3D)."""
+    REFRIGERATION = 'refrigeration'  # Produits sous température, camion non frigorifique
+    TEMPERATURE = 'temperature'  # Plage de température du camion incompatible avec le groupe
+    WEIGHT = 'weight'  # Poids total supérieur à la charge utile
+    VOLUME = 'volume'  # Volume total supérieur au volume utile
+    OVERSIZE = 'oversize'  # Une palette ne tient dans le camion dans aucune orientation permise
+    PALETTE_CAPACITY = 'palette_capacity'  # Trop de palettes pour capacite_palettes, même empilées
+    FLOOR_AREA = 'floor_area'  # Palettes non empilables : leur emprise dépasse la surface au sol
+
+
+@dataclass
+class LoadBounds:
+    """Grandeurs d'un groupe de palettes calculées une fois pour le préfiltre."""
+    total_weight: float
+    total_volume: float
+    counts: Dict[str, int]  # Nombre de palettes par type de palette ('european', 'american')
+    min_height: float
+    # (longueur, largeur, hauteur, rotatable) des palettes, dédoublonnées
+    shapes: List[Tuple[float, float, float, bool]]
+    # Palettes fragiles (rien au-dessus) : emprise au sol et nombre par type de palette
+    fragile_area: float
+    fragile_counts: Dict[str, int]
+    # Hauteurs et emprises des palettes, pour les palettes trop hautes pour être superposées
+    heights: List[Tuple[float, float, str]]
+    needs_refrigeration: bool
+    min_temperature: Optional[float]  # Plus petite température minimale (consigne du camion)
+    temperature_range: Tuple[float, float]  # Plage commune à tous les produits du groupe
@@ -1,6 +1,9 @@
 # services/loading_optimizer/optimizer.py
 from datetime import datetime
-import json
+from dataclasses import replace
+import time
+import random
+import heapq
 from math import sqrt
 from typing import List, Dict, Optional, Tuple
 import numpy as np
@@ -9,25 +12,45 @@ from operator import attrgetter
 import osmnx as ox
 import requests
 from app.models import Camion, Command, Palette, Product, ProductType, TruckAssignment
-from .models import LoadRequirements, Position3D, LoadedPalette, LoadingSuggestion, ProductTypeConstraints
+from .models import LoadRequirements, Position3D, LoadedPalette, LoadingSuggestion, ProductTypeConstraints, LoadingOptions, TruckRejectReason
 from .utils import load_product_constraints, get_route_distance
 from .utils import load_product_constraints, get_route_distance
+from .feasibility import EPSILON, batch_feasibility_mask, batch_constraint_masks, palettes_to_arrays
+from .space import TruckSpace, HeightMap, SPACE_MODES
+
+from .spatial_index import SpatialIndex
+from .state import LoadingState, palette_signature
+from .instrumentation import ConstraintProfiler
+from .store import LoadedPaletteStore
+from .floor_patterns import PALETTE_FOOTPRINTS, lookup_floor_pattern
+from .parallel import map_in_processes
+from .registry import get_constraint_registry
+from .plan_cache import PlanCache, canonical_signature
+from .prefilter import compute_load_bounds
+from .assignment import assignment_cost, solve_truck_assignment, solver_available
+from .fleet import CapacityTree, FleetMatrix, PALETTE_KINDS, REJECT_ORDER
 import networkx as nx
 
+# Génération des positions candidates : points extrêmes ou grille multi-résolution
+CANDIDATE_MODES = ('extreme_points', 'grid')
+
+# Poids de la stabilité dans le score d'une position et sa valeur maximale
+# (marge pour les arrondis) : borne supérieure du score avant de calculer la stabilité
+STABILITY_WEIGHT = 0.2
+MAX_STABILITY = 1.0 + 1e-9
+# Candidats dont la stabilité est calculée ensemble entre deux mises à jour de la borne
+BOUND_BATCH = 4
+
 
 class InitialGroupingOptimizer:
     def __init__(self, products_config_path: str):
-        self.product_types = self._load_product_types(products_config_path)
+        self.constraint_registry = get_constraint_registry(products_config_path)
         self.destination_cache = {}
         
-    def _load_product_types(self, config_path: str) -> Dict[str, ProductTypeConstraints]:
-        """Charge la configuration des types de produits depuis le fichier JSON."""
-        with open(config_path, 'r') as f:
-            data = json.load(f)
-            return {
-                pt['type']: ProductTypeConstraints.from_dict(pt)
-                for pt in data['product_types']
-            }
+    @property
+    def product_types(self) -> Dict[str, ProductTypeConstraints]:
+        """Configuration des types de produits (registre partagé, rechargé si le fichier change)."""
+        return self.constraint_registry.constraints
     
     def optimize_grouping(self, commands: List[Command]) -> Dict[str, List[List[Command]]]:
         """Processus principal d'optimisation du groupement."""
@@ -248,10 +271,11 @@ class TruckLoadingOptimizer:
                 product_specs = self.get_product_type_specs(palette.prod.type)
                 
                 # Vérifier si une température est requise
-                if product_specs["min_temperature"] is not None or product_specs["max_temperature"] is not None:
+                if product_specs and (product_specs.min_temperature is not None or
+                                      product_specs.max_temperature is not None):
                     needs_refrigeration = True
-                    if product_specs["min_temperature"] is not None:
-                        min_temp = min(min_temp, product_specs["min_temperature"])
+                    if product_specs.min_temperature is not None:
+                        min_temp = min(min_temp, product_specs.min_temperature)
                 
                 # Compter les palettes
                 if palette.prod.palette_type:
@@ -265,16 +289,9 @@ class TruckLoadingOptimizer:
             num_palettes=sum(palette_counts.values())
         )
 
-    def get_product_type_specs(self, product_type: str) -> dict:
-        """Récupère les spécifications d'un type de produit à partir du fichier JSON."""
-        with open("Server/products.json", "r") as file:
-            data = json.load(file)
-        
-        for product in data["product_types"]:
-            if product["type"] == product_type:
-                return product  # Retourne les spécifications du produit
-
-        return {"min_temperature": None, "max_temperature": None}  # Valeurs par défaut si non trouvé
+    def get_product_type_specs(self, product_type: str) -> Optional[ProductTypeConstraints]:
+        """Récupère les contraintes d'un type de produit (registre partagé, None si inconnu)."""
+        return get_constraint_registry().get(product_type)
 
         
     def calculate_truck_compatibility(self, truck: 'Camion', requirements: LoadRequirements) -> float:
@@ -375,37 +392,134 @@ class TruckLoadingOptimizer:
 
 
 class TruckLoadingOptimizer:
-    def __init__(self, db_session, config_path: str):
+    def __init__(self, db_session, config_path: str, plan_cache: Optional[PlanCache] = None):
         self.session = db_session
-        self.product_constraints = load_product_constraints(config_path)
+        # Instantané cohérent du registre partagé pour la durée de l'optimisation
+        snapshot = get_constraint_registry(config_path).snapshot()
+        self.product_constraints = snapshot.constraints
+        self.compatibility = snapshot.compatibility
+        self.constraints_digest = snapshot.digest
+        self.plan_cache = plan_cache
+        # Camions écartés par le préfiltre lors de la dernière attribution
+        self.truck_rejections: List[Dict] = []
+        # Palettes laissées à quai par la dernière attribution
+        self.unassigned_palettes: List['Palette'] = []
         self.min_spacing = 0.1  # Minimum space between palettes (meters)
 
-    def optimize_loading(self, commands: List['Command'], available_trucks: List['Camion']) -> Dict[int, LoadingSuggestion]:
-        """Main optimization function for loading palettes into trucks."""
+    def __getstate__(self):
+        # Ni la session SQLAlchemy ni la connexion du cache ne passent aux processus du multi-start
+        state = self.__dict__.copy()
+        state['session'] = None
+        state['plan_cache'] = None
+        return state
+
+    def optimize_loading(self, commands: List['Command'], available_trucks: List['Camion'],
+                         options: Optional[LoadingOptions] = None,
+                         time_budget_ms: Optional[float] = None) -> Dict[int, LoadingSuggestion]:
+        """
+        Main optimization function for loading palettes into trucks.
+
+        With `time_budget_ms`, grouping, assignment and arrangement share one
+        deadline. Once it has passed, the remaining work switches to fast modes
+        (no new route distance requests, first feasible position, no multi-start
+        or improvement phase) and the affected suggestions are returned with
+        fully_optimized=False.
+
+        The trucks are arranged independently; with options.truck_workers > 1
+        (or None for one process per core) they are packed concurrently.
+
+        Each truck serves at most one date/route group: the trucks assigned to
+        a group are withheld from the following ones. Palettes left without a
+        truck, or whose truck could not be arranged, end up in
+        self.unassigned_palettes.
+        """
+        options = options or LoadingOptions()
+        deadline = None
+        if time_budget_ms is not None:
+            deadline = time.monotonic() + time_budget_ms / 1000
+            
         # Group commands by delivery date
         date_grouped_commands = self._group_by_delivery_date(commands)
-        loading_suggestions = {}
+        arrangements = []
+        # Capacités de la flotte lues une fois pour toute la requête
+        fleet = FleetMatrix(available_trucks)
+        # Un camion attribué à un groupe n'est plus proposé aux groupes suivants
+        used_trucks = np.zeros(len(fleet), dtype=bool)
+        # Rejets et palettes non affectées de tous les groupes
+        truck_rejections, unassigned_palettes = [], []
 
         for date, date_commands in date_grouped_commands.items():
             # Group by compatible routes (filtre par date)
-            route_groups = self._group_by_route_compatibility(date_commands)
+            route_groups = self._group_by_route_compatibility(date_commands, deadline)
             
             for route_group in route_groups:
+                free = np.flatnonzero(~used_trucks)
                 # Find optimal truck combination
-                truck_assignments = self._optimize_truck_assignment(route_group, available_trucks)
+                truck_assignments = self._optimize_truck_assignment(
+                    route_group, [available_trucks[t] for t in free], options, fleet.take(free), deadline
+                )
+                truck_rejections.extend(self.truck_rejections)
+                unassigned_palettes.extend(self.unassigned_palettes)
                 
-                for truck_id, assigned_palettes in truck_assignments.items():
-                    truck = next(t for t in available_trucks if t.id == truck_id)
-                    loading_plan = self._optimize_loading_arrangement(
-                        assigned_palettes,
-                        truck
-                    )
-                    
-                    if loading_plan:
-                        loading_suggestions[truck_id] = loading_plan
+                for t in free:
+                    truck = fleet.trucks[t]
+                    if truck.id in truck_assignments:
+                        used_trucks[t] = True
+                        arrangements.append((truck_assignments[truck.id], truck))
+
+        loading_suggestions = {}
+        for (assigned_palettes, truck), loading_plan in zip(
+            arrangements, self._arrange_trucks(arrangements, options, deadline)
+        ):
+            if loading_plan:
+                loading_suggestions[truck.id] = loading_plan
+            else:
+                # Aucun arrangement valide : les palettes du camion restent à quai
+                unassigned_palettes.extend(assigned_palettes)
+        self.truck_rejections, self.unassigned_palettes = truck_rejections, unassigned_palettes
 
         return loading_suggestions
 
+    def _arrange_trucks(
+        self,
+        arrangements: List[Tuple[List['Palette'], 'Camion']],
+        options: LoadingOptions,
+        deadline: Optional[float] = None
+    ) -> List[Optional[LoadingSuggestion]]:
+        """
+        Arrange every (palettes, truck) pair, in order.
+
+        Serial when options.truck_workers is 1. Otherwise cache hits are served
+        here and the misses are packed in a process pool; each worker runs its
+        own multi-start serially so that the pools are not nested. The pool
+        falls back to serial execution when it is unavailable.
+        """
+        if options.truck_workers == 1 or len(arrangements) < 2:
+            return [
+                self._optimize_loading_arrangement(palettes, truck, options, deadline)
+                for palettes, truck in arrangements
+            ]
+
+        plans: List[Optional[LoadingSuggestion]] = [None] * len(arrangements)
+        pending = []
+        for i, (palettes, truck) in enumerate(arrangements):
+            cache_key, canonical_palettes, plan = self._cached_arrangement(palettes, truck, options)
+            if plan is not None:
+                plans[i] = plan
+            else:
+                pending.append((i, cache_key, canonical_palettes))
+
+        worker_options = replace(options, max_workers=1)
+        results = map_in_processes(
+            _arrange_truck,
+            [(self, *arrangements[i], worker_options, deadline) for i, _, _ in pending],
+            options.truck_workers
+        )
+        for (i, cache_key, canonical_palettes), plan in zip(pending, results):
+            self._store_arrangement(cache_key, canonical_palettes, plan)
+            plans[i] = plan
+        return plans
+
     def _group_by_delivery_date(self, commands: List['Command']) -> Dict[str, List['Command']]:
         """Group commands by delivery date."""
         sorted_commands = sorted(commands, key=attrgetter('delivery_date'))
@@ -414,8 +528,14 @@ class TruckLoadingOptimizer:
             for date, group in groupby(sorted_commands, key=attrgetter('delivery_date'))
         }
 
-    def _group_by_route_compatibility(self, commands: List['Command']) -> List[List['Command']]:
-        """Group commands by route compatibility using a simple distance-based approach."""
+    def _group_by_route_compatibility(self, commands: List['Command'],
+                                      deadline: Optional[float] = None) -> List[List['Command']]:
+        """
+        Group commands by route compatibility using a simple distance-based approach.
+
+        Past the deadline no more distances are requested: unknown pairs are
+        treated as incompatible.
+        """
         if not commands:
             return []
 
@@ -425,7 +545,11 @@ class TruckLoadingOptimizer:
         # Calculate distances between all pairs
         distances = {}
         for i, dest1 in enumerate(destinations):
+            if self._deadline_passed(deadline):
+                break
             for dest2 in destinations[i+1:]:
+                if self._deadline_passed(deadline):
+                    break
                 dist = get_route_distance([dest1], [dest2])[0]
                 distances[(dest1, dest2)] = dist
                 distances[(dest2, dest1)] = dist
@@ -456,14 +580,28 @@ class TruckLoadingOptimizer:
     def _optimize_truck_assignment(
         self,
         commands: List['Command'],
-        available_trucks: List['Camion']
+        available_trucks: List['Camion'],
+        options: Optional[LoadingOptions] = None,
+        fleet: Optional[FleetMatrix] = None,
+        deadline: Optional[float] = None
     ) -> Dict[int, List['Palette']]:
-        """Optimize assignment of palettes to trucks."""
+        """
+        Optimize assignment of palettes to trucks.
+
+        Feasibility (bounds prefilter) and fit scores of every (group, truck)
+        pair are computed at once on the fleet matrix, built from
+        available_trucks unless given. A truck carries a single palette group:
+        the trucks already assigned are masked out before choosing.
+
+        The greedy assignment is always computed. With options.exact_assignment
+        it seeds a CP-SAT model (see assignment.solve_truck_assignment), whose
+        solution replaces it when it places more palettes, or as many for a
+        lower transport cost; on timeout without a solution the greedy
+        assignment is kept. The solver never runs past `deadline`.
+        """
+        options = options or LoadingOptions()
         # Sort trucks by cost efficiency
-        sorted_trucks = sorted(
-            available_trucks,
-            key=lambda t: t.transport_cost / t.specifications['volume']
-        )
+        fleet = (fleet or FleetMatrix(available_trucks)).by_cost_efficiency()
         
         # Group palettes by product type and temperature requirements
         palette_groups = self._group_palettes_by_constraints(
@@ -471,130 +609,939 @@ class TruckLoadingOptimizer:
         )
         
         assignments = {}
-        
-        for group in palette_groups:
-            # Find suitable trucks for this group
-            suitable_trucks = self._find_suitable_trucks(group, sorted_trucks)
+        self.truck_rejections = []
+        self.unassigned_palettes = []
+        
+        # Suitable trucks and fit scores for all groups
+        bounds = [compute_load_bounds(group, self.product_constraints) for group in palette_groups]
+        reasons = fleet.reject_reasons(bounds)
+        scores = fleet.fit_scores([b.total_volume for b in bounds], [b.total_weight for b in bounds])
+        carriable = None
+        
+        for g, group in enumerate(palette_groups):
+            suitable = reasons[g] < 0
+            self.truck_rejections.extend(
+                {'palette_ids': [p.id for p in group], 'truck_id': fleet.trucks[t].id,
+                 'reason': REJECT_ORDER[reasons[g, t]].value}
+                for t in np.flatnonzero(~suitable)
+            )
             
-            if not suitable_trucks:
-                continue
-                
-            # Try to fit in single truck first
-            best_truck = self._find_best_fitting_truck(group, suitable_trucks)
+            # Try to fit in single truck first, among the trucks no other group uses
+            # (neither their remaining capacity nor the compatibility with their load is known here)
+            taken = np.array([truck.id in assignments for truck in fleet.trucks], dtype=bool)
+            best = fleet.best(scores[g], suitable & ~taken)
             
-            if best_truck:
-                assignments[best_truck.id] = assignments.get(best_truck.id, []) + group
+            if best is not None:
+                assignments[fleet.trucks[best].id] = list(group)
             else:
-                # Split between multiple trucks if necessary
-                self._split_between_trucks(group, suitable_trucks, assignments)
+                # Split between the trucks that can carry each palette of the group
+                if carriable is None:
+                    carriable = self._carriable_trucks(palette_groups, fleet)
+                self.unassigned_palettes.extend(
+                    self._split_between_trucks(group, fleet.take(np.flatnonzero(carriable[g])), assignments)
+                )
+        
+        if options.exact_assignment:
+            return self._exact_truck_assignment(palette_groups, fleet, assignments, options, deadline)
                 
         return assignments
 
+    def _exact_truck_assignment(
+        self,
+        palette_groups: List[List['Palette']],
+        fleet: FleetMatrix,
+        greedy: Dict[int, List['Palette']],
+        options: LoadingOptions,
+        deadline: Optional[float] = None
+    ) -> Dict[int, List['Palette']]:
+        """
+        Affectation exacte (CP-SAT) des groupes de palettes, la gloutonne en repli.
+
+        Un camion est admis pour un groupe s'il peut porter chacune de ses
+        palettes (préfiltre appliqué palette par palette) : le solveur répartit
+        lui-même un groupe trop gros pour un seul camion. Deux groupes dont des
+        types ne peuvent pas voyager ensemble sont en conflit. La gloutonne
+        n'est reprise (indice du solveur, repli, référence) que si chacun de
+        ses camions est faisable ; sinon ses camions infaisables sont écartés
+        et l'indice abandonné. La solution du solveur n'est retenue que si elle
+        place plus de palettes que la gloutonne, ou autant pour un coût
+        strictement inférieur. Les palettes hors de l'affectation retenue vont
+        dans self.unassigned_palettes. Le solveur dispose de
+        options.assignment_time_limit, borné par l'échéance, et n'est pas lancé
+        s'il ne reste plus de temps ou si OR-Tools n'est pas installé.
+        """
+        if not solver_available():
+            print("Affectation exacte : OR-Tools non installé, affectation gloutonne conservée")
+            return greedy
+        time_limit = options.assignment_time_limit
+        if deadline is not None:
+            time_limit = min(time_limit, deadline - time.monotonic())
+            if time_limit <= 0:
+                print("Affectation exacte : échéance atteinte, affectation gloutonne conservée")
+                return greedy
+            
+        modeled = []
+        for group, eligible in zip(palette_groups, self._carriable_trucks(palette_groups, fleet)):
+            if eligible.any():
+                modeled.append((group, [fleet.trucks[t] for t in np.flatnonzero(eligible)]))
+        if not modeled:
+            return greedy
+        groups = [group for group, _ in modeled]
+        group_types = [{p.product.type for p in group} for group in groups]
+        conflicts = [
+            (g, h)
+            for g in range(len(groups))
+            for h in range(g + 1, len(groups))
+            if any(not self.compatibility.can_group(a, b) for a in group_types[g] for b in group_types[h])
+        ]
+
+        # Une gloutonne infaisable ne sert ni de point de départ ni de référence :
+        # seuls ses camions valides restent en repli
+        infeasible = self._infeasible_trucks(greedy, fleet)
+        if infeasible:
+            print(f"Affectation exacte : affectation gloutonne infaisable pour les camions {sorted(infeasible)}")
+            greedy = {truck_id: palettes for truck_id, palettes in greedy.items() if truck_id not in infeasible}
+            
+        result = solve_truck_assignment(
+            groups, [group_trucks for _, group_trucks in modeled], conflicts, time_limit,
+            hint=None if infeasible else greedy
+        )
+        if result is None:
+            print("Affectation exacte : aucune solution dans le temps imparti, affectation gloutonne conservée")
+            chosen = greedy
+        else:
+            exact, _ = result
+            palette_count = sum(len(group) for group in palette_groups)
+            if assignment_cost(exact, fleet.trucks, palette_count) < assignment_cost(greedy, fleet.trucks, palette_count):
+                chosen = exact
+            else:
+                chosen = greedy
+                
+        assigned = {id(palette) for palettes in chosen.values() for palette in palettes}
+        self.unassigned_palettes = [p for group in palette_groups for p in group if id(p) not in assigned]
+        return chosen
+
+    def _infeasible_trucks(self, assignments: Dict[int, List['Palette']], fleet: FleetMatrix) -> set:
+        """
+        Camions d'une affectation dont le chargement est infaisable : types qui ne
+        peuvent pas voyager ensemble, ou bornes du préfiltre (charge, volume,
+        places, température...) dépassées.
+        """
+        index = {truck.id: t for t, truck in enumerate(fleet.trucks)}
+        loads = [(truck_id, palettes) for truck_id, palettes in assignments.items() if palettes]
+        infeasible = {truck_id for truck_id, _ in loads if truck_id not in index}
+        loads = [(truck_id, palettes) for truck_id, palettes in loads if truck_id in index]
+        if not loads:
+            return infeasible
+            
+        reasons = fleet.take([index[truck_id] for truck_id, _ in loads]).reject_reasons(
+            [compute_load_bounds(palettes, self.product_constraints) for _, palettes in loads]
+        )
+        for i, (truck_id, palettes) in enumerate(loads):
+            types = {p.product.type for p in palettes}
+            if reasons[i, i] >= 0 or any(not self.compatibility.can_group(a, b) for a in types for b in types):
+                infeasible.add(truck_id)
+        return infeasible
+
+    def _carriable_trucks(self, palette_groups: List[List['Palette']], fleet: FleetMatrix) -> np.ndarray:
+        """
+        Camions (G, T) pouvant porter chacune des palettes d'un groupe, prises une à une.
+
+        Préfiltre évalué une fois par palette distincte (type, dimensions, poids,
+        produit) : ce sont les camions entre lesquels un groupe trop gros pour
+        un seul camion peut être réparti.
+        """
+        signature = lambda p: (getattr(p.palette_type, 'value', p.palette_type), p.length, p.width,
+                               p.height, p.weight, p.product.type)
+        rows = {}
+        for palette in (p for group in palette_groups for p in group):
+            rows.setdefault(signature(palette), (len(rows), palette))
+        carriable = fleet.reject_reasons([
+            compute_load_bounds([palette], self.product_constraints) for _, palette in rows.values()
+        ]) < 0
+        return np.array([
+            np.logical_and.reduce([carriable[rows[signature(p)][0]] for p in group])
+            for group in palette_groups
+        ]).reshape(len(palette_groups), len(fleet))
+
     def _optimize_loading_arrangement(
         self,
         palettes: List['Palette'],
-        truck: 'Camion'
+        truck: 'Camion',
+        options: Optional[LoadingOptions] = None,
+        deadline: Optional[float] = None
     ) -> Optional[LoadingSuggestion]:
-        """Optimize the physical arrangement of palettes in a truck."""
+        """
+        Optimize the physical arrangement of palettes in a truck.
+
+        With a plan cache, a load whose canonical signature was already solved
+        reuses the stored placements; only fully optimized plans are stored.
+        """
+        options = options or LoadingOptions()
+        
+        cache_key, canonical_palettes, plan = self._cached_arrangement(palettes, truck, options)
+        if plan is not None:
+            return plan
+        
         # Sort palettes by various criteria
         sorted_palettes = self._sort_palettes_for_loading(palettes)
         
+        plan = None
+        # Standard floor loads are solved by table lookup
+        if options.use_floor_patterns:
+            plan = self._arrange_from_floor_pattern(sorted_palettes, truck, options)
+        
+        if plan is None:
+            if options.starts > 1 and not self._deadline_passed(deadline):
+                plan = self._multi_start_arrangement(sorted_palettes, truck, options, deadline)
+            else:
+                plan = self._pack_palettes(sorted_palettes, truck, options, deadline)
+            
+        # Optional improvement phase within the caller's time budget
+        if plan and options.improvement_budget > 0:
+            budget = options.improvement_budget
+            if deadline is not None:
+                budget = min(budget, deadline - time.monotonic())
+            fully_optimized = plan.fully_optimized and budget >= options.improvement_budget
+            if budget > 0:
+                plan = self._improve_plan(plan, palettes, truck, options, budget)
+            plan.fully_optimized = fully_optimized
+            
+        self._store_arrangement(cache_key, canonical_palettes, plan)
+        return plan
+
+    def _cached_arrangement(
+        self,
+        palettes: List['Palette'],
+        truck: 'Camion',
+        options: LoadingOptions
+    ) -> Tuple[Optional[str], Optional[List['Palette']], Optional[LoadingSuggestion]]:
+        """
+        Look the load up in the plan cache: (key, canonical palettes, cached plan or None).
+
+        Palettes of one weight bucket share a signature, so a hit may put a
+        heavier palette on a lighter one: the rebuilt plan is validated against
+        the actual palettes and treated as a miss when it fails.
+        """
+        if self.plan_cache is None:
+            return None, None, None
+        cache_key, canonical_palettes = canonical_signature(
+            palettes, truck, options, self.constraints_digest
+        )
+        placements = self.plan_cache.get(cache_key)
+        if placements is None or len(placements) != len(canonical_palettes):
+            return cache_key, canonical_palettes, None
+        plan = self._plan_from_placements(canonical_palettes, placements, truck, options)
+        if not self._is_plan_valid(plan.loaded_palettes, truck):
+            return cache_key, canonical_palettes, None
+        return cache_key, canonical_palettes, plan
+
+    def _store_arrangement(
+        self,
+        cache_key: Optional[str],
+        canonical_palettes: Optional[List['Palette']],
+        plan: Optional[LoadingSuggestion]
+    ):
+        """Store a fully optimized plan under its cache key."""
+        if cache_key is None or not plan or not plan.fully_optimized:
+            return
+        position_by_id = {lp.palette_id: lp.position for lp in plan.loaded_palettes}
+        self.plan_cache.put(cache_key, [
+            (position_by_id[p.id].x, position_by_id[p.id].y, position_by_id[p.id].z,
+             position_by_id[p.id].rotation)
+            for p in canonical_palettes
+        ])
+
+    def _plan_from_placements(
+        self,
+        palettes: List['Palette'],
+        placements: List[Tuple[float, float, float, int]],
+        truck: 'Camion',
+        options: LoadingOptions
+    ) -> LoadingSuggestion:
+        """
+        Rebuild a suggestion from cached placements, matched to the palettes by position in the list.
+
+        The placements are replayed into a loading state of this truck, so the
+        scores are those of a freshly computed plan.
+        """
+        state = self._initialize_loading_state(truck, options)
+        for palette, (x, y, z, rotation) in zip(palettes, placements):
+            self._place_palette(state, self._make_loaded_palette(palette, Position3D(x=x, y=y, z=z, rotation=rotation)))
+        return self._build_loading_suggestion(state, truck)
+
+    def update_loading_plan(
+        self,
+        plan: LoadingSuggestion,
+        truck: 'Camion',
+        palettes: List['Palette'],
+        removed_ids: Optional[List[int]] = None,
+        added_palettes: Optional[List['Palette']] = None,
+        options: Optional[LoadingOptions] = None,
+        deadline: Optional[float] = None
+    ) -> Optional[LoadingSuggestion]:
+        """
+        Repair an existing plan after palettes were removed and/or added.
+
+        `palettes` are the Palette objects of `plan`. The untouched palettes keep
+        their positions; only the palettes stacked on a removed one lose their
+        support and are placed again, together with the added palettes, in the
+        space left free. When this local repair fails, the whole load is
+        arranged again from scratch.
+        """
+        options = options or LoadingOptions()
+        removed = set(removed_ids or [])
+        added_palettes = list(added_palettes or [])
+        palettes_by_id = {palette.id: palette for palette in palettes}
+        
+        planned_ids = {lp.palette_id for lp in plan.loaded_palettes}
+        if not removed <= planned_ids:
+            raise ValueError(f"Palettes absentes du plan: {sorted(removed - planned_ids)}")
+        if not planned_ids <= set(palettes_by_id):
+            raise ValueError(f"Palettes du plan non fournies: {sorted(planned_ids - set(palettes_by_id))}")
+            
+        lifted = self._unsupported_palettes(plan.loaded_palettes, removed)
+        kept = [lp for lp in plan.loaded_palettes if lp.palette_id not in removed and lp.palette_id not in lifted]
+        to_place = self._sort_palettes_for_loading(
+            [palettes_by_id[palette_id] for palette_id in lifted] + added_palettes
+        ) if lifted or added_palettes else []
+        
+        state = self._initialize_loading_state(truck, options)
+        for loaded_palette in kept:
+            self._place_palette(state, loaded_palette)
+            
+        first_fit = False
+        for palette in to_place:
+            first_fit = first_fit or self._deadline_passed(deadline)
+            position = self._find_optimal_position(palette, state, truck, first_fit, options)
+            if position is None:
+                # Réparation locale impossible : reconstruction complète
+                remaining = [palettes_by_id[lp.palette_id] for lp in plan.loaded_palettes
+                             if lp.palette_id not in removed]
+                return self._optimize_loading_arrangement(remaining + added_palettes, truck, options, deadline)
+            self._place_palette(state, self._make_loaded_palette(palette, position))
+            
+        repaired = self._build_loading_suggestion(state, truck)
+        repaired.fully_optimized = plan.fully_optimized and not first_fit
+        return repaired
+
+    @staticmethod
+    def _unsupported_palettes(loaded_palettes: List[LoadedPalette], removed: set) -> set:
+        """
+        Ids of the palettes resting, directly or not, on a removed palette.
+
+        Scanned bottom-up: a palette is lifted when its footprint overlaps a
+        removed or lifted palette whose top is at or below its base.
+        """
+        eps = 1e-6
+        gone = [lp for lp in loaded_palettes if lp.palette_id in removed]
+        lifted = set()
+        for lp in sorted(loaded_palettes, key=lambda p: p.position.z):
+            if lp.palette_id in removed:
+                continue
+            x, y, z = lp.position.x, lp.position.y, lp.position.z
+            for other in gone:
+                if (z >= other.position.z + other.dimensions['height'] - eps and
+                    x < other.position.x + other.dimensions['length'] - eps and
+                    other.position.x < x + lp.dimensions['length'] - eps and
+                    y < other.position.y + other.dimensions['width'] - eps and
+                    other.position.y < y + lp.dimensions['width'] - eps):
+                    lifted.add(lp.palette_id)
+                    gone.append(lp)
+                    break
+        return lifted
+
+    def _is_plan_valid(self, loaded_palettes: List[LoadedPalette], truck: 'Camion') -> bool:
+        """
+        Check a whole plan: every palette inside the truck, no overlap, resting on
+        the floor or on another palette, and never on a lighter one.
+        """
+        if not loaded_palettes:
+            return True
+        origins, sizes, weights = palettes_to_arrays(loaded_palettes)
+        tops = origins + sizes
+        dimensions = self._get_truck_dimensions(truck)
+        limits = np.array([dimensions['length'], dimensions['width'], dimensions['height']])
+        if (origins < -EPSILON).any() or (tops > limits + EPSILON).any():
+            return False
+            
+        # Chevauchement par axe pour chaque couple (palette i, palette j)
+        overlap = ((origins[:, None, :] < tops[None, :, :] - EPSILON) &
+                   (tops[:, None, :] > origins[None, :, :] + EPSILON))
+        horizontal = overlap[..., 0] & overlap[..., 1]
+        np.fill_diagonal(horizontal, False)
+        if (horizontal & overlap[..., 2]).any():
+            return False
+            
+        # below[i, j] : la palette j est directement sous la palette i
+        below = horizontal & (np.abs(tops[None, :, 2] - origins[:, None, 2]) < EPSILON)
+        supported = (origins[:, 2] <= EPSILON) | below.any(axis=1)
+        heavier_on_lighter = (below & (weights[None, :] < weights[:, None])).any()
+        return bool(supported.all()) and not heavier_on_lighter
+
+    @staticmethod
+    def _deadline_passed(deadline: Optional[float]) -> bool:
+        """True when a deadline (time.monotonic() value) is set and has passed."""
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _pack_palettes(
+        self,
+        ordered_palettes: List['Palette'],
+        truck: 'Camion',
+        options: LoadingOptions,
+        deadline: Optional[float] = None
+    ) -> Optional[LoadingSuggestion]:
+        """
+        Greedy placement of the palettes in the given order.
+
+        Once the deadline has passed, the remaining palettes take the first
+        feasible position instead of the best scored one.
+        """
         # Initialize 3D space representation
-        truck_space = self._initialize_truck_space(truck)
-        loaded_palettes = []
+        state = self._initialize_loading_state(truck, options)
+        first_fit = False
         
-        for palette in sorted_palettes:
-            position = self._find_optimal_position(
-                palette,
-                truck_space,
-                loaded_palettes,
-                truck
-            )
+        for palette in ordered_palettes:
+            first_fit = first_fit or self._deadline_passed(deadline)
+            position = self._find_optimal_position(palette, state, truck, first_fit, options)
             
             if position:
-                loaded_palette = LoadedPalette(
-                    palette_id=palette.id,
-                    position=position,
-                    weight=palette.weight,
-                    dimensions=self._get_palette_dimensions(palette),
-                    product_type=palette.product.type,
-                    destination=palette.command.destination,
-                    is_rotated=position.rotation == 90
-                )
-                loaded_palettes.append(loaded_palette)
-                self._update_truck_space(truck_space, loaded_palette)
+                self._place_palette(state, self._make_loaded_palette(palette, position))
             else:
                 return None  # Loading arrangement not possible
                 
+        plan = self._build_loading_suggestion(state, truck)
+        plan.fully_optimized = not first_fit
+        return plan
+
+    def _multi_start_arrangement(
+        self,
+        sorted_palettes: List['Palette'],
+        truck: 'Camion',
+        options: LoadingOptions,
+        deadline: Optional[float] = None
+    ) -> Optional[LoadingSuggestion]:
+        """
+        Lance le placement glouton sur plusieurs ordres de palettes en parallèle
+        et garde le meilleur plan complet.
+        """
+        orderings = self._palette_orderings(sorted_palettes, options.starts, options.seed,
+                                           options.symmetry_breaking)
+        plans = map_in_processes(
+            _pack_ordering,
+            [(self, ordering, truck, options, deadline) for ordering in orderings],
+            options.max_workers
+        )
+        
+        best_plan = None
+        best_score = float('-inf')
+        for plan in plans:
+            if plan is None:
+                continue
+            score = self._plan_objective(plan, truck)
+            if score > best_score:
+                best_plan, best_score = plan, score
+                
+        # Un départ interrompu par l'échéance rend la recherche incomplète
+        if best_plan and not all(plan is None or plan.fully_optimized for plan in plans):
+            best_plan.fully_optimized = False
+        return best_plan
+
+    def _palette_orderings(self, sorted_palettes: List['Palette'], count: int, seed: int = 0,
+                           merge_identical: bool = False) -> List[List['Palette']]:
+        """
+        Génère `count` ordres de chargement distincts : l'ordre pondéré habituel,
+        puis par poids, par volume, non fragiles d'abord, et des variantes
+        aléatoires de l'ordre pondéré (égalités et scores proches permutés).
+
+        Avec `merge_identical`, deux ordres qui ne diffèrent que par la permutation
+        de palettes identiques (même plan, aux identifiants près) ne comptent qu'une fois.
+        """
+        def fragility(palette):
+            return self.product_constraints[palette.product.type].fragility
+        
+        if merge_identical:
+            signatures = {
+                id(p): palette_signature(p.length, p.width, p.height, p.weight,
+                                         p.product.type, p.command.destination)
+                for p in sorted_palettes
+            }
+            def ordering_key(ordering):
+                return tuple(signatures[id(p)] for p in ordering)
+        else:
+            def ordering_key(ordering):
+                return tuple(id(p) for p in ordering)
+        
+        candidates = [
+            sorted_palettes,
+            sorted(sorted_palettes, key=lambda p: -p.weight),
+            sorted(sorted_palettes, key=lambda p: -p.volume),
+            sorted(sorted_palettes, key=lambda p: (fragility(p), -p.weight)),
+        ]
+        
+        orderings, seen = [], set()
+        for ordering in candidates:
+            key = ordering_key(ordering)
+            if key not in seen and len(orderings) < count:
+                seen.add(key)
+                orderings.append(ordering)
+                
+        rng = random.Random(seed)
+        attempts = 0
+        while len(orderings) < count and attempts < 10 * count:
+            attempts += 1
+            # Rang perturbé : une palette peut avancer ou reculer de quelques places
+            ranks = {id(p): i + rng.uniform(-2, 2) for i, p in enumerate(sorted_palettes)}
+            ordering = sorted(sorted_palettes, key=lambda p: ranks[id(p)])
+            key = ordering_key(ordering)
+            if key not in seen:
+                seen.add(key)
+                orderings.append(ordering)
+                
+        return orderings
+
+    def _improve_plan(
+        self,
+        plan: LoadingSuggestion,
+        palettes: List['Palette'],
+        truck: 'Camion',
+        options: LoadingOptions,
+        budget: float
+    ) -> LoadingSuggestion:
+        """
+        Phase d'amélioration « ruin and recreate » bornée dans le temps.
+
+        À chaque itération, une partie du plan est retirée (toutes les palettes
+        au-delà d'une abscisse tirée au hasard, ou un sous-ensemble aléatoire),
+        avec les palettes qui reposaient dessus, puis replacée par le moteur de
+        placement. Le nouveau plan est gardé s'il est valide (_is_plan_valid) et
+        améliore _plan_objective. S'arrête après `budget` secondes.
+        """
+        if not plan.loaded_palettes:
+            # Rien à ruiner
+            return plan
+            
+        deadline = time.perf_counter() + budget
+        palettes_by_id = {palette.id: palette for palette in palettes}
+        rng = random.Random(options.seed)
+        
+        best_plan = plan
+        best_score = self._plan_objective(plan, truck)
+        
+        while time.perf_counter() < deadline:
+            loaded = best_plan.loaded_palettes
+            if rng.random() < 0.5:
+                # Ruine d'une région : tout ce qui dépasse une abscisse
+                occupied_length = max(lp.position.x + lp.dimensions['length'] for lp in loaded)
+                cut = rng.uniform(0, occupied_length)
+                removed = [lp for lp in loaded if lp.position.x + lp.dimensions['length'] > cut]
+            else:
+                # Ruine aléatoire d'environ un tiers des palettes
+                removed = [lp for lp in loaded if rng.random() < 0.3]
+            if not removed:
+                continue
+                
+            removed_ids = {lp.palette_id for lp in removed}
+            # Les palettes posées sur une palette retirée perdent leur appui : retirées aussi
+            removed_ids |= self._unsupported_palettes(loaded, removed_ids)
+            removed = [lp for lp in loaded if lp.palette_id in removed_ids]
+            kept = [lp for lp in loaded if lp.palette_id not in removed_ids]
+            
+            candidate = self._recreate_plan(
+                kept,
+                [palettes_by_id[lp.palette_id] for lp in removed],
+                truck,
+                options,
+                rng,
+                deadline
+            )
+            if candidate is None or not self._is_plan_valid(candidate.loaded_palettes, truck):
+                continue
+                
+            score = self._plan_objective(candidate, truck)
+            if score > best_score:
+                best_plan, best_score = candidate, score
+                
+        return best_plan
+
+    def _recreate_plan(
+        self,
+        kept: List[LoadedPalette],
+        removed: List['Palette'],
+        truck: 'Camion',
+        options: LoadingOptions,
+        rng: random.Random,
+        deadline: float
+    ) -> Optional[LoadingSuggestion]:
+        """Reconstruit l'état avec les palettes gardées puis replace les palettes retirées."""
+        state = self._initialize_loading_state(truck, options)
+        # Rejouer du bas vers le haut pour que les points extrêmes restent cohérents
+        for loaded_palette in sorted(kept, key=lambda lp: (lp.position.z, lp.position.x, lp.position.y)):
+            self._place_palette(state, loaded_palette)
+            
+        # Ordre pondéré, légèrement perturbé une fois sur deux
+        ordering = self._sort_palettes_for_loading(removed)
+        if rng.random() < 0.5:
+            ranks = {id(p): i + rng.uniform(-2, 2) for i, p in enumerate(ordering)}
+            ordering.sort(key=lambda p: ranks[id(p)])
+            
+        for palette in ordering:
+            if time.perf_counter() >= deadline:
+                return None
+            position = self._find_optimal_position(palette, state, truck, options=options)
+            if not position:
+                return None
+            self._place_palette(state, self._make_loaded_palette(palette, position))
+            
+        return self._build_loading_suggestion(state, truck)
+
+    def _plan_objective(self, plan: LoadingSuggestion, truck: 'Camion') -> float:
+        """
+        Score global d'un plan : utilisation, répartition du poids et compacité
+        (part de la longueur laissée libre à l'arrière).
+        """
+        truck_length = self._get_truck_dimensions(truck)['length']
+        occupied_length = max(
+            (lp.position.x + lp.dimensions['length'] for lp in plan.loaded_palettes),
+            default=0.0
+        )
+        compactness = 1 - occupied_length / truck_length
+        return (0.4 * plan.space_utilization +
+                0.4 * plan.weight_distribution_score +
+                0.2 * compactness)
+
+    def _arrange_from_floor_pattern(
+        self,
+        sorted_palettes: List['Palette'],
+        truck: 'Camion',
+        options: LoadingOptions
+    ) -> Optional[LoadingSuggestion]:
+        """
+        Place a single-layer EUR/US load from the precomputed floor patterns.
+
+        Returns None (generic 3D search) when the mix is not in the table, a palette
+        is not a standard footprint, does not fit in height, is incompatible with
+        the others, or is not rotatable and no unrotated slot is left for it.
+        """
+        state = self._initialize_loading_state(truck, options)
+        
+        counts = {palette_type: 0 for palette_type in PALETTE_FOOTPRINTS}
+        for palette in sorted_palettes:
+            palette_type = getattr(palette.palette_type, 'value', palette.palette_type)
+            dims = self._get_palette_dimensions(palette)
+            if (palette_type not in PALETTE_FOOTPRINTS or
+                (round(dims['length'], 3), round(dims['width'], 3)) != PALETTE_FOOTPRINTS[palette_type] or
+                dims['height'] > self.truck_dimensions['height']):
+                return None
+            counts[palette_type] += 1
+            
+        pattern = lookup_floor_pattern(truck.type_camion, counts)
+        if pattern is None:
+            return None
+            
+        # Emplacements libres par type, de l'avant vers l'arrière
+        free_slots = {palette_type: [] for palette_type in PALETTE_FOOTPRINTS}
+        for palette_type, x, y, rotation in sorted(pattern.slots, key=lambda slot: (slot[1], slot[2])):
+            free_slots[palette_type].append((x, y, rotation))
+            
+        # Les palettes non rotatives d'abord, sur les emplacements non tournés
+        ordered = sorted(
+            sorted_palettes,
+            key=lambda p: self.product_constraints[p.product.type].rotatable
+        )
+        for palette in ordered:
+            if not self._check_product_compatibility(palette, state.incompatible_mask):
+                return None
+                
+            slots = free_slots[getattr(palette.palette_type, 'value', palette.palette_type)]
+            if not self.product_constraints[palette.product.type].rotatable:
+                slots_allowed = [slot for slot in slots if slot[2] == 0]
+            else:
+                slots_allowed = slots
+            if not slots_allowed:
+                return None
+                
+            slot = slots_allowed[0]
+            slots.remove(slot)
+            x, y, rotation = slot
+            self._place_palette(state, self._make_loaded_palette(palette, Position3D(x=x, y=y, z=0.0, rotation=rotation)))
+            
+        return self._build_loading_suggestion(state, truck)
+
+    def _initialize_loading_state(self, truck: 'Camion', options: LoadingOptions) -> LoadingState:
+        """Create the loading state (space model, index, extreme points, running totals)."""
+        if options.candidate_mode not in CANDIDATE_MODES:
+            raise ValueError(f"Mode de génération des candidats inconnu: {options.candidate_mode}")
+        if not options.resolutions or any(
+            r <= 0 for r in options.resolutions
+        ) or list(options.resolutions) != sorted(options.resolutions, reverse=True):
+            raise ValueError(f"Résolutions invalides (positives, de la plus grossière à la plus fine): {options.resolutions}")
+            
+        self.truck_dimensions = self._get_truck_dimensions(truck)
+        state = LoadingState(
+            self._initialize_truck_space(truck, options.space_mode, self._space_resolution(options.resolutions)),
+            self.truck_dimensions,
+            self.compatibility
+        )
+        if options.candidate_mode == 'grid':
+            # Pas de points extrêmes : candidats sur la grille (multi-résolution)
+            state.extreme_points = None
+        if options.profile_constraints:
+            state.profiler = ConstraintProfiler()
+        return state
+
+    @staticmethod
+    def _space_resolution(resolutions: Tuple[float, ...]) -> float:
+        """
+        Cellule du modèle d'espace pour les pas de grille donnés.
+
+        Le modèle d'espace arrondit les coordonnées à la cellule la plus proche :
+        chaque pas doit en être un multiple entier, sans quoi deux palettes
+        voisines sur la grille se recouvrent dans le camion. La cellule retenue
+        est la plus grossière parmi le pas le plus fin (10 cm au plus) et ses
+        divisions par 2, 3 et 4 ; des pas sans diviseur commun parmi elles sont refusés.
+        """
+        finest = min(resolutions[-1], 0.1)
+        for divisor in range(1, 5):
+            cell = finest / divisor
+            if all(abs(r / cell - round(r / cell)) < 1e-6 for r in resolutions):
+                return cell
+        raise ValueError(f"Résolutions sans cellule commune d'au moins {finest / 4:g} m: {resolutions}")
+
+    def _make_loaded_palette(self, palette: 'Palette', position: Position3D) -> LoadedPalette:
+        """Build the LoadedPalette record of a placed palette."""
+        return LoadedPalette(
+            palette_id=palette.id,
+            position=position,
+            weight=palette.weight,
+            dimensions=self._get_rotated_dimensions(palette, position.rotation),
+            product_type=palette.product.type,
+            destination=palette.command.destination,
+            is_rotated=position.rotation == 90
+        )
+
+    def _place_palette(self, state: LoadingState, loaded_palette: LoadedPalette):
+        """Commit a placement: totals and index, space model, extreme points."""
+        state.add(loaded_palette)
+        self._update_truck_space(state.truck_space, loaded_palette)
+        if state.extreme_points is not None:
+            started = time.perf_counter_ns()
+            self._update_extreme_points(state.extreme_points, loaded_palette, state.store)
+            if state.profiler is not None:
+                state.profiler.record('candidate_generation', time.perf_counter_ns() - started)
+
+    def _build_loading_suggestion(self, state: LoadingState, truck: 'Camion') -> LoadingSuggestion:
+        """Build the final suggestion from the running totals of the state."""
         # Calculate metrics
-        weight_score = self._calculate_weight_distribution_score(loaded_palettes)
-        space_score = self._calculate_space_utilization(loaded_palettes, truck)
+        if len(state):
+            weight_score = self._center_of_gravity_score(*state.center_of_gravity())
+        else:
+            weight_score = 1.0
+        space_score = state.used_volume / truck.specifications['volume']
         
         return LoadingSuggestion(
             truck_id=truck.id,
-            loaded_palettes=loaded_palettes,
+            loaded_palettes=state.store.to_loaded_palettes(),
             weight_distribution_score=weight_score,
             space_utilization=space_score,
-            estimated_cost=truck.transport_cost
+            estimated_cost=truck.transport_cost,
+            constraint_stats=state.profiler.as_dict() if state.profiler is not None else None
         )
 
     def _find_optimal_position(
         self,
         palette: 'Palette',
-        truck_space: np.ndarray,
-        loaded_palettes: List[LoadedPalette],
-        truck: 'Camion'
+        state: LoadingState,
+        truck: 'Camion',
+        first_fit: bool = False,
+        options: Optional[LoadingOptions] = None
     ) -> Optional[Position3D]:
-        """Find optimal position for a palette considering all constraints."""
+        """
+        Find optimal position for a palette considering all constraints.
+
+        Only the extreme points of the state are tried. A state without extreme
+        points is searched on the grid, coarse to fine (options.resolutions).
+        With `first_fit`, the first feasible candidate is returned without scoring.
+        """
+        options = options or LoadingOptions()
         dimensions = self._get_palette_dimensions(palette)
         constraints = self.product_constraints[palette.product.type]
         
-        # Try both orientations if allowed
+        # Try both orientations if allowed (a square footprint has only one)
         orientations = [(0, dimensions)]
-        if constraints.rotatable:
-            orientations.append((
-                90,
-                {
-                    'length': dimensions['width'],
-                    'width': dimensions['length'],
-                    'height': dimensions['height']
-                }
-            ))
+        if constraints.rotatable and abs(dimensions['length'] - dimensions['width']) > 1e-9:
+            orientations.append((90, self._get_rotated_dimensions(palette, 90)))
             
         best_position = None
         best_score = float('-inf')
         
+        # La compatibilité ne dépend pas de la position : une seule vérification
+        started = time.perf_counter_ns()
+        compatible = self._check_product_compatibility(palette, state.incompatible_mask)
+        if state.profiler is not None:
+            state.profiler.record('compatibility', time.perf_counter_ns() - started, 1, int(not compatible))
+        if not compatible:
+            return None
+        loaded_arrays = state.store.arrays()
+        
         for rotation, dims in orientations:
-            # Get all possible positions
-            positions = self._generate_possible_positions(truck_space, dims)
-            
-            for pos in positions:
-                if self._is_position_valid(pos, dims, palette, loaded_palettes):
-                    score = self._evaluate_position(
-                        pos,
-                        dims,
-                        palette,
-                        loaded_palettes,
-                        truck
+            if state.extreme_points is None:
+                found = self._multi_resolution_search(palette, dims, state, truck, loaded_arrays,
+                                                      options, first_fit)
+                if found is None:
+                    continue
+                score, pos = found
+                if first_fit:
+                    return Position3D(x=pos[0], y=pos[1], z=pos[2], rotation=rotation)
+                if score > best_score:
+                    best_score = score
+                    best_position = Position3D(x=pos[0], y=pos[1], z=pos[2], rotation=rotation)
+                continue
+                
+            positions = state.extreme_points
+            valid = self._batch_position_validity(positions, dims, palette, loaded_arrays, state.truck_space,
+                                                  state.profiler, state.spatial_index)
+            # Les points projetés le long de x ou y gardent leur hauteur : rien ne garantit un appui
+            valid &= self._supported_mask(positions, dims, state)
+            
+            if first_fit:
+                feasible = np.flatnonzero(valid)
+                if len(feasible):
+                    x, y, z = positions[feasible[0]]
+                    return Position3D(x=x, y=y, z=z, rotation=rotation)
+                continue
+            
+            valid_positions = [positions[i] for i in np.flatnonzero(valid)]
+            if options.symmetry_breaking:
+                valid_positions = self._break_symmetries(valid_positions, dims, palette, state,
+                                                         options.identical_palettes_forward)
+            
+            for score, i in self._score_positions(valid_positions, dims, palette, state, truck, 1, best_score):
+                pos = valid_positions[i]
+                if score > best_score:
+                    best_score = score
+                    best_position = Position3D(
+                        x=pos[0],
+                        y=pos[1],
+                        z=pos[2],
+                        rotation=rotation
                     )
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_position = Position3D(
-                            x=pos[0],
-                            y=pos[1],
-                            z=pos[2],
-                            rotation=rotation
-                        )
                         
         return best_position
 
+    def _break_symmetries(
+        self,
+        positions: List[Tuple[float, float, float]],
+        dimensions: Dict[str, float],
+        palette: 'Palette',
+        state: LoadingState,
+        identical_forward: bool = False
+    ) -> List[Tuple[float, float, float]]:
+        """
+        Drop feasible positions equivalent to others before scoring.
+
+        While the load is symmetric across the truck width, a position and its
+        mirror image only differ by the weight distribution term (the center of
+        gravity is taken on the palette corners), so only the one giving the
+        better center of gravity is kept, the first one on a tie. With
+        `identical_forward`, a palette identical to the previously placed one
+        (same footprint, height, weight, type and destination) only considers
+        positions from that placement onward, in (x, y, z) order, unless none is
+        left; this one is a heuristic and may lower the plan quality.
+        """
+        last = state.last_placed
+        if identical_forward and last is not None and last[0] == palette_signature(
+            palette.length, palette.width, palette.height, palette.weight,
+            palette.product.type, palette.command.destination
+        ):
+            later = [pos for pos in positions if pos >= last[1]]
+            if later:
+                positions = later
+                
+        if state.is_width_symmetric():
+            truck_width = self.truck_dimensions['width']
+            chosen = {}  # Paire miroir -> (écart du centre de gravité à l'axe, indice)
+            for i, (x, y, z) in enumerate(positions):
+                mirror_y = truck_width - y - dimensions['width']
+                pair = (round(x, 6), round(min(y, mirror_y), 6), round(z, 6))
+                cog = state.center_of_gravity(palette.weight, x, y)
+                offset = abs(cog[1] - truck_width / 2) if cog is not None else 0.0
+                if pair not in chosen or offset < chosen[pair][0]:
+                    chosen[pair] = (offset, i)
+            positions = [positions[i] for i in sorted(i for _, i in chosen.values())]
+            
+        return positions
+
+    def _score_positions(
+        self,
+        positions: List[Tuple[float, float, float]],
+        dimensions: Dict[str, float],
+        palette: 'Palette',
+        state: LoadingState,
+        truck: 'Camion',
+        keep: int = 1,
+        floor: float = float('-inf')
+    ) -> List[Tuple[float, int]]:
+        """
+        Exact scores (score, index) of the candidates that can rank in the top `keep`.
+
+        Branch and bound: the cheap terms (weight distribution, loading sequence,
+        space utilization) are computed for every candidate, and stability, which
+        is at most 1, is bounded by its maximum. Candidates are then scored in
+        decreasing bound order, in small batches, and the search stops as soon as
+        a bound cannot beat the keep-th best exact score (or `floor`, the best
+        score already found elsewhere). The result is ordered by index, so ties
+        are resolved as with a full scan.
+        """
+        count = len(positions)
+        profiler = state.profiler
+        started = time.perf_counter_ns()
+        partial = [
+            self._partial_position_score(pos, dimensions, palette, state, truck)
+            for pos in positions
+        ]
+        bounds = [score + STABILITY_WEIGHT * MAX_STABILITY for score in partial]
+        order = sorted(range(count), key=lambda i: -bounds[i])
+        scoring_ns = time.perf_counter_ns() - started
+        stability_ns = 0
+        
+        scored: List[Tuple[float, int]] = []
+        best: List[float] = []  # Tas des `keep` meilleurs scores exacts
+        for start in range(0, count, BOUND_BATCH):
+            threshold = best[0] if len(best) == keep else float('-inf')
+            batch = [i for i in order[start:start + BOUND_BATCH]
+                     if bounds[i] >= threshold and bounds[i] > floor]
+            if not batch:
+                break
+                
+            started = time.perf_counter_ns()
+            batch_positions = [positions[i] for i in batch]
+            stabilities = self._batch_stability(batch_positions, dimensions, state.store, state.spatial_index)
+            stability_ns += time.perf_counter_ns() - started
+                
+            for i, stability in zip(batch, stabilities):
+                score = partial[i] + STABILITY_WEIGHT * stability
+                scored.append((score, i))
+                if len(best) < keep:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+                    
+        if profiler is not None:
+            profiler.record('scoring', scoring_ns, count)
+            profiler.record('stability', stability_ns, len(scored))
+            profiler.record('bound_pruning', 0, count, count - len(scored))
+        scored.sort(key=lambda item: item[1])
+        return scored
+
     def _is_position_valid(
         self,
         position: Tuple[float, float, float],
         dimensions: Dict[str, float],
         palette: 'Palette',
-        loaded_palettes: List[LoadedPalette]
+        loaded_palettes: List[LoadedPalette],
+        truck_space: Optional[TruckSpace] = None,
+        spatial_index: Optional[SpatialIndex] = None
     ) -> bool:
         """Validate position against all constraints."""
         x, y, z = position
@@ -603,65 +1550,178 @@ class TruckLoadingOptimizer:
         if not self._is_within_bounds(position, dimensions):
             return False
             
+        # Only the palettes sharing the floor column can overlap, support or sit above
+        neighbours = self._neighbouring_palettes(position, dimensions, loaded_palettes, spatial_index)
+            
         # Check collisions
-        if self._has_collision(position, dimensions, loaded_palettes):
+        if self._has_collision(position, dimensions, neighbours, truck_space):
             return False
             
         # Check weight stacking
-        if not self._is_weight_stack_valid(position, dimensions, palette, loaded_palettes):
+        if not self._is_weight_stack_valid(position, dimensions, palette, neighbours):
             return False
             
         # Check fragility constraints
-        if not self._check_fragility_constraints(position, dimensions, palette, loaded_palettes):
+        if not self._check_fragility_constraints(position, dimensions, palette, neighbours):
             return False
             
         # Check product compatibility
-        if not self._check_product_compatibility(palette, loaded_palettes):
+        incompatible_mask = self.compatibility.combined_mask(lp.product_type for lp in loaded_palettes)
+        if not self._check_product_compatibility(palette, incompatible_mask):
             return False
             
         return True
 
+    def _neighbouring_palettes(
+        self,
+        position: Tuple[float, float, float],
+        dimensions: Dict[str, float],
+        loaded_palettes: List[LoadedPalette],
+        spatial_index: Optional[SpatialIndex] = None
+    ) -> List[LoadedPalette]:
+        """Palettes of the floor column above/below a footprint (all palettes without index)."""
+        if spatial_index is None:
+            return loaded_palettes
+        return spatial_index.column(position[0], position[1], dimensions['length'], dimensions['width'])
+
+    def _batch_position_validity(
+        self,
+        positions: List[Tuple[float, float, float]],
+        dimensions: Dict[str, float],
+        palette: 'Palette',
+        loaded_arrays: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        truck_space: Optional[TruckSpace | HeightMap] = None,
+        profiler: Optional[ConstraintProfiler] = None,
+        spatial_index: Optional[SpatialIndex] = None
+    ) -> np.ndarray:
+        """
+        Validate a batch of positions at once (bounds, collisions, stacking, fragility).
+
+        Vectorized equivalent of _is_position_valid, product compatibility excepted
+        since it does not depend on the position. When `truck_space` is given,
+        collisions are answered by the space model instead of pairwise tests
+        (and, for a height map, stacking as well). With a spatial index, the
+        pairwise tests only read the palettes of the floor columns covered by
+        the candidates. With a profiler, each rule is evaluated and timed on its own.
+        """
+        if not len(positions):
+            return np.zeros(0, dtype=bool)
+            
+        origins, sizes, weights = loaded_arrays
+        if spatial_index is not None:
+            # Toutes les règles exigent un chevauchement au sol : les autres colonnes sont sans effet
+            ids = spatial_index.neighbour_ids(positions, dimensions['length'], dimensions['width'])
+            origins, sizes, weights = origins[ids], sizes[ids], weights[ids]
+        constraints = self.product_constraints[palette.product.type]
+        size = (dimensions['length'], dimensions['width'], dimensions['height'])
+        arguments = (
+            positions,
+            size,
+            palette.weight,
+            constraints.fragility,
+            (self.truck_dimensions['length'],
+             self.truck_dimensions['width'],
+             self.truck_dimensions['height']),
+            origins,
+            sizes,
+            weights
+        )
+        check_collisions = truck_space is None
+        check_stacking = not isinstance(truck_space, HeightMap)
+        
+        if profiler is None:
+            mask = batch_feasibility_mask(*arguments, check_collisions=check_collisions,
+                                          check_stacking=check_stacking)
+            if truck_space is not None:
+                mask &= truck_space.free_mask(positions, size)
+            if isinstance(truck_space, HeightMap):
+                mask &= truck_space.stacking_mask(positions, size, palette.weight)
+            return mask
+            
+        rules = batch_constraint_masks(*arguments, check_collisions=check_collisions,
+                                       check_stacking=check_stacking)
+        # Règles déléguées au modèle d'espace
+        if truck_space is not None:
+            started = time.perf_counter_ns()
+            free = truck_space.free_mask(positions, size)
+            rules.append(('collision', free, time.perf_counter_ns() - started))
+        if isinstance(truck_space, HeightMap):
+            started = time.perf_counter_ns()
+            stacking = truck_space.stacking_mask(positions, size, palette.weight)
+            rules.append(('weight_stack', stacking, time.perf_counter_ns() - started))
+            
+        mask = np.ones(len(positions), dtype=bool)
+        for name, rule_mask, elapsed in rules:
+            profiler.record(name, elapsed, len(positions), len(positions) - int(np.count_nonzero(rule_mask)))
+            mask &= rule_mask
+        return mask
+
+    def _supported_mask(
+        self,
+        positions: List[Tuple[float, float, float]],
+        dimensions: Dict[str, float],
+        state: LoadingState
+    ) -> np.ndarray:
+        """Positions resting on the floor or on the load (no palette placed in mid-air)."""
+        if not len(positions):
+            return np.zeros(0, dtype=bool)
+        started = time.perf_counter_ns()
+        size = (dimensions['length'], dimensions['width'], dimensions['height'])
+        supported = state.truck_space.supported_mask(positions, size)
+        if state.profiler is not None:
+            state.profiler.record('support', time.perf_counter_ns() - started, len(positions),
+                                  len(positions) - int(np.count_nonzero(supported)))
+        return supported
+
     def _evaluate_position(
         self,
         position: Tuple[float, float, float],
         dimensions: Dict[str, float],
         palette: 'Palette',
-        loaded_palettes: List[LoadedPalette],
+        state: LoadingState,
+        truck: 'Camion',
+        stability: Optional[float] = None
+    ) -> float:
+        """Score a potential position based on multiple criteria (stability may be precomputed)."""
+        if stability is None:
+            stability = self._evaluate_stability(position, dimensions, state.store, state.spatial_index)
+        partial = self._partial_position_score(position, dimensions, palette, state, truck)
+        return partial + STABILITY_WEIGHT * stability
+
+    def _partial_position_score(
+        self,
+        position: Tuple[float, float, float],
+        dimensions: Dict[str, float],
+        palette: 'Palette',
+        state: LoadingState,
         truck: 'Camion'
     ) -> float:
-        """Score a potential position based on multiple criteria."""
-        scores = [
-            (0.3, self._evaluate_weight_distribution(position, palette, loaded_palettes)),
-            (0.3, self._evaluate_loading_sequence(position, palette, loaded_palettes)),
-            (0.2, self._evaluate_space_utilization(position, dimensions, truck)),
-            (0.2, self._evaluate_stability(position, dimensions, loaded_palettes))
-        ]
-        
-        return sum(weight * score for weight, score in scores)
+        """Weighted criteria of _evaluate_position except stability (all O(1))."""
+        return (0.3 * self._evaluate_weight_distribution(position, palette, state) +
+                0.3 * self._evaluate_loading_sequence(position, palette, state) +
+                0.2 * self._evaluate_space_utilization(position, dimensions, truck))
 
     def _evaluate_weight_distribution(
         self,
         position: Tuple[float, float, float],
         palette: 'Palette',
-        loaded_palettes: List[LoadedPalette]
+        state: LoadingState
     ) -> float:
         """Evaluate weight distribution balance."""
         x, y, z = position
         
-        # Calculate center of gravity
-        total_weight = palette.weight + sum(p.weight for p in loaded_palettes)
-        current_cog_x = sum(p.position.x * p.weight for p in loaded_palettes)
-        current_cog_y = sum(p.position.y * p.weight for p in loaded_palettes)
-        
-        new_cog_x = (current_cog_x + x * palette.weight) / total_weight
-        new_cog_y = (current_cog_y + y * palette.weight) / total_weight
-        
+        # Center of gravity from the running totals (O(1))
+        new_cog_x, new_cog_y = state.center_of_gravity(palette.weight, x, y)
+        return self._center_of_gravity_score(new_cog_x, new_cog_y)
+
+    def _center_of_gravity_score(self, cog_x: float, cog_y: float) -> float:
+        """Score between 0 and 1 of a center of gravity (1 = truck center)."""
         # Ideal center of gravity is in the middle
         ideal_x = self.truck_dimensions['length'] / 2
         ideal_y = self.truck_dimensions['width'] / 2
         
         # Calculate deviation from ideal
-        deviation = sqrt((new_cog_x - ideal_x)**2 + (new_cog_y - ideal_y)**2)
+        deviation = sqrt((cog_x - ideal_x)**2 + (cog_y - ideal_y)**2)
         max_deviation = sqrt((self.truck_dimensions['length']/2)**2 + 
                            (self.truck_dimensions['width']/2)**2)
         
@@ -671,10 +1731,19 @@ class TruckLoadingOptimizer:
         self,
         position: Tuple[float, float, float],
         palette: 'Palette',
-        loaded_palettes: List[LoadedPalette]
+        state: LoadingState
     ) -> float:
         """Evaluate position based on loading/unloading sequence."""
         x, _, _ = position
+        truck_length = self.truck_dimensions['length']
+        
+        # Regrouper les palettes d'une même destination
+        nearest = state.nearest_same_destination(palette.command.destination, x)
+        if nearest is not None:
+            return 1 - (nearest / truck_length)
+        
+        # Sinon, remplir depuis l'avant du camion
+        return 1 - (x / truck_length)
 
     def _group_palettes_by_constraints(self, palettes: List['Palette']) -> List[List['Palette']]:
         """
@@ -685,24 +1754,14 @@ class TruckLoadingOptimizer:
         
         while remaining_palettes:
             current_group = [remaining_palettes.pop(0)]
-            base_constraints = self.product_constraints[current_group[0].product.type]
-            base_temp_range = (base_constraints.min_temperature, base_constraints.max_temperature)
+            base_type = current_group[0].product.type
             
             i = 0
             while i < len(remaining_palettes):
                 palette = remaining_palettes[i]
-                constraints = self.product_constraints[palette.product.type]
                 
-                # Vérifier les incompatibilités
-                if (palette.product.type in base_constraints.incompatible_types or
-                    current_group[0].product.type in constraints.incompatible_types):
-                    i += 1
-                    continue
-                    
-                # Vérifier la compatibilité des températures
-                temp_range = (constraints.min_temperature, constraints.max_temperature)
-                if (temp_range[1] >= base_temp_range[0] and 
-                    base_temp_range[1] >= temp_range[0]):
+                # Incompatibilités et températures : une lecture des masques précompilés
+                if self.compatibility.can_group(base_type, palette.product.type):
                     current_group.append(palette)
                     remaining_palettes.pop(i)
                 else:
@@ -712,109 +1771,128 @@ class TruckLoadingOptimizer:
         
         return palette_groups
 
-    def _find_suitable_trucks(self, palettes: List['Palette'], available_trucks: List['Camion']) -> List['Camion']:
+    def _find_suitable_trucks(self, palettes: List['Palette'], available_trucks: List['Camion'],
+                              rejections: Optional[Dict[int, TruckRejectReason]] = None,
+                              fleet: Optional[FleetMatrix] = None) -> List['Camion']:
         """
         Trouve les camions adaptés pour un groupe de palettes.
+
+        Préfiltre par bornes (voir prefilter.check_truck_bounds, évalué sur la
+        matrice de la flotte) : les camions qui ne peuvent en aucun cas
+        contenir le groupe sont écartés sans recherche 3D, et leur motif est
+        noté dans `rejections` si fourni. Passer `fleet`, la matrice déjà
+        construite pour available_trucks, évite de la reconstruire à chaque appel.
         """
-        total_volume = sum(p.volume for p in palettes)
-        total_weight = sum(p.weight for p in palettes)
-        
-        # Déterminer les besoins en température
-        needs_temp_control = False
-        min_temp = float('inf')
-        max_temp = float('-inf')
-        
-        for palette in palettes:
-            constraints = self.product_constraints[palette.product.type]
-            if constraints.min_temperature is not None:
-                needs_temp_control = True
-                min_temp = min(min_temp, constraints.min_temperature)
-            if constraints.max_temperature is not None:
-                needs_temp_control = True
-                max_temp = max(max_temp, constraints.max_temperature)
+        if fleet is None:
+            fleet = FleetMatrix(available_trucks)
+        reasons = fleet.reject_reasons([compute_load_bounds(palettes, self.product_constraints)])[0]
         
         suitable_trucks = []
-        for truck in available_trucks:
-            specs = truck.specifications
-            
-            # Vérifier la capacité de base
-            if (specs['volume'] < total_volume or 
-                specs['charge_utile'] < total_weight):
-                continue
-                
-            # Vérifier les besoins en température
-            if needs_temp_control:
-                if not specs['frigo']:
-                    continue
-                if not (truck.temperature <= min_temp):
-                    continue
-                    
-            suitable_trucks.append(truck)
+        for truck, reason in zip(fleet.trucks, reasons):
+            if reason < 0:
+                suitable_trucks.append(truck)
+            elif rejections is not None:
+                rejections[truck.id] = REJECT_ORDER[reason]
         
         return suitable_trucks
 
-    def _find_best_fitting_truck(self, palettes: List['Palette'], trucks: List['Camion']) -> Optional['Camion']:
+    def _find_best_fitting_truck(self, palettes: List['Palette'], trucks: List['Camion'],
+                                 fleet: Optional[FleetMatrix] = None) -> Optional['Camion']:
         """
         Trouve le camion le plus adapté pour un groupe de palettes.
+
+        Score proche de 85 % d'utilisation en volume et en poids, pondéré par
+        le coût (voir FleetMatrix.fit_scores). `fleet` : matrice déjà construite
+        pour `trucks`, réutilisée d'un appel à l'autre.
         """
-        total_volume = sum(p.volume for p in palettes)
-        total_weight = sum(p.weight for p in palettes)
-        
-        best_truck = None
-        best_score = float('-inf')
-        
-        for truck in trucks:
-            # Calculer les ratios d'utilisation
-            volume_ratio = total_volume / truck.specifications['volume']
-            weight_ratio = total_weight / truck.specifications['charge_utile']
-            
-            # Le score optimal est proche de 0.85 (85% d'utilisation)
-            volume_score = 1 - abs(0.85 - volume_ratio)
-            weight_score = 1 - abs(0.85 - weight_ratio)
-            
-            # Inclure le coût de transport dans le score
-            cost_per_unit = truck.transport_cost / (truck.specifications['volume'] * truck.specifications['charge_utile'])
-            cost_score = 1 / (1 + cost_per_unit)  # Normaliser le score de coût
-            
-            # Score final pondéré
-            score = (0.4 * volume_score + 0.4 * weight_score + 0.2 * cost_score)
-            
-            if score > best_score and volume_ratio <= 1 and weight_ratio <= 1:
-                best_score = score
-                best_truck = truck
-        
-        return best_truck
+        if fleet is None:
+            fleet = FleetMatrix(trucks)
+        scores = fleet.fit_scores([sum(p.volume for p in palettes)], [sum(p.weight for p in palettes)])[0]
+        best = fleet.best(scores)
+        return None if best is None else fleet.trucks[best]
 
-    def _split_between_trucks(self, palettes: List['Palette'], trucks: List['Camion'], assignments: Dict[int, List['Palette']]):
+    def _split_between_trucks(self, palettes: List['Palette'], fleet: FleetMatrix,
+                              assignments: Dict[int, List['Palette']]) -> List['Palette']:
         """
         Répartit les palettes entre plusieurs camions si nécessaire.
+
+        First-fit décroissant : les palettes sont triées par encombrement
+        décroissant (part du plus grand volume ou de la plus grande charge de
+        la flotte), puis chacune va dans le premier camion ouvert, dans l'ordre
+        d'ouverture, qui peut encore la porter (volume, charge et places au
+        plancher de son type par couche empilable). Si aucun ne convient, le
+        premier camion libre de la flotte (triée par coût) qui peut la porter
+        est ouvert. Les camions déjà affectés à un autre groupe ne sont pas
+        utilisés. Camions ouverts et libres sont tenus dans deux arbres de
+        capacités (CapacityTree) : O(n log n + n log k) pour n palettes et k
+        camions quand une dimension lie les autres.
+
+        Retourne les palettes qui n'ont trouvé place dans aucun camion.
         """
-        remaining_palettes = palettes.copy()
-        
-        while remaining_palettes:
-            # Créer un sous-groupe de palettes qui peut tenir dans un camion
-            current_group = []
-            total_volume = 0
-            total_weight = 0
-            
-            for palette in remaining_palettes[:]:
-                if (total_volume + palette.volume <= trucks[0].specifications['volume'] and
-                    total_weight + palette.weight <= trucks[0].specifications['charge_utile']):
-                    current_group.append(palette)
-                    total_volume += palette.volume
-                    total_weight += palette.weight
-                    remaining_palettes.remove(palette)
-                    
-            if current_group:
-                # Trouver le meilleur camion pour ce sous-groupe
-                best_truck = self._find_best_fitting_truck(current_group, trucks)
-                if best_truck:
-                    assignments[best_truck.id] = assignments.get(best_truck.id, []) + current_group
-                    # Retirer le camion utilisé
-                    trucks = [t for t in trucks if t.id != best_truck.id]
-            else:
-                # Impossible de diviser davantage
-                break
+        if not palettes or not len(fleet):
+            return list(palettes)
+        kinds = [PALETTE_KINDS.index(getattr(p.palette_type, 'value', p.palette_type)) for p in palettes]
+        levels = np.floor(fleet.height / min(p.height for p in palettes))  # Infini sans hauteur utile
+        
+        # Encombrement relatif à la flotte, pour trier des camions hétérogènes
+        finite_volumes = fleet.volume[np.isfinite(fleet.volume)]
+        max_volume = finite_volumes.max() if len(finite_volumes) else np.inf
+        max_payload = fleet.payload.max()
+        order = sorted(range(len(palettes)),
+                       key=lambda i: -max(palettes[i].volume / max_volume, palettes[i].weight / max_payload))
+        
+        # Capacités restantes des camions
+        remaining_volume = fleet.volume.copy()
+        remaining_payload = fleet.payload.copy()
+        remaining_slots = levels.copy()
+        
+        def capacities(t: int) -> List[float]:
+            # Volume, charge et places restantes pour chaque type de palette (0 si le type n'est pas admis)
+            return [remaining_volume[t], remaining_payload[t]] + [
+                remaining_slots[t] * capacity if capacity > 0 else 0.0
+                for capacity in fleet.capacities[t]
+            ]
+        
+        def demand(i: int) -> List[float]:
+            palette = palettes[i]
+            return [palette.volume, palette.weight] + [
+                1 - 1e-9 if k == kinds[i] else -np.inf for k in range(len(PALETTE_KINDS))
+            ]
+        
+        dimensions = 2 + len(PALETTE_KINDS)
+        free = CapacityTree(len(fleet), dimensions)  # Camions libres, dans l'ordre de la flotte
+        for t, truck in enumerate(fleet.trucks):
+            if truck.id not in assignments:
+                free.set(t, capacities(t))
+        open_trucks = CapacityTree(len(fleet), dimensions)  # Camions ouverts, dans l'ordre d'ouverture
+        opened: List[int] = []
+        loads: Dict[int, List['Palette']] = {}
+        leftovers = []
+        
+        for i in order:
+            need = demand(i)
+            slot = open_trucks.first_fit(need)
+            if slot is None:
+                target = free.first_fit(need)
+                if target is None:
+                    leftovers.append(palettes[i])
+                    continue
+                free.remove(target)
+                slot = len(opened)
+                opened.append(target)
+                loads[target] = []
+            target = opened[slot]
+            
+            palette = palettes[i]
+            loads[target].append(palette)
+            remaining_volume[target] -= palette.volume
+            remaining_payload[target] -= palette.weight
+            remaining_slots[target] -= 1 / fleet.capacities[target, kinds[i]]
+            open_trucks.set(slot, capacities(target))
+        
+        for t, load in loads.items():
+            assignments[fleet.trucks[t].id] = load
+        return leftovers
 
     def _sort_palettes_for_loading(self, palettes: List['Palette']) -> List['Palette']:
         """
@@ -841,18 +1919,80 @@ class TruckLoadingOptimizer:
         # Trier par score décroissant
         return [p for p, _ in sorted(scored_palettes, key=lambda x: x[1], reverse=True)]
 
-    def _initialize_truck_space(self, truck: 'Camion') -> np.ndarray:
+    def _initialize_truck_space(self, truck: 'Camion', space_mode: str = 'voxel',
+                                resolution: float = 0.1) -> TruckSpace | HeightMap:
         """
-        Initialise l'espace 3D du camion.
+        Initialise l'espace 3D du camion (grille voxel ou carte des hauteurs).
         """
-        # Créer une grille 3D avec une résolution de 10cm
-        resolution = 0.1  # mètres
-        length = int(truck.specifications['length'] / resolution)
-        width = int(truck.specifications['width'] / resolution)
-        height = int(truck.specifications['height'] / resolution)
+        if space_mode not in SPACE_MODES:
+            raise ValueError(f"Modèle d'espace inconnu: {space_mode}")
+            
+        # Grille 3D, résolution de 10cm par défaut (mètres)
+        dimensions = self._get_truck_dimensions(truck)
+        
+        if space_mode == 'heightmap':
+            # Une hauteur de surface par cellule (x, y)
+            return HeightMap(
+                dimensions['length'],
+                dimensions['width'],
+                dimensions['height'],
+                resolution
+            )
+        
+        # 0 = espace libre, 1 = espace occupé (+ table de sommes préfixées)
+        return TruckSpace(
+            dimensions['length'],
+            dimensions['width'],
+            dimensions['height'],
+            resolution
+        )
+
+    def _update_truck_space(self, truck_space: TruckSpace | HeightMap, loaded_palette: LoadedPalette):
+        """
+        Marque comme occupées les cellules couvertes par une palette chargée.
+        """
+        position = loaded_palette.position
+        truck_space.occupy(
+            (position.x, position.y, position.z),
+            loaded_palette.dimensions,
+            loaded_palette.weight
+        )
+
+    def compare_space_models(self, palettes: List['Palette'], truck: 'Camion') -> Dict[str, Dict[str, float]]:
+        """
+        Compare la grille voxel et la carte des hauteurs sur un même chargement.
+
+        Retourne, pour chaque modèle, la mémoire de l'espace, le temps d'arrangement
+        et le taux d'utilisation obtenu, ainsi que les gains de la carte des hauteurs.
+        """
+        report = {}
+        for space_mode in SPACE_MODES:
+            start = time.perf_counter()
+            plan = self._optimize_loading_arrangement(palettes, truck, LoadingOptions(space_mode=space_mode))
+            elapsed = time.perf_counter() - start
+            
+            report[space_mode] = {
+                'memory_bytes': self._initialize_truck_space(truck, space_mode).nbytes,
+                'seconds': elapsed,
+                'space_utilization': plan.space_utilization if plan else None
+            }
         
-        # 0 = espace libre, 1 = espace occupé
-        return np.zeros((length, width, height), dtype=np.int8)
+        report['savings'] = {
+            'memory_bytes': report['voxel']['memory_bytes'] - report['heightmap']['memory_bytes'],
+            'seconds': report['voxel']['seconds'] - report['heightmap']['seconds']
+        }
+        return report
+
+    def _get_truck_dimensions(self, truck: 'Camion') -> Dict[str, float]:
+        """
+        Récupère les dimensions intérieures du camion (mètres).
+        """
+        dimensions = truck.dimensions
+        return {
+            'length': dimensions['longueur'],
+            'width': dimensions['largeur'],
+            'height': dimensions['hauteur']
+        }
 
     def _get_palette_dimensions(self, palette: 'Palette') -> Dict[str, float]:
         """
@@ -864,62 +2004,194 @@ class TruckLoadingOptimizer:
             'height': palette.height
         }
 
-    def _calculate_weight_distribution_score(self, loaded_palettes: List[LoadedPalette]) -> float:
+    def _get_rotated_dimensions(self, palette: 'Palette', rotation: int) -> Dict[str, float]:
         """
-        Calcule un score pour la distribution du poids.
+        Dimensions d'une palette dans le repère du camion selon sa rotation.
         """
-        if not loaded_palettes:
-            return 1.0
-            
-        # Calculer le centre de gravité
-        total_weight = sum(p.weight for p in loaded_palettes)
-        cog_x = sum(p.position.x * p.weight for p in loaded_palettes) / total_weight
-        cog_y = sum(p.position.y * p.weight for p in loaded_palettes) / total_weight
-        
-        # Position idéale au centre du camion
-        ideal_x = self.truck_dimensions['length'] / 2
-        ideal_y = self.truck_dimensions['width'] / 2
+        dimensions = self._get_palette_dimensions(palette)
+        if rotation == 90:
+            return {
+                'length': dimensions['width'],
+                'width': dimensions['length'],
+                'height': dimensions['height']
+            }
+        return dimensions
+
+    def _generate_possible_positions(
+        self,
+        truck_space: TruckSpace | HeightMap,
+        dimensions: Dict[str, float],
+        resolution: float = 0.1,
+        centers: Optional[List[Tuple[float, float, float]]] = None,
+        radius: float = 0.0
+    ) -> List[Tuple[float, float, float]]:
+        """
+        Génère les positions de la grille de pas `resolution` où la palette tient
+        dans le camion : sur tout le camion, ou seulement dans un voisinage de
+        rayon `radius` autour des positions `centers` (raffinement).
+        """
+        limits = np.array([
+            self.truck_dimensions['length'] - dimensions['length'],
+            self.truck_dimensions['width'] - dimensions['width'],
+            self.truck_dimensions['height'] - dimensions['height']
+        ])
+        if (limits < -1e-9).any():
+            return []
+        limits = np.maximum(limits, 0.0)
         
-        # Calculer la déviation normalisée
-        max_deviation = sqrt((self.truck_dimensions['length']/2)**2 + 
-                            (self.truck_dimensions['width']/2)**2)
-        actual_deviation = sqrt((cog_x - ideal_x)**2 + (cog_y - ideal_y)**2)
+        if centers is None:
+            axes = [np.arange(0.0, limit + 1e-9, resolution) for limit in limits]
+            grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        else:
+            steps = np.arange(-radius, radius + 1e-9, resolution)
+            offsets = np.stack(np.meshgrid(steps, steps, steps, indexing='ij'), axis=-1).reshape(-1, 3)
+            grid = (np.asarray(centers, dtype=np.float64)[:, None, :] + offsets[None]).reshape(-1, 3)
+            grid = np.unique(np.round(np.clip(grid, 0.0, limits), 6), axis=0)
         
-        return 1 - (actual_deviation / max_deviation)
+        return [tuple(position) for position in np.round(grid, 6).tolist()]
 
-    def _calculate_space_utilization(self, loaded_palettes: List[LoadedPalette], truck: 'Camion') -> float:
+    def _multi_resolution_search(
+        self,
+        palette: 'Palette',
+        dimensions: Dict[str, float],
+        state: LoadingState,
+        truck: 'Camion',
+        loaded_arrays: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        options: LoadingOptions,
+        first_fit: bool = False
+    ) -> Optional[Tuple[float, Tuple[float, float, float]]]:
         """
-        Calcule le taux d'utilisation de l'espace.
+        Recherche grossière puis fine sur la grille.
+
+        Au premier niveau (options.resolutions[0], ex. 40 cm) tout le camion est
+        évalué ; à chaque niveau suivant, seul le voisinage des options.refine_top_k
+        meilleures positions du niveau précédent est exploré au pas plus fin. Seules
+        les positions posées au sol ou sur le chargement sont retenues. Retourne
+        (score, position) de la meilleure position au niveau le plus fin.
         """
-        total_volume = truck.specifications['volume']
-        used_volume = sum(
-            p.dimensions['length'] * p.dimensions['width'] * p.dimensions['height']
-            for p in loaded_palettes
-        )
-        
-        return used_volume / total_volume
+        centers = None
+        radius = 0.0
+        best = None
+        
+        profiler = state.profiler
+        for resolution in options.resolutions:
+            started = time.perf_counter_ns()
+            positions = self._generate_possible_positions(state.truck_space, dimensions, resolution,
+                                                          centers, radius)
+            if profiler is not None:
+                profiler.record('candidate_generation', time.perf_counter_ns() - started, len(positions))
+            if not positions:
+                continue
+            valid = self._batch_position_validity(positions, dimensions, palette, loaded_arrays, state.truck_space,
+                                                  profiler, state.spatial_index)
+            valid &= self._supported_mask(positions, dimensions, state)
+            valid_positions = [positions[i] for i in np.flatnonzero(valid)]
+            if not valid_positions:
+                # Rien au voisinage : le niveau suivant repart de tout le camion
+                centers, radius = None, 0.0
+                continue
+                
+            if first_fit:
+                return 0.0, valid_positions[0]
+            if options.symmetry_breaking:
+                valid_positions = self._break_symmetries(valid_positions, dimensions, palette, state,
+                                                         options.identical_palettes_forward)
+                
+            scored = [
+                (score, valid_positions[i])
+                for score, i in self._score_positions(valid_positions, dimensions, palette, state, truck,
+                                                      options.refine_top_k)
+            ]
+            top = heapq.nlargest(options.refine_top_k, scored, key=lambda item: item[0])
+            best = top[0]
+            centers = [pos for _, pos in top]
+            radius = resolution
+            
+        return best
 
-    def _generate_possible_positions(self, truck_space: np.ndarray, dimensions: Dict[str, float]) -> List[Tuple[float, float, float]]:
+    def _update_extreme_points(self, extreme_points: List[Tuple[float, float, float]],
+                               placed: LoadedPalette, store: LoadedPaletteStore):
         """
-        Génère toutes les positions possibles pour une palette.
+        Met à jour les points extrêmes après le placement d'une palette.
+
+        Chaque palette placée génère des points à ses coins (devant, à côté, au-dessus),
+        projetés vers l'origine jusqu'au plancher, à une paroi ou à une palette déjà
+        chargée. Les points recouverts par la nouvelle palette sont supprimés.
         """
-        resolution = 0.1  # mètres
-        positions = []
+        px, py, pz = placed.position.x, placed.position.y, placed.position.z
+        length = placed.dimensions['length']
+        width = placed.dimensions['width']
+        height = placed.dimensions['height']
+        
+        # Supprimer les points désormais occupés
+        extreme_points[:] = [
+            point for point in extreme_points
+            if not (px <= point[0] < px + length and
+                    py <= point[1] < py + width and
+                    pz <= point[2] < pz + height)
+        ]
         
-        # Convertir les dimensions en indices de grille
-        length = int(dimensions['length'] / resolution)
-        width = int(dimensions['width'] / resolution)
-        height = int(dimensions['height'] / resolution)
+        # Coins de la palette et axes de projection associés
+        corners = [
+            ((px + length, py, pz), (1, 2)),
+            ((px, py + width, pz), (0, 2)),
+            ((px, py, pz + height), (0, 1))
+        ]
         
-        # Parcourir l'espace du camion
-        for x in range(truck_space.shape[0] - length + 1):
-            for y in range(truck_space.shape[1] - width + 1):
-                for z in range(truck_space.shape[2] - height + 1):
-                    # Convertir les indices en mètres
-                    pos = (x * resolution, y * resolution, z * resolution)
-                    positions.append(pos)
+        projections = [(corner, axis) for corner, axes in corners for axis in axes]
+        projected = self._project_points(
+            [corner for corner, _ in projections],
+            [axis for _, axis in projections],
+            store
+        )
+        new_points = [corner for corner, _ in corners] + projected
+        
+        limits = (self.truck_dimensions['length'],
+                  self.truck_dimensions['width'],
+                  self.truck_dimensions['height'])
+        known = set(extreme_points)
+        for point in new_points:
+            point = tuple(round(v, 6) for v in point)
+            if point in known or any(point[i] >= limits[i] for i in range(3)):
+                continue
+            if self._is_point_occupied(point, store):
+                continue
+            known.add(point)
+            extreme_points.append(point)
         
-        return positions
+        extreme_points.sort(key=lambda p: (p[2], p[0], p[1]))
+
+    def _project_points(self, points: List[Tuple[float, float, float]], axes: List[int],
+                        store: LoadedPaletteStore) -> List[Tuple[float, float, float]]:
+        """
+        Projette chaque point vers l'origine le long de son axe jusqu'à la première
+        surface rencontrée (plancher, paroi ou palette chargée), en une passe sur le store.
+        """
+        origins, sizes, _ = store.arrays()
+        ends = origins + sizes
+        points_array = np.asarray(points, dtype=np.float64)
+        axes = np.asarray(axes)
+        rows = np.arange(len(points_array))
+        
+        # La palette doit couvrir le point sur les deux autres axes (K, M, 3)
+        inside = (origins[None] <= points_array[:, None]) & (points_array[:, None] < ends[None])
+        inside[rows, :, axes] = True
+        faces = ends[:, axes].T  # (K, M)
+        reached = inside.all(axis=2) & (faces > 0) & (faces <= points_array[rows, axes][:, None])
+        stops = np.where(reached, faces, 0.0).max(axis=1, initial=0.0)
+        
+        projected = points_array.copy()
+        projected[rows, axes] = stops
+        return [tuple(point) for point in projected.tolist()]
+
+    def _is_point_occupied(self, point: Tuple[float, float, float],
+                           store: LoadedPaletteStore) -> bool:
+        """
+        Vérifie si un point se trouve à l'intérieur d'une palette chargée.
+        """
+        origins, sizes, _ = store.arrays()
+        inside = (origins <= point) & (np.asarray(point) < origins + sizes)
+        return bool(inside.all(axis=1).any())
 
     def _is_within_bounds(self, position: Tuple[float, float, float], dimensions: Dict[str, float]) -> bool:
         """
@@ -931,10 +2203,15 @@ class TruckLoadingOptimizer:
                 0 <= z + dimensions['height'] <= self.truck_dimensions['height'])
 
     def _has_collision(self, position: Tuple[float, float, float], dimensions: Dict[str, float], 
-                    loaded_palettes: List[LoadedPalette]) -> bool:
+                    loaded_palettes: List[LoadedPalette],
+                    truck_space: Optional[TruckSpace] = None) -> bool:
         """
         Vérifie s'il y a collision avec d'autres palettes.
         """
+        if truck_space is not None:
+            # Requête O(1) sur la table de sommes préfixées
+            return not truck_space.is_box_free(position, dimensions)
+            
         x, y, z = position
         for palette in loaded_palettes:
             # Vérifier le chevauchement sur chaque axe
@@ -956,11 +2233,14 @@ class TruckLoadingOptimizer:
         Vérifie si l'empilement des poids est valide.
         """
         x, y, z = position
+        top = z + dimensions['height']
         
-        # Vérifier les palettes en dessous
+        # Vérifier les palettes en dessous, et celles déjà posées au-dessus
         for loaded in loaded_palettes:
-            if (loaded.position.z + loaded.dimensions['height'] == z and  # Contact direct
-                loaded.weight < palette.weight):  # Palette plus légère en dessous
+            if ((loaded.position.z + loaded.dimensions['height'] == z and  # Contact direct
+                 loaded.weight < palette.weight) or  # Palette plus légère en dessous
+                (abs(loaded.position.z - top) < 1e-6 and  # Contact par le dessus
+                 loaded.weight > palette.weight)):  # Palette plus lourde au-dessus
                 # Vérifier le chevauchement horizontal
                 x_overlap = (x < loaded.position.x + loaded.dimensions['length'] and 
                             x + dimensions['length'] > loaded.position.x)
@@ -995,21 +2275,12 @@ class TruckLoadingOptimizer:
         
         return True
 
-    def _check_product_compatibility(self, palette: 'Palette', loaded_palettes: List[LoadedPalette]) -> bool:
+    def _check_product_compatibility(self, palette: 'Palette', incompatible_mask: int) -> bool:
         """
-        Vérifie la compatibilité des produits.
+        Vérifie la compatibilité des produits : un seul ET entre le bit du type de
+        la palette et l'OU des masques d'incompatibilité des types déjà chargés.
         """
-        palette_constraints = self.product_constraints[palette.product.type]
-        
-        for loaded in loaded_palettes:
-            loaded_constraints = self.product_constraints[loaded.product_type]
-            
-            # Vérifier les incompatibilités directes
-            if (loaded.product_type in palette_constraints.incompatible_types or
-                palette.product.type in loaded_constraints.incompatible_types):
-                return False
-        
-        return True
+        return self.compatibility.is_compatible(palette.product.type, incompatible_mask)
 
     def _evaluate_space_utilization(self, position: Tuple[float, float, float], dimensions: Dict[str, float],
                               truck: 'Camion') -> float:
@@ -1023,18 +2294,18 @@ class TruckLoadingOptimizer:
         # Calculer la distance aux parois du camion
         dist_to_walls = [
             x,  # Distance à la paroi avant
-            truck.specifications['length'] - (x + dimensions['length']),  # Distance à la paroi arrière
+            self.truck_dimensions['length'] - (x + dimensions['length']),  # Distance à la paroi arrière
             y,  # Distance à la paroi gauche
-            truck.specifications['width'] - (y + dimensions['width']),  # Distance à la paroi droite
+            self.truck_dimensions['width'] - (y + dimensions['width']),  # Distance à la paroi droite
             z,  # Distance au plancher
-            truck.specifications['height'] - (z + dimensions['height'])  # Distance au plafond
+            self.truck_dimensions['height'] - (z + dimensions['height'])  # Distance au plafond
         ]
         
         # Pénaliser les grands espaces vides
         max_gap = max(dist_to_walls)
-        gap_score = 1 - (max_gap / max(truck.specifications['length'], 
-                                    truck.specifications['width'],
-                                    truck.specifications['height']))
+        gap_score = 1 - (max_gap / max(self.truck_dimensions['length'], 
+                                    self.truck_dimensions['width'],
+                                    self.truck_dimensions['height']))
         
         # Favoriser le placement près des parois et du sol
         contact_score = sum(1 for dist in dist_to_walls if dist < 0.1) / 6
@@ -1043,69 +2314,98 @@ class TruckLoadingOptimizer:
         return 0.7 * gap_score + 0.3 * contact_score
 
     def _evaluate_stability(self, position: Tuple[float, float, float], dimensions: Dict[str, float],
-                        loaded_palettes: List[LoadedPalette]) -> float:
+                        store: LoadedPaletteStore,
+                        spatial_index: Optional[SpatialIndex] = None) -> float:
         """
         Évalue la stabilité de la palette à la position donnée.
         
         Retourne un score entre 0 et 1, où 1 représente une stabilité maximale.
+        Les palettes de support sont lues dans les colonnes du store, quel que
+        soit le modèle d'espace (voxels ou carte des hauteurs).
         """
         x, y, z = position
         
         if z == 0:  # Au sol = stabilité maximale
             return 1.0
             
-        # Calculer la surface de support nécessaire
-        required_support = dimensions['length'] * dimensions['width']
-        actual_support = 0
-        
-        # Trouver les palettes qui supportent directement cette position
-        supporting_palettes = []
-        for palette in loaded_palettes:
-            if abs(palette.position.z + palette.dimensions['height'] - z) < 0.01:  # Contact direct
-                # Calculer la surface de chevauchement
-                x_overlap = max(0, min(x + dimensions['length'], 
-                                    palette.position.x + palette.dimensions['length']) -
-                                max(x, palette.position.x))
-                y_overlap = max(0, min(y + dimensions['width'],
-                                    palette.position.y + palette.dimensions['width']) -
-                                max(y, palette.position.y))
-                
-                overlap_area = x_overlap * y_overlap
-                actual_support += overlap_area
-                supporting_palettes.append((palette, overlap_area))
-        
-        # Score de support de base
-        support_score = min(1.0, actual_support / required_support)
-        
-        # Bonus pour une distribution équilibrée du support
-        if supporting_palettes:
-            total_support = sum(area for _, area in supporting_palettes)
-            max_support_ratio = max(area / total_support for _, area in supporting_palettes)
-            distribution_score = 1 - (max_support_ratio - 1/len(supporting_palettes))
+        if spatial_index is not None:
+            # Seules les palettes de la colonne dont le dessus est au niveau z
+            ids = spatial_index.supporting_ids(x, y, dimensions['length'], dimensions['width'], z)
         else:
-            distribution_score = 0
-        
-        # Points bonus pour support aux coins
-        corners_supported = 0
-        corner_positions = [
-            (x, y),
-            (x + dimensions['length'], y),
-            (x, y + dimensions['width']),
-            (x + dimensions['length'], y + dimensions['width'])
-        ]
-        
-        for corner_x, corner_y in corner_positions:
-            for palette, _ in supporting_palettes:
-                if (palette.position.x <= corner_x <= palette.position.x + palette.dimensions['length'] and
-                    palette.position.y <= corner_y <= palette.position.y + palette.dimensions['width']):
-                    corners_supported += 1
-                    break
+            ids = np.arange(len(store))
+        return float(self._support_ratios([position], dimensions, store.origins[ids], store.sizes[ids])[0])
+
+    def _batch_stability(self, positions: List[Tuple[float, float, float]], dimensions: Dict[str, float],
+                         store: LoadedPaletteStore,
+                         spatial_index: Optional[SpatialIndex] = None) -> np.ndarray:
+        """
+        Version vectorisée de _evaluate_stability pour N positions de même taille :
+        une seule passe (N candidats x M palettes) sur les colonnes du store. Avec
+        l'index spatial, M se limite aux palettes pouvant porter l'une des positions.
+        """
+        if not len(positions):
+            return np.zeros(0)
+        origins, sizes, _ = store.arrays()
+        if spatial_index is not None:
+            # Union des supports possibles : une palette qui ne touche pas une position n'y compte pas
+            ids = [
+                spatial_index.supporting_ids(x, y, dimensions['length'], dimensions['width'], z)
+                for x, y, z in positions if z != 0
+            ]
+            ids = np.unique(np.concatenate(ids)) if ids else np.zeros(0, dtype=np.int64)
+            origins, sizes = origins[ids], sizes[ids]
+        return self._support_ratios(positions, dimensions, origins, sizes)
+
+    @staticmethod
+    def _support_ratios(positions: List[Tuple[float, float, float]], dimensions: Dict[str, float],
+                        origins: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        Score de stabilité (N,) de positions de même taille sur les palettes (origines, tailles) :
+        0.5 x part de l'empreinte supportée + 0.3 x répartition entre les supports + 0.2 x coins supportés.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        length, width = dimensions['length'], dimensions['width']
+        ends = origins + sizes
+        x, y, z = positions[:, 0:1], positions[:, 1:2], positions[:, 2:3]
         
-        corner_score = corners_supported / 4
+        # Contact direct et surface de chevauchement (N, M)
+        contact = np.abs(ends[None, :, 2] - z) < 0.01
+        x_overlap = np.maximum(0, np.minimum(x + length, ends[None, :, 0]) - np.maximum(x, origins[None, :, 0]))
+        y_overlap = np.maximum(0, np.minimum(y + width, ends[None, :, 1]) - np.maximum(y, origins[None, :, 1]))
+        supporting = contact & (x_overlap * y_overlap > 0)
+        areas = np.where(supporting, x_overlap * y_overlap, 0.0)
         
-        # Combiner tous les scores avec des poids appropriés
-        final_score = (0.5 * support_score + 
-                    0.3 * distribution_score +
-                    0.2 * corner_score)
+        total = areas.sum(axis=1)
+        support_score = np.minimum(1.0, total / (length * width))
         
-        return final_score
\ No newline at end of file
+        # Bonus pour une distribution équilibrée du support
+        supporters = supporting.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            max_ratio = areas.max(axis=1, initial=0.0) / total
+            distribution_score = np.where(supporters > 0, 1 - (max_ratio - 1 / supporters), 0.0)
+        
+        # Coins couverts par au moins une palette de support (tests séparés en x et en y)
+        x_low = (origins[None, :, 0] <= x) & (x <= ends[None, :, 0])
+        x_high = (origins[None, :, 0] <= x + length) & (x + length <= ends[None, :, 0])
+        y_low = supporting & (origins[None, :, 1] <= y) & (y <= ends[None, :, 1])
+        y_high = supporting & (origins[None, :, 1] <= y + width) & (y + width <= ends[None, :, 1])
+        corner_score = ((x_low & y_low).any(axis=1).astype(np.int8) +
+                        (x_high & y_low).any(axis=1) +
+                        (x_low & y_high).any(axis=1) +
+                        (x_high & y_high).any(axis=1)) / 4
+        
+        scores = 0.5 * support_score + 0.3 * distribution_score + 0.2 * corner_score
+        # Au sol = stabilité maximale
+        return np.where(positions[:, 2] == 0, 1.0, scores)
+
+
+def _arrange_truck(optimizer: TruckLoadingOptimizer, palettes: List['Palette'], truck: 'Camion',
+                   options: LoadingOptions, deadline: Optional[float] = None) -> Optional[LoadingSuggestion]:
+    """Arrangement d'un camion exécuté dans un processus du pool."""
+    return optimizer._optimize_loading_arrangement(palettes, truck, options, deadline)
+
+
+def _pack_ordering(optimizer: TruckLoadingOptimizer, ordering: List['Palette'], truck: 'Camion',
+                   options: LoadingOptions, deadline: Optional[float] = None) -> Optional[LoadingSuggestion]:
+    """Tâche du multi-start exécutée dans un processus du pool."""
+    return optimizer._pack_palettes(ordering, truck, options, deadline)
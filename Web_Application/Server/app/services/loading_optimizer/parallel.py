@@ -0,0 +1,33 @@
+# services/loading_optimizer/parallel.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+def resolve_workers(max_workers: Optional[int], task_count: int) -> int:
+    """Nombre de processus à utiliser : jamais plus que de tâches ni de cœurs."""
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    return max(1, min(workers, task_count))
+
+
+def map_in_processes(function: Callable[..., Any], tasks: Sequence[Tuple], max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Exécute function(*task) pour chaque tâche dans un ProcessPoolExecutor et
+    retourne les résultats dans l'ordre des tâches.
+
+    Repli en série si un seul processus suffit ou si le pool est indisponible
+    (arguments non sérialisables ou processus interrompus). Une erreur levée
+    par la fonction elle-même est propagée telle quelle, sans relance en série.
+    """
+    workers = resolve_workers(max_workers, len(tasks))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(function, *task) for task in tasks]
+                return [future.result() for future in futures]
+        except (BrokenProcessPool, PicklingError) as exc:
+            print(f"Pool de processus indisponible ({type(exc).__name__}: {exc}), "
+                  f"exécution en série de {len(tasks)} tâches")
+    return [function(*task) for task in tasks]
@@ -0,0 +1,160 @@
+# services/loading_optimizer/plan_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+from .models import LoadingOptions
+
+# Largeur des tranches de poids (kg) de la signature : deux palettes de la même
+# tranche sont interchangeables pour le cache
+WEIGHT_BUCKET = 50.0
+
+
+def _palette_signature(palette: 'Palette') -> Tuple:
+    """Signature d'une palette : type, dimensions (cm), tranche de poids, type de produit."""
+    return (
+        getattr(palette.palette_type, 'value', palette.palette_type),
+        round(palette.length * 100),
+        round(palette.width * 100),
+        round(palette.height * 100),
+        int(palette.weight // WEIGHT_BUCKET),
+        getattr(palette.product.type, 'value', palette.product.type),
+    )
+
+
+def canonical_signature(
+    palettes: List['Palette'],
+    truck: 'Camion',
+    options: LoadingOptions,
+    constraints_digest: str
+) -> Tuple[str, List['Palette']]:
+    """
+    Clé de cache d'un chargement et palettes rangées dans l'ordre canonique.
+
+    Les palettes sont regroupées par destination (les noms de destination ne
+    comptent pas, seule la partition compte), triées par signature puis par
+    poids décroissant ; les groupes sont triés par leur suite de signatures.
+    Deux chargements de même clé ont donc la même structure, et la i-ème palette
+    canonique de l'un prend la place de la i-ème de l'autre. Le tri par poids au
+    sein d'une tranche conserve l'ordre des poids, donc les règles d'empilement.
+    """
+    by_destination: Dict[str, List[Tuple[Tuple, 'Palette']]] = defaultdict(list)
+    for palette in palettes:
+        by_destination[palette.command.destination].append((_palette_signature(palette), palette))
+
+    groups = []
+    for members in by_destination.values():
+        members.sort(key=lambda item: (item[0], -item[1].weight))
+        groups.append(([signature for signature, _ in members], [palette for _, palette in members]))
+    groups.sort(key=lambda group: group[0])
+
+    settings = asdict(options)
+    for name in ('max_workers', 'truck_workers', 'profile_constraints', 'exact_assignment', 'assignment_time_limit'):
+        settings.pop(name)  # n'influencent pas le résultat
+    payload = json.dumps([
+        getattr(truck.type_camion, 'value', truck.type_camion),
+        truck.dimensions,
+        constraints_digest,
+        settings,
+        [signatures for signatures, _ in groups],
+    ], sort_keys=True, default=str)
+
+    ordered = [palette for _, members in groups for palette in members]
+    return hashlib.sha1(payload.encode()).hexdigest(), ordered
+
+
+class PlanCache:
+    """
+    Cache persistant (SQLite) des plans de chargement.
+
+    Une entrée associe une clé canonique (voir canonical_signature) aux
+    placements (x, y, z, rotation) des palettes dans l'ordre canonique. Les
+    entrées les moins récemment utilisées sont évincées au-delà de max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        if max_entries < 1:
+            raise ValueError("max_entries doit être au moins 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS loading_plans ("
+            " key TEXT PRIMARY KEY,"
+            " placements TEXT NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " hit_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS loading_plans_last_used ON loading_plans (last_used)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[List[Tuple[float, float, float, int]]]:
+        """Placements enregistrés pour la clé, None si absents."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT placements FROM loading_plans WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE loading_plans SET last_used = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (time.time(), key)
+            )
+            self._connection.commit()
+            self.hits += 1
+        return [tuple(placement) for placement in json.loads(row[0])]
+
+    def put(self, key: str, placements: List[Tuple[float, float, float, int]]):
+        """Enregistre les placements d'un plan et évince les entrées les plus anciennes."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO loading_plans (key, placements, last_used) VALUES (?, ?, ?)",
+                (key, json.dumps(placements), time.time())
+            )
+            excess = self._count() - self.max_entries
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM loading_plans WHERE key IN"
+                    " (SELECT key FROM loading_plans ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+            self._connection.commit()
+
+    def clear(self):
+        """Vide le cache (à faire par exemple après un changement de flotte)."""
+        with self._lock:
+            self._connection.execute("DELETE FROM loading_plans")
+            self._connection.commit()
+
+    def _count(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM loading_plans").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Compteurs du processus (succès, échecs, évictions) et taille du cache."""
+        with self._lock:
+            entries = self._count()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._connection.close()
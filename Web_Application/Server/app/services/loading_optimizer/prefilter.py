@@ -0,0 +1,128 @@
+# services/loading_optimizer/prefilter.py
+from math import floor
+from typing import Dict, List, Optional
+from .models import LoadBounds, ProductTypeConstraints, TruckRejectReason
+
+
+def compute_load_bounds(palettes: List['Palette'], constraints: Dict[str, ProductTypeConstraints]) -> LoadBounds:
+    """Agrège une fois les grandeurs d'un groupe utilisées par check_truck_bounds."""
+    counts: Dict[str, int] = {}
+    fragile_counts: Dict[str, int] = {}
+    shapes = set()
+    heights = []
+    fragile_area = 0.0
+    low, high = float('-inf'), float('inf')
+    min_temperature = None
+    needs_refrigeration = False
+
+    for palette in palettes:
+        kind = getattr(palette.palette_type, 'value', palette.palette_type)
+        counts[kind] = counts.get(kind, 0) + 1
+        footprint = palette.length * palette.width
+        constraint = constraints[palette.product.type]
+        shapes.add((palette.length, palette.width, palette.height, constraint.rotatable))
+        heights.append((palette.height, footprint, kind))
+
+        if constraint.fragility:
+            fragile_area += footprint
+            fragile_counts[kind] = fragile_counts.get(kind, 0) + 1
+
+        if constraint.min_temperature is not None:
+            needs_refrigeration = True
+            low = max(low, constraint.min_temperature)
+            if min_temperature is None or constraint.min_temperature < min_temperature:
+                min_temperature = constraint.min_temperature
+        if constraint.max_temperature is not None:
+            needs_refrigeration = True
+            high = min(high, constraint.max_temperature)
+
+    return LoadBounds(
+        total_weight=sum(p.weight for p in palettes),
+        total_volume=sum(p.volume for p in palettes),
+        counts=counts,
+        min_height=min((p.height for p in palettes), default=0.0),
+        shapes=list(shapes),
+        fragile_area=fragile_area,
+        fragile_counts=fragile_counts,
+        heights=heights,
+        needs_refrigeration=needs_refrigeration,
+        min_temperature=min_temperature,
+        temperature_range=(low, high)
+    )
+
+
+def _capacity_share(counts: Dict[str, int], truck: 'Camion') -> float:
+    """Part du plancher occupée par ces palettes selon capacite_palettes (1.0 = plancher plein)."""
+    share = 0.0
+    for kind, count in counts.items():
+        if count:
+            capacity = truck.capacite_palettes(kind)
+            if not capacity:
+                return float('inf')
+            share += count / capacity
+    return share
+
+
+def check_truck_bounds(bounds: LoadBounds, truck: 'Camion') -> Optional[TruckRejectReason]:
+    """
+    Bornes inférieures nécessaires au chargement d'un groupe dans un camion.
+
+    Retourne le premier motif de rejet, ou None si le camion reste candidat
+    (ce qui ne garantit pas qu'un arrangement 3D existe). Les tests sont
+    ordonnés du moins coûteux au plus coûteux. Deux palettes fragiles ne
+    peuvent pas partager une colonne (l'une serait sous l'autre), pas plus que
+    deux palettes dont la somme des hauteurs dépasse la hauteur utile : chacun
+    de ces ensembles doit tenir à plat sur le plancher.
+    """
+    specs = truck.specifications
+
+    # Température
+    if bounds.needs_refrigeration:
+        if not specs.get('frigo', False):
+            return TruckRejectReason.REFRIGERATION
+        truck_range = specs.get('plage_temperature')
+        low, high = bounds.temperature_range
+        if truck_range is not None and (truck_range[0] > high or truck_range[1] < low):
+            return TruckRejectReason.TEMPERATURE
+        setpoint = getattr(truck, 'temperature', None)
+        if setpoint is not None and bounds.min_temperature is not None and setpoint > bounds.min_temperature:
+            return TruckRejectReason.TEMPERATURE
+
+    # Capacités globales (volume absent pour les plateaux)
+    if specs['charge_utile'] < bounds.total_weight:
+        return TruckRejectReason.WEIGHT
+    if specs['volume'] is not None and specs['volume'] < bounds.total_volume:
+        return TruckRejectReason.VOLUME
+
+    length, width, height = specs['longueur'], specs['largeur'], specs['hauteur']
+    if height is None:
+        height = float('inf')
+
+    # Chaque palette doit tenir dans une orientation permise
+    for p_length, p_width, p_height, rotatable in bounds.shapes:
+        fits = p_length <= length and p_width <= width
+        if rotatable:
+            fits = fits or (p_width <= length and p_length <= width)
+        if not fits or p_height > height:
+            return TruckRejectReason.OVERSIZE
+
+    # Nombre de palettes : au plus `levels` couches de capacite_palettes
+    levels = floor(height / bounds.min_height) if bounds.min_height > 0 and height != float('inf') else None
+    share = _capacity_share(bounds.counts, truck)
+    if share == float('inf') or (levels is not None and share > levels):
+        return TruckRejectReason.PALETTE_CAPACITY
+
+    # Palettes non empilables entre elles : une seule couche
+    floor_area = length * width
+    if bounds.fragile_area > floor_area or _capacity_share(bounds.fragile_counts, truck) > 1:
+        return TruckRejectReason.FLOOR_AREA
+    tall_counts: Dict[str, int] = {}
+    tall_area = 0.0
+    for p_height, footprint, kind in bounds.heights:
+        if 2 * p_height > height:
+            tall_area += footprint
+            tall_counts[kind] = tall_counts.get(kind, 0) + 1
+    if tall_area > floor_area or _capacity_share(tall_counts, truck) > 1:
+        return TruckRejectReason.FLOOR_AREA
+
+    return None
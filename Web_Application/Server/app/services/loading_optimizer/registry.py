@@ -0,0 +1,96 @@
+# services/loading_optimizer/registry.py
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+from .compatibility import CompatibilityTable
+from .models import ProductTypeConstraints
+
+# Fichier de configuration par défaut : Server/products.json
+DEFAULT_PRODUCTS_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "products.json")
+)
+
+
+@dataclass(frozen=True)
+class ConstraintSnapshot:
+    """Une version des contraintes : contraintes typées, table compilée et empreinte du fichier."""
+    constraints: Dict[str, ProductTypeConstraints]
+    compatibility: CompatibilityTable
+    digest: str
+
+
+class ProductConstraintRegistry:
+    """
+    Contraintes des types de produits partagées par tout le processus.
+
+    Le fichier JSON n'est lu et analysé qu'une fois ; il est relu uniquement
+    lorsque sa date de modification (mtime) change. Les contraintes typées,
+    leur table de compatibilité compilée et l'empreinte du fichier forment un
+    seul instantané, remplacé d'un bloc : snapshot() les retourne ensemble.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._snapshot: Optional[ConstraintSnapshot] = None
+
+    def _refresh(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            config = json.loads(content)
+            constraints = {
+                product['type']: ProductTypeConstraints.from_dict(product)
+                for product in config['product_types']
+            }
+            self._snapshot = ConstraintSnapshot(constraints, CompatibilityTable(constraints),
+                                                hashlib.sha1(content).hexdigest())
+            self._mtime = mtime
+
+    def snapshot(self) -> ConstraintSnapshot:
+        """Contraintes, table et empreinte d'une même version du fichier (rechargé si modifié)."""
+        self._refresh()
+        with self._lock:
+            return self._snapshot
+
+    @property
+    def constraints(self) -> Dict[str, ProductTypeConstraints]:
+        """Contraintes par nom de type (rechargées si le fichier a changé)."""
+        return self.snapshot().constraints
+
+    @property
+    def compatibility(self) -> CompatibilityTable:
+        """Table de compatibilité compilée correspondant aux contraintes courantes."""
+        return self.snapshot().compatibility
+
+    @property
+    def digest(self) -> str:
+        """Empreinte SHA-1 du contenu du fichier (identifie une version des contraintes)."""
+        return self.snapshot().digest
+
+    def get(self, product_type) -> Optional[ProductTypeConstraints]:
+        """Contraintes d'un type (nom ou membre de l'enum ProductType), None si inconnu."""
+        return self.constraints.get(getattr(product_type, 'value', product_type))
+
+
+_registries: Dict[str, ProductConstraintRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_constraint_registry(path: Optional[str] = None) -> ProductConstraintRegistry:
+    """Registre partagé pour un fichier de configuration (Server/products.json par défaut)."""
+    path = os.path.abspath(path or DEFAULT_PRODUCTS_PATH)
+    registry = _registries.get(path)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(path, ProductConstraintRegistry(path))
+    return registry
@@ -0,0 +1,230 @@
+# services/loading_optimizer/space.py
+from typing import Dict, Sequence, Tuple
+import numpy as np
+
+# Modèles d'espace disponibles : grille voxel 3D ou carte des hauteurs 2.5D
+SPACE_MODES = ('voxel', 'heightmap')
+
+
+class TruckSpace:
+    """
+    Grille voxel du camion (0 = libre, 1 = occupé) accompagnée de sa table de
+    sommes préfixées 3D (summed-area table).
+
+    La table permet de savoir si une boîte est libre en O(1) (huit lectures),
+    quel que soit le nombre de palettes déjà chargées. Les coordonnées sont
+    arrondies à la cellule la plus proche, de sorte que deux faces en contact
+    tombent toujours sur la même frontière de cellule.
+    """
+
+    def __init__(self, length: float, width: float, height: float, resolution: float = 0.1):
+        self.resolution = resolution
+        shape = tuple(max(1, self._to_cell(v)) for v in (length, width, height))
+        self.grid = np.zeros(shape, dtype=np.int8)
+        # prefix[i, j, k] = nombre de cellules occupées dans grid[:i, :j, :k]
+        self.prefix = np.zeros(tuple(n + 1 for n in shape), dtype=np.int32)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.grid.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par la grille et sa table de sommes préfixées."""
+        return self.grid.nbytes + self.prefix.nbytes
+
+    def _to_cell(self, value: float) -> int:
+        return int(np.floor(value / self.resolution + 0.5))
+
+    def _box_cells(self, position: Sequence[float], dimensions: Dict[str, float]) -> Tuple[int, ...]:
+        """Convertit une boîte en indices de cellules (x0, x1, y0, y1, z0, z1) bornés à la grille."""
+        cells = []
+        for axis, key in enumerate(('length', 'width', 'height')):
+            start = self._to_cell(position[axis])
+            end = max(self._to_cell(position[axis] + dimensions[key]), start + 1)
+            limit = self.grid.shape[axis]
+            cells.extend((min(max(start, 0), limit), min(max(end, 0), limit)))
+        return tuple(cells)
+
+    def occupied_count(self, x0: int, x1: int, y0: int, y1: int, z0: int, z1: int) -> int:
+        """Nombre de cellules occupées dans grid[x0:x1, y0:y1, z0:z1] (huit lectures)."""
+        p = self.prefix
+        return int(p[x1, y1, z1] - p[x0, y1, z1] - p[x1, y0, z1] - p[x1, y1, z0]
+                   + p[x0, y0, z1] + p[x0, y1, z0] + p[x1, y0, z0] - p[x0, y0, z0])
+
+    def is_box_free(self, position: Sequence[float], dimensions: Dict[str, float]) -> bool:
+        """Vérifie en O(1) qu'aucune cellule de la boîte n'est occupée."""
+        return self.occupied_count(*self._box_cells(position, dimensions)) == 0
+
+    def free_mask(self, positions: Sequence[Tuple[float, float, float]], size: Tuple[float, float, float]) -> np.ndarray:
+        """Version vectorisée de is_box_free pour N positions de même taille."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        limits = np.asarray(self.grid.shape)
+
+        starts = np.floor(positions / self.resolution + 0.5).astype(np.int64)
+        ends = np.floor((positions + np.asarray(size)) / self.resolution + 0.5).astype(np.int64)
+        ends = np.maximum(ends, starts + 1)
+        starts = np.clip(starts, 0, limits)
+        ends = np.clip(ends, 0, limits)
+
+        x0, y0, z0 = starts.T
+        x1, y1, z1 = ends.T
+        p = self.prefix
+        counts = (p[x1, y1, z1] - p[x0, y1, z1] - p[x1, y0, z1] - p[x1, y1, z0]
+                  + p[x0, y0, z1] + p[x0, y1, z0] + p[x1, y0, z0] - p[x0, y0, z0])
+        return counts == 0
+
+    def supported_mask(self, positions: Sequence[Tuple[float, float, float]], size: Tuple[float, float, float]) -> np.ndarray:
+        """Positions posées au sol ou sur au moins une cellule occupée juste sous l'empreinte."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        limits = np.asarray(self.grid.shape)
+
+        starts = np.floor(positions / self.resolution + 0.5).astype(np.int64)
+        ends = np.floor((positions + np.asarray(size)) / self.resolution + 0.5).astype(np.int64)
+        ends = np.maximum(ends, starts + 1)
+        starts = np.clip(starts, 0, limits)
+        ends = np.clip(ends, 0, limits)
+
+        x0, y0, z1 = starts.T
+        x1, y1, _ = ends.T
+        z0 = np.maximum(z1 - 1, 0)
+        p = self.prefix
+        below = (p[x1, y1, z1] - p[x0, y1, z1] - p[x1, y0, z1] - p[x1, y1, z0]
+                 + p[x0, y0, z1] + p[x0, y1, z0] + p[x1, y0, z0] - p[x0, y0, z0])
+        return (z1 == 0) | (below > 0)
+
+    def occupy(self, position: Sequence[float], dimensions: Dict[str, float], weight: float = 0.0):
+        """
+        Marque une boîte comme occupée et met à jour la table de sommes préfixées.
+
+        Seules les entrées situées après le coin de la boîte changent : on leur
+        ajoute la somme cumulée des cellules nouvellement occupées.
+        """
+        x0, x1, y0, y1, z0, z1 = self._box_cells(position, dimensions)
+        if x0 >= x1 or y0 >= y1 or z0 >= z1:
+            return
+
+        block = self.grid[x0:x1, y0:y1, z0:z1]
+        added = (1 - block).astype(np.int32)
+        block[...] = 1
+
+        cumulative = np.zeros((x1 - x0 + 1, y1 - y0 + 1, z1 - z0 + 1), dtype=np.int32)
+        cumulative[1:, 1:, 1:] = added.cumsum(0).cumsum(1).cumsum(2)
+
+        length, width, height = self.grid.shape
+        ix = np.minimum(np.arange(x0 + 1, length + 1), x1) - x0
+        iy = np.minimum(np.arange(y0 + 1, width + 1), y1) - y0
+        iz = np.minimum(np.arange(z0 + 1, height + 1), z1) - z0
+        self.prefix[x0 + 1:, y0 + 1:, z0 + 1:] += cumulative[np.ix_(ix, iy, iz)]
+
+
+class HeightMap:
+    """
+    Modèle 2.5D du camion : une hauteur de surface par cellule (x, y).
+
+    Adapté aux chargements empilés depuis le plancher : une palette ne peut être
+    posée qu'au-dessus de tout ce qui occupe déjà son empreinte. On conserve aussi
+    le poids de la palette au sommet de chaque cellule pour les règles d'empilement.
+    """
+
+    def __init__(self, length: float, width: float, height: float, resolution: float = 0.1):
+        self.resolution = resolution
+        self.height_cells = max(1, self._to_cell(height))
+        shape = (max(1, self._to_cell(length)), max(1, self._to_cell(width)))
+        self.heights = np.zeros(shape, dtype=np.uint16)  # en cellules
+        self.top_weights = np.zeros(shape, dtype=np.float32)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.heights.shape + (self.height_cells,)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par la carte des hauteurs et des poids."""
+        return self.heights.nbytes + self.top_weights.nbytes
+
+    def _to_cell(self, value: float) -> int:
+        return int(np.floor(value / self.resolution + 0.5))
+
+    def _footprint(self, position: Sequence[float], dimensions: Dict[str, float]) -> Tuple[int, int, int, int]:
+        """Indices (x0, x1, y0, y1) de l'empreinte au sol bornés à la carte."""
+        cells = []
+        for axis, key in enumerate(('length', 'width')):
+            start = self._to_cell(position[axis])
+            end = max(self._to_cell(position[axis] + dimensions[key]), start + 1)
+            limit = self.heights.shape[axis]
+            cells.extend((min(max(start, 0), limit), min(max(end, 0), limit)))
+        return tuple(cells)
+
+    def is_box_free(self, position: Sequence[float], dimensions: Dict[str, float]) -> bool:
+        """La boîte est libre si sa base est au-dessus de la surface sous son empreinte."""
+        x0, x1, y0, y1 = self._footprint(position, dimensions)
+        return int(self.heights[x0:x1, y0:y1].max(initial=0)) <= self._to_cell(position[2])
+
+    def free_mask(self, positions: Sequence[Tuple[float, float, float]], size: Tuple[float, float, float]) -> np.ndarray:
+        """Version vectorisée de is_box_free (maximum glissant calculé une fois par taille)."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        if not len(positions):
+            return np.zeros(0, dtype=bool)
+
+        window_max = self._window_max(size)
+        cells = np.floor(positions / self.resolution + 0.5).astype(np.int64)
+        xs = np.clip(cells[:, 0], 0, window_max.shape[0] - 1)
+        ys = np.clip(cells[:, 1], 0, window_max.shape[1] - 1)
+        return window_max[xs, ys] <= cells[:, 2]
+
+    def supported_mask(self, positions: Sequence[Tuple[float, float, float]], size: Tuple[float, float, float]) -> np.ndarray:
+        """Positions dont la base repose sur la surface (sol ou dessus du chargement) sous l'empreinte."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        if not len(positions):
+            return np.zeros(0, dtype=bool)
+
+        window_max = self._window_max(size)
+        cells = np.floor(positions / self.resolution + 0.5).astype(np.int64)
+        xs = np.clip(cells[:, 0], 0, window_max.shape[0] - 1)
+        ys = np.clip(cells[:, 1], 0, window_max.shape[1] - 1)
+        return window_max[xs, ys] == cells[:, 2]
+
+    def stacking_mask(self, positions: Sequence[Tuple[float, float, float]], size: Tuple[float, float, float],
+                      weight: float) -> np.ndarray:
+        """Refuse les positions posées sur une palette plus légère (lecture de la carte des poids)."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        mask = np.ones(len(positions), dtype=bool)
+
+        cells = np.floor(positions / self.resolution + 0.5).astype(np.int64)
+        length, width = self.heights.shape
+        lx, ly = self._window(size)
+        xs = np.clip(cells[:, 0], 0, length - lx)
+        ys = np.clip(cells[:, 1], 0, width - ly)
+
+        # Une table de sommes 2D des cellules « plus légères en contact » par niveau
+        for level in np.unique(cells[:, 2]):
+            if level <= 0:
+                continue
+            bad = ((self.heights == level) & (self.top_weights < weight)).astype(np.int32)
+            table = np.zeros((length + 1, width + 1), dtype=np.int32)
+            table[1:, 1:] = bad.cumsum(0).cumsum(1)
+            rows = cells[:, 2] == level
+            x0, y0 = xs[rows], ys[rows]
+            count = table[x0 + lx, y0 + ly] - table[x0, y0 + ly] - table[x0 + lx, y0] + table[x0, y0]
+            mask[rows] = count == 0
+
+        return mask
+
+    def _window(self, size: Tuple[float, float, float]) -> Tuple[int, int]:
+        length, width = self.heights.shape
+        return (min(max(1, self._to_cell(size[0])), length),
+                min(max(1, self._to_cell(size[1])), width))
+
+    def _window_max(self, size: Tuple[float, float, float]) -> np.ndarray:
+        """Hauteur maximale sous chaque empreinte possible (maximum glissant séparable)."""
+        lx, ly = self._window(size)
+        rows = np.lib.stride_tricks.sliding_window_view(self.heights, lx, axis=0).max(axis=-1)
+        return np.lib.stride_tricks.sliding_window_view(rows, ly, axis=1).max(axis=-1)
+
+    def occupy(self, position: Sequence[float], dimensions: Dict[str, float], weight: float = 0.0):
+        """Élève la surface de l'empreinte jusqu'au sommet de la palette posée."""
+        x0, x1, y0, y1 = self._footprint(position, dimensions)
+        top = self._to_cell(position[2] + dimensions['height'])
+        self.heights[x0:x1, y0:y1] = np.maximum(self.heights[x0:x1, y0:y1], top)
+        self.top_weights[x0:x1, y0:y1] = weight
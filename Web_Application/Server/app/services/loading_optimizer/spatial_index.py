@@ -0,0 +1,122 @@
+# services/loading_optimizer/spatial_index.py
+from collections import defaultdict
+from math import floor
+from typing import Dict, List, Sequence, Set, Tuple
+import numpy as np
+from .models import LoadedPalette
+from .store import LoadedPaletteStore
+
+
+class SpatialIndex:
+    """
+    Index spatial des palettes chargées.
+
+    Les palettes sont rangées dans une grille uniforme du plancher (hachage par
+    cellule (ix, iy)) et par niveau de dessus (z arrondi au centimètre). Les
+    vérifications ne parcourent ainsi que les palettes de la colonne concernée
+    au lieu de toutes les palettes du camion. L'index ne conserve que les
+    indices des palettes dans le LoadedPaletteStore.
+    """
+
+    def __init__(self, store: LoadedPaletteStore, cell_size: float = 0.4):
+        self.store = store
+        self.cell_size = cell_size
+        self.buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.by_top: Dict[float, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _cells(self, x: float, y: float, length: float, width: float) -> List[Tuple[int, int]]:
+        """Cellules du plancher couvertes par une empreinte."""
+        epsilon = 1e-9
+        x0, x1 = floor(x / self.cell_size), floor((x + length - epsilon) / self.cell_size)
+        y0, y1 = floor(y / self.cell_size), floor((y + width - epsilon) / self.cell_size)
+        return [(ix, iy) for ix in range(x0, x1 + 1) for iy in range(y0, y1 + 1)]
+
+    @staticmethod
+    def _level(z: float) -> float:
+        return round(z, 2)
+
+    def add(self, index: int):
+        """Indexe la palette d'indice `index` du store, qui vient d'être chargée."""
+        x, y, z = self.store.origins[index].tolist()
+        length, width, height = self.store.sizes[index].tolist()
+        for cell in self._cells(x, y, length, width):
+            self.buckets[cell].append(index)
+        self.by_top[self._level(z + height)].add(index)
+
+    def remove(self, index: int):
+        """
+        Désindexe la palette d'indice `index`, avant son retrait du store.
+
+        Les indices suivants sont décrémentés comme ceux des colonnes du store.
+        """
+        x, y, z = self.store.origins[index].tolist()
+        length, width, height = self.store.sizes[index].tolist()
+        for cell in self._cells(x, y, length, width):
+            bucket = self.buckets[cell]
+            bucket.remove(index)
+            if not bucket:
+                del self.buckets[cell]
+        level = self._level(z + height)
+        self.by_top[level].discard(index)
+        if not self.by_top[level]:
+            del self.by_top[level]
+
+        for bucket in self.buckets.values():
+            bucket[:] = [i - (i > index) for i in bucket]
+        for level, ids in self.by_top.items():
+            self.by_top[level] = {i - (i > index) for i in ids}
+
+    def _column_ids(self, x: float, y: float, length: float, width: float) -> Set[int]:
+        ids = set()
+        for cell in self._cells(x, y, length, width):
+            bucket = self.buckets.get(cell)
+            if bucket:
+                ids.update(bucket)
+        return ids
+
+    def column(self, x: float, y: float, length: float, width: float) -> List[LoadedPalette]:
+        """Palettes dont l'empreinte partage une cellule avec celle donnée (toutes hauteurs)."""
+        return [self.store.materialize(i) for i in sorted(self._column_ids(x, y, length, width))]
+
+    def neighbour_ids(self, positions: Sequence[Tuple[float, float, float]], length: float,
+                      width: float) -> np.ndarray:
+        """
+        Indices des palettes partageant une cellule avec l'une des N empreintes de même taille.
+
+        Les cellules couvertes sont marquées en une passe vectorisée (tableau de
+        différences 2D), puis seuls les seaux de ces cellules sont lus.
+        """
+        if not self.buckets or not len(positions):
+            return np.zeros(0, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        epsilon = 1e-9
+        x0 = np.floor(positions[:, 0] / self.cell_size).astype(np.int64)
+        x1 = np.floor((positions[:, 0] + length - epsilon) / self.cell_size).astype(np.int64)
+        y0 = np.floor(positions[:, 1] / self.cell_size).astype(np.int64)
+        y1 = np.floor((positions[:, 1] + width - epsilon) / self.cell_size).astype(np.int64)
+
+        ox, oy = int(x0.min()), int(y0.min())
+        diff = np.zeros((int(x1.max()) - ox + 2, int(y1.max()) - oy + 2), dtype=np.int32)
+        np.add.at(diff, (x0 - ox, y0 - oy), 1)
+        np.add.at(diff, (x1 + 1 - ox, y0 - oy), -1)
+        np.add.at(diff, (x0 - ox, y1 + 1 - oy), -1)
+        np.add.at(diff, (x1 + 1 - ox, y1 + 1 - oy), 1)
+        covered = diff.cumsum(axis=0).cumsum(axis=1) > 0
+
+        ids = set()
+        for (ix, iy), bucket in self.buckets.items():
+            i, j = ix - ox, iy - oy
+            if 0 <= i < covered.shape[0] and 0 <= j < covered.shape[1] and covered[i, j]:
+                ids.update(bucket)
+        return np.fromiter(sorted(ids), dtype=np.int64, count=len(ids))
+
+    def supporting_ids(self, x: float, y: float, length: float, width: float, z: float) -> np.ndarray:
+        """Indices des palettes de la colonne dont le dessus est au niveau z (support direct possible)."""
+        level_ids = self.by_top.get(self._level(z))
+        if not level_ids:
+            return np.zeros(0, dtype=np.int64)
+        ids = self._column_ids(x, y, length, width) & level_ids
+        return np.fromiter(sorted(ids), dtype=np.int64, count=len(ids))
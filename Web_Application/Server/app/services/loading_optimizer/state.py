@@ -0,0 +1,172 @@
+# services/loading_optimizer/state.py
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from .compatibility import CompatibilityTable
+from .instrumentation import ConstraintProfiler
+from .models import LoadedPalette
+from .space import TruckSpace, HeightMap
+from .spatial_index import SpatialIndex
+from .store import LoadedPaletteStore
+
+# Position de l'essieu arrière (ou du groupe d'essieux) en fraction de la longueur utile,
+# la charge avant étant reprise à l'avant de la caisse (pivot / essieu avant)
+REAR_AXLE_RATIO = 0.85
+
+def palette_signature(length: float, width: float, height: float, weight: float,
+                      product_type: str, destination: str) -> Tuple:
+    """Clé de deux palettes interchangeables (empreinte indépendante de la rotation)."""
+    return (round(max(length, width), 6), round(min(length, width), 6), round(height, 6),
+            weight, product_type, destination)
+
+
+class LoadingState:
+    """
+    État du chargement d'un camion pendant l'arrangement.
+
+    Regroupe l'espace (grille ou carte des hauteurs), les palettes chargées (en
+    colonnes), leur index spatial et les points extrêmes, et tient à jour des totaux cumulés
+    (Σw, Σw·x, Σw·y, charges par essieu, volume utilisé) en O(1) par placement ou
+    retrait. Le centre de gravité, les charges par essieu et l'utilisation se lisent
+    ainsi sans reparcourir les palettes.
+    """
+
+    def __init__(self, truck_space: TruckSpace | HeightMap, truck_dimensions: Dict[str, float],
+                 compatibility: Optional[CompatibilityTable] = None):
+        self.truck_space = truck_space
+        self.truck_dimensions = truck_dimensions
+        self.store = LoadedPaletteStore()
+        self.spatial_index = SpatialIndex(self.store)
+        # Points extrêmes : coin avant gauche au sol au départ
+        self.extreme_points: List[Tuple[float, float, float]] = [(0.0, 0.0, 0.0)]
+
+        self.total_weight = 0.0
+        self.weighted_x = 0.0  # Σ w·x
+        self.weighted_y = 0.0  # Σ w·y
+        self.used_volume = 0.0
+        # Charges par essieu (règle du levier sur le centre de chaque palette)
+        self.front_axle_load = 0.0
+        self.rear_axle_load = 0.0
+        # Abscisses triées des palettes par destination (séquence de chargement)
+        self.destination_positions: Dict[str, List[float]] = defaultdict(list)
+        # OU des masques d'incompatibilité des types chargés
+        self.compatibility = compatibility
+        self.incompatible_mask = 0
+        # Compteurs par contrainte (None = instrumentation désactivée)
+        self.profiler: Optional[ConstraintProfiler] = None
+
+        # Symétries : palettes par boîte (position, taille, poids, type, destination)
+        # et nombre de boîtes sans symétrique par rapport au milieu de la largeur
+        self._box_counts: Counter = Counter()
+        self._asymmetric_boxes = 0
+        # (signature, position) de la dernière palette placée
+        self.last_placed: Optional[Tuple[Tuple, Tuple[float, float, float]]] = None
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def loaded_palettes(self) -> List[LoadedPalette]:
+        """Palettes chargées sous forme d'objets (construits à la demande)."""
+        return self.store.to_loaded_palettes()
+
+    def add(self, palette: LoadedPalette):
+        """Enregistre une palette placée et met à jour les totaux."""
+        self.spatial_index.add(self.store.append(palette))
+        self._update_totals(palette, 1)
+        insort(self.destination_positions[palette.destination], palette.position.x)
+        if self.compatibility is not None:
+            self.incompatible_mask |= self.compatibility.mask(palette.product_type)
+
+        dimensions = palette.dimensions
+        self._count_box(self._box(palette), 1)
+        self.last_placed = (
+            palette_signature(dimensions['length'], dimensions['width'], dimensions['height'],
+                              palette.weight, palette.product_type, palette.destination),
+            (palette.position.x, palette.position.y, palette.position.z)
+        )
+
+    def remove(self, palette_id: int) -> LoadedPalette:
+        """
+        Retire une palette chargée et met à jour les totaux, les colonnes et l'index.
+
+        Le modèle d'espace et les points extrêmes ne sont pas rétablis : un
+        arrangement qui doit replacer des palettes repart d'un état reconstruit.
+        """
+        i = self.store.index(palette_id)
+        self.spatial_index.remove(i)
+        palette = self.store.remove(i)
+        self._update_totals(palette, -1)
+        positions = self.destination_positions[palette.destination]
+        del positions[bisect_left(positions, palette.position.x)]
+        if not positions:
+            del self.destination_positions[palette.destination]
+        if self.compatibility is not None:
+            # Un OU ne se défait pas : masque recalculé sur les types restants
+            loaded_types = {self.store.type_names[t] for t in self.store.type_ids[:len(self.store)].tolist()}
+            self.incompatible_mask = self.compatibility.combined_mask(loaded_types)
+
+        self._count_box(self._box(palette), -1)
+        self.last_placed = None
+        return palette
+
+    def _update_totals(self, palette: LoadedPalette, sign: int):
+        weight = sign * palette.weight
+        dimensions = palette.dimensions
+        self.total_weight += weight
+        self.weighted_x += weight * palette.position.x
+        self.weighted_y += weight * palette.position.y
+        self.used_volume += sign * dimensions['length'] * dimensions['width'] * dimensions['height']
+
+        rear = weight * (palette.position.x + dimensions['length'] / 2) / self._rear_axle_x()
+        self.front_axle_load += weight - rear
+        self.rear_axle_load += rear
+
+    def _rear_axle_x(self) -> float:
+        return REAR_AXLE_RATIO * self.truck_dimensions['length']
+
+    @staticmethod
+    def _box(palette: LoadedPalette) -> Tuple:
+        position, dimensions = palette.position, palette.dimensions
+        return (round(position.x, 6), round(position.y, 6), round(position.z, 6),
+                round(dimensions['length'], 6), round(dimensions['width'], 6),
+                round(dimensions['height'], 6), palette.weight, palette.product_type,
+                palette.destination)
+
+    def _mirror_box(self, box: Tuple) -> Tuple:
+        """Boîte symétrique par rapport au plan médian de la largeur du camion."""
+        x, y, z, length, width = box[:5]
+        return (x, round(self.truck_dimensions['width'] - y - width, 6), z, length, width) + box[5:]
+
+    def _count_box(self, box: Tuple, delta: int):
+        # Seuls la boîte et sa symétrique changent de statut
+        keys = {box, self._mirror_box(box)}
+        before = sum(self._box_counts[k] != self._box_counts[self._mirror_box(k)] for k in keys)
+        self._box_counts[box] += delta
+        after = sum(self._box_counts[k] != self._box_counts[self._mirror_box(k)] for k in keys)
+        self._asymmetric_boxes += after - before
+
+    def is_width_symmetric(self) -> bool:
+        """Vrai si le chargement est symétrique par rapport au milieu de la largeur (camion vide compris)."""
+        return self._asymmetric_boxes == 0
+
+    def center_of_gravity(self, weight: float = 0.0, x: float = 0.0, y: float = 0.0) -> Optional[Tuple[float, float]]:
+        """Centre de gravité (x, y), en ajoutant éventuellement une palette hypothétique."""
+        total_weight = self.total_weight + weight
+        if total_weight <= 0:
+            return None
+        return ((self.weighted_x + weight * x) / total_weight,
+                (self.weighted_y + weight * y) / total_weight)
+
+    def axle_loads(self) -> Tuple[float, float]:
+        """Charges (avant, arrière) par la règle du levier entre l'avant et l'essieu arrière."""
+        return self.front_axle_load, self.rear_axle_load
+
+    def nearest_same_destination(self, destination: str, x: float) -> Optional[float]:
+        """Distance en x à la palette la plus proche de même destination (recherche dichotomique)."""
+        positions = self.destination_positions.get(destination)
+        if not positions:
+            return None
+        i = bisect_left(positions, x)
+        candidates = positions[max(i - 1, 0):i + 1]
+        return min(abs(p - x) for p in candidates)
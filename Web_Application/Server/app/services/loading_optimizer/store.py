@@ -0,0 +1,107 @@
+# services/loading_optimizer/store.py
+from typing import Dict, List, Tuple
+import numpy as np
+from .models import LoadedPalette, Position3D
+
+
+class LoadedPaletteStore:
+    """
+    Palettes chargées stockées en colonnes (structure de tableaux).
+
+    Positions, tailles, poids, rotations et types sont rangés dans des tableaux
+    NumPy parallèles, agrandis par doublement. Les boucles de placement lisent
+    directement ces colonnes ; les objets LoadedPalette ne sont construits qu'à
+    la sortie (plan final, chemins de référence).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._count = 0
+        self.origins = np.zeros((capacity, 3), dtype=np.float64)  # (x, y, z)
+        self.sizes = np.zeros((capacity, 3), dtype=np.float64)  # (longueur, largeur, hauteur)
+        self.weights = np.zeros(capacity, dtype=np.float64)
+        self.rotations = np.zeros(capacity, dtype=np.int16)
+        self.type_ids = np.zeros(capacity, dtype=np.int32)
+        self.palette_ids: List[int] = []
+        self.destinations: List[str] = []
+
+        # Table des types de produit : identifiant entier <-> nom
+        self.type_names: List[str] = []
+        self._type_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self):
+        capacity = 2 * len(self.weights)
+        for name in ('origins', 'sizes', 'weights', 'rotations', 'type_ids'):
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:self._count] = column[:self._count]
+            setattr(self, name, grown)
+
+    def _type_id(self, product_type: str) -> int:
+        type_id = self._type_index.get(product_type)
+        if type_id is None:
+            type_id = self._type_index[product_type] = len(self.type_names)
+            self.type_names.append(product_type)
+        return type_id
+
+    def append(self, palette: LoadedPalette) -> int:
+        """Ajoute une palette placée et retourne son indice dans les colonnes."""
+        if self._count == len(self.weights):
+            self._grow()
+
+        i = self._count
+        position = palette.position
+        dimensions = palette.dimensions
+        self.origins[i] = (position.x, position.y, position.z)
+        self.sizes[i] = (dimensions['length'], dimensions['width'], dimensions['height'])
+        self.weights[i] = palette.weight
+        self.rotations[i] = position.rotation
+        self.type_ids[i] = self._type_id(palette.product_type)
+        self.palette_ids.append(palette.palette_id)
+        self.destinations.append(palette.destination)
+
+        self._count += 1
+        return i
+
+    def index(self, palette_id: int) -> int:
+        """Indice dans les colonnes de la palette chargée d'identifiant donné."""
+        return self.palette_ids.index(palette_id)
+
+    def remove(self, i: int) -> LoadedPalette:
+        """Retire la palette d'indice i ; les palettes suivantes reculent d'un rang (ordre de placement conservé)."""
+        palette = self.materialize(i)
+        n = self._count
+        for name in ('origins', 'sizes', 'weights', 'rotations', 'type_ids'):
+            column = getattr(self, name)
+            column[i:n - 1] = column[i + 1:n]
+            column[n - 1] = 0
+        del self.palette_ids[i]
+        del self.destinations[i]
+        self._count -= 1
+        return palette
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vues (origines (M,3), tailles (M,3), poids (M,)) sur les palettes chargées, sans copie."""
+        n = self._count
+        return self.origins[:n], self.sizes[:n], self.weights[:n]
+
+    def materialize(self, i: int) -> LoadedPalette:
+        """Reconstruit l'objet LoadedPalette de la palette d'indice i."""
+        x, y, z = self.origins[i].tolist()
+        length, width, height = self.sizes[i].tolist()
+        rotation = int(self.rotations[i])
+        return LoadedPalette(
+            palette_id=self.palette_ids[i],
+            position=Position3D(x=x, y=y, z=z, rotation=rotation),
+            weight=float(self.weights[i]),
+            dimensions={'length': length, 'width': width, 'height': height},
+            product_type=self.type_names[self.type_ids[i]],
+            destination=self.destinations[i],
+            is_rotated=rotation == 90
+        )
+
+    def to_loaded_palettes(self) -> List[LoadedPalette]:
+        """Toutes les palettes chargées, dans l'ordre de placement."""
+        return [self.materialize(i) for i in range(self._count)]
@@ -1,27 +1,13 @@
 # services/loading_optimizer/utils.py
-import json
 from math import sqrt
 from typing import Dict, List, Optional, Tuple
 import requests
 from .models import ProductTypeConstraints
+from .registry import get_constraint_registry
 
 def load_product_constraints(config_path: str) -> Dict[str, ProductTypeConstraints]:
-    """Load product constraints from JSON configuration file."""
-    with open(config_path, 'r') as f:
-        config = json.load(f)
-    
-    constraints = {}
-    for product in config['product_types']:
-        constraints[product['type']] = ProductTypeConstraints(
-            type=product['type'],
-            fragility=product['fragility'],
-            rotatable=product['rotatable'],
-            incompatible_types=product['incompatible_types'],
-            min_temperature=product['min_temperature'],
-            max_temperature=product['max_temperature'],
-            max_stack_weight=product.get('max_stack_weight')
-        )
-    return constraints
+    """Load product constraints from the shared registry (parsed once, reloaded on mtime change)."""
+    return get_constraint_registry(config_path).constraints
 
 def get_route_distance(origins: List[str], destinations: List[str]) -> List[float]:
     """Calculate distances between locations using OpenStreetMap."""
@@ -2,7 +2,6 @@ from flask import Flask, request, jsonify
 from datetime import datetime
 from sqlalchemy.orm import sessionmaker
 import os
-import json
 from math import radians, cos, sin, asin, sqrt
 from datetime import datetime, timedelta
 import sys
@@ -11,6 +10,7 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")
 sys.path.insert(0, parent_dir)
 
 from app.models import init_db, User, Command, Palette, Product, Camion, Stock, UserRole
+from app.services.loading_optimizer.registry import get_constraint_registry
 
 
 # /*//////////////////////////////////////////////////////////////
@@ -28,12 +28,8 @@ DEFAULT_PALETTE_DIMENSION = 1.0  # dimensions par défaut (height, width, length
 THRESHOLD_DISTANCE = 10  # Threshold distance (in kilometers) to group orders and to check supplier proximity
 WAREHOUSE_COORD = "48.8566,2.3522"  # example coordinate (Paris center)
 
-# Load the JSON file with product types and their constraints
-PRODUCTS_JSON_PATH = os.path.join(parent_dir, "Web_Application/Server/products.json")
-with open(PRODUCTS_JSON_PATH, "r") as f:
-    products_data = json.load(f)
-# Build a lookup dictionary for product type info
-product_types_info = {pt["type"]: pt for pt in products_data.get("product_types", [])}
+# Product types and their constraints: shared registry (parsed once, reloaded when the file changes)
+product_constraints = get_constraint_registry()
 
 
 # /*//////////////////////////////////////////////////////////////
@@ -311,17 +307,17 @@ def plan_delivery():
         if not coords:
             continue
         ptype = product.type  # must correspond to a key in the JSON
-        pt_info = product_types_info.get(ptype, {})
+        pt_info = product_constraints.get(ptype)
         orders_info.append(
             {
                 "order_id": order.id,
                 "coords": coords,
                 "product_type": ptype,
-                "incompatible_types": pt_info.get("incompatible_types", []),
+                "incompatible_types": pt_info.incompatible_types if pt_info else [],
                 "weight": palette.weight,
                 "volume": palette.height * palette.width * palette.length,
-                "min_temp": pt_info.get("min_temperature"),
-                "max_temp": pt_info.get("max_temperature"),
+                "min_temp": pt_info.min_temperature if pt_info else None,
+                "max_temp": pt_info.max_temperature if pt_info else None,
                 "deadline": order.max_date,  # deadline for delivery (a date object)
             }
         )
@@ -2,9 +2,8 @@
 
 from datetime import datetime, timedelta
 from math import radians, cos, sin, asin, sqrt
-import json
-import os
 from ...models import Session, Command, Palette, Product, Stock, User, Camion, UserRole
+from ..loading_optimizer.registry import get_constraint_registry
 
 class PlanningOptimizationService:
     def __init__(self):
@@ -12,14 +11,8 @@ class PlanningOptimizationService:
         self.WAREHOUSE_COORD = "48.8566,2.3522"  # Paris center
         self.DEFAULT_CHARGING_TIME = 40  # minutes
         
-        # Chargement des données produits
-        parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        products_path = os.path.join(parent_dir, "Web_Application/Server/products.json")
-        with open(products_path, "r") as f:
-            self.products_data = json.load(f)
-        self.product_types_info = {
-            pt["type"]: pt for pt in self.products_data.get("product_types", [])
-        }
+        # Contraintes produits : registre partagé (Server/products.json)
+        self.constraint_registry = get_constraint_registry()
 
     def parse_coordinates(self, destination):
         """Parse coordinates from 'lat,lon' string format."""
@@ -173,16 +166,16 @@ class PlanningOptimizationService:
             if not coords:
                 continue
                 
-            pt_info = self.product_types_info.get(product.type, {})
+            pt_info = self.constraint_registry.get(product.type)
             orders_info.append({
                 "order_id": order.id,
                 "coords": coords,
                 "product_type": product.type,
-                "incompatible_types": pt_info.get("incompatible_types", []),
+                "incompatible_types": pt_info.incompatible_types if pt_info else [],
                 "weight": palette.weight,
                 "volume": palette.height * palette.width * palette.length,
-                "min_temp": pt_info.get("min_temperature"),
-                "max_temp": pt_info.get("max_temperature"),
+                "min_temp": pt_info.min_temperature if pt_info else None,
+                "max_temp": pt_info.max_temperature if pt_info else None,
                 "deadline": order.max_date
             })
         return orders_info
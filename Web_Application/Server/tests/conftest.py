@@ -0,0 +1,107 @@
+import random
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+
+from app.models import Camion, CamionType, PaletteType
+from app.services.loading_optimizer.optimizer import TruckLoadingOptimizer
+from app.services.loading_optimizer.registry import DEFAULT_PRODUCTS_PATH
+
+FOOTPRINTS = {
+    PaletteType.EUROPEAN: (1.2, 0.8),
+    PaletteType.AMERICAN: (1.2, 1.0),
+}
+
+
+@dataclass
+class FakeProduct:
+    type: str
+
+
+@dataclass
+class FakeCommand:
+    destination: str
+
+
+@dataclass
+class FakePalette:
+    """Palette en mémoire exposant les attributs lus par l'optimiseur."""
+    id: int
+    palette_type: PaletteType
+    weight: float
+    length: float
+    width: float
+    height: float
+    product: FakeProduct
+    command: FakeCommand
+
+    @property
+    def volume(self) -> float:
+        return self.length * self.width * self.height
+
+
+def make_palette(palette_id: int, kind: PaletteType = PaletteType.EUROPEAN, product: str = 'Industrial_Machinery',
+                 weight: float = 500.0, height: float = 1.2, destination: str = 'A') -> FakePalette:
+    length, width = FOOTPRINTS[kind]
+    return FakePalette(palette_id, kind, weight, length, width, height,
+                       FakeProduct(product), FakeCommand(destination))
+
+
+def make_truck(truck_id: int = 1, truck_type: CamionType = CamionType.SEMI_STANDARD,
+               cost: float = 1000.0) -> Camion:
+    """Camion non persisté (aucune session)."""
+    truck = Camion(type_camion=truck_type, mark="Test", immatriculation=f"TEST-{truck_id}",
+                   state=True, transport_cost=cost)
+    truck.id = truck_id
+    return truck
+
+
+def random_palettes(count: int, seed: int, heights=(0.8, 1.0, 1.4), products=('Industrial_Machinery',)) -> List[FakePalette]:
+    rng = random.Random(seed)
+    return [
+        make_palette(i, rng.choice(list(FOOTPRINTS)), rng.choice(products),
+                     round(rng.uniform(100, 900), 1), rng.choice(heights), f"D{rng.randrange(3)}")
+        for i in range(count)
+    ]
+
+
+def plan_defects(plan, truck, constraints, eps: float = 1e-6) -> List[str]:
+    """Défauts physiques d'un plan : hors camion, chevauchement, palette en l'air, plus lourde sur plus légère, charge sur fragile."""
+    specs = truck.specifications
+    limits = (specs['longueur'], specs['largeur'], specs['hauteur'])
+    boxes = [
+        (lp, (lp.position.x, lp.position.y, lp.position.z),
+         (lp.dimensions['length'], lp.dimensions['width'], lp.dimensions['height']))
+        for lp in plan.loaded_palettes
+    ]
+    defects = []
+    for lp, origin, size in boxes:
+        if any(origin[i] < -eps or origin[i] + size[i] > limits[i] + eps for i in range(3)):
+            defects.append(f"{lp.palette_id} hors du camion")
+        supported = origin[2] <= eps
+        for other, o_origin, o_size in boxes:
+            if other is lp:
+                continue
+            overlap = [min(origin[i] + size[i], o_origin[i] + o_size[i]) - max(origin[i], o_origin[i]) for i in range(3)]
+            if all(v > eps for v in overlap):
+                defects.append(f"{lp.palette_id} chevauche {other.palette_id}")
+            if overlap[0] > eps and overlap[1] > eps and abs(o_origin[2] + o_size[2] - origin[2]) <= 1e-3:
+                supported = True
+                if other.weight < lp.weight:
+                    defects.append(f"{lp.palette_id} plus lourde que {other.palette_id} en dessous")
+                if constraints[other.product_type].fragility:
+                    defects.append(f"{lp.palette_id} posée sur la palette fragile {other.palette_id}")
+        if not supported:
+            defects.append(f"{lp.palette_id} en l'air (z={origin[2]})")
+    return defects
+
+
+@pytest.fixture
+def optimizer():
+    return TruckLoadingOptimizer(None, DEFAULT_PRODUCTS_PATH)
+
+
+@pytest.fixture
+def truck():
+    return make_truck()
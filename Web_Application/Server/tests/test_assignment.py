@@ -0,0 +1,237 @@
+import json
+import random
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models import CamionType
+from app.services.loading_optimizer import assignment
+from app.services.loading_optimizer import optimizer as optimizer_module
+from app.services.loading_optimizer.assignment import assignment_cost, solve_truck_assignment
+from app.services.loading_optimizer.fleet import PALETTE_KINDS, CapacityTree, FleetMatrix
+from app.services.loading_optimizer.models import LoadingOptions
+from app.services.loading_optimizer.optimizer import TruckLoadingOptimizer
+from tests.conftest import make_palette, make_truck, random_palettes
+
+
+def fleet():
+    return [make_truck(1, CamionType.SEMI_STANDARD, 1200.0), make_truck(2, CamionType.PORTEUR_MOYEN, 700.0),
+            make_truck(3, CamionType.FOURGON, 300.0), make_truck(4, CamionType.FOURGON, 300.0)]
+
+
+def commands(seed):
+    palettes = random_palettes(24, seed, heights=(1.0, 1.4), products=('Industrial_Machinery', 'Recyclable_Plastic'))
+    return [SimpleNamespace(palettes=palettes[:12]), SimpleNamespace(palettes=palettes[12:])]
+
+
+def test_solver_finds_the_cheapest_fleet():
+    palettes = [make_palette(i, weight=400.0, height=1.0) for i in range(3)]
+    trucks = [make_truck(1, CamionType.FOURGONNETTE, 100.0), make_truck(2, CamionType.FOURGONNETTE, 100.0),
+              make_truck(3, CamionType.FOURGON, 500.0)]
+
+    assignments, optimal = solve_truck_assignment([palettes], [trucks], [], time_limit=5.0)
+
+    # Deux palettes au plus par fourgonnette (800 kg, deux places au sol, une couche)
+    assert optimal
+    assert sorted(assignments) == [1, 2]
+    assert assignment_cost(assignments, trucks, 3) == (0, 200.0)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_exact_assignment_is_never_worse_than_greedy(optimizer, seed):
+    trucks = fleet()
+    greedy = optimizer._optimize_truck_assignment(commands(seed), trucks, LoadingOptions())
+    exact = optimizer._optimize_truck_assignment(commands(seed), trucks, LoadingOptions(exact_assignment=True))
+
+    count = sum(len(command.palettes) for command in commands(seed))
+    assert assignment_cost(exact, trucks, count) <= assignment_cost(greedy, trucks, count)
+    specs = {truck.id: truck.specifications for truck in trucks}
+    for truck_id, palettes in exact.items():
+        assert sum(p.weight for p in palettes) <= specs[truck_id]['charge_utile']
+        assert sum(p.volume for p in palettes) <= specs[truck_id]['volume']
+
+
+def test_missing_ortools_keeps_the_greedy_assignment(optimizer, monkeypatch, capsys):
+    greedy = optimizer._optimize_truck_assignment(commands(0), fleet(), LoadingOptions())
+    monkeypatch.setattr(assignment, 'cp_model', None)
+
+    exact = optimizer._optimize_truck_assignment(commands(0), fleet(), LoadingOptions(exact_assignment=True))
+
+    assert {t: [p.id for p in ps] for t, ps in exact.items()} == {t: [p.id for p in ps] for t, ps in greedy.items()}
+    assert "OR-Tools non installé" in capsys.readouterr().out
+
+
+def test_solver_time_is_bounded_by_the_deadline(optimizer, monkeypatch, capsys):
+    limits = []
+
+    def record(groups, suitable, conflicts, time_limit, hint=None):
+        limits.append(time_limit)
+        return None
+
+    monkeypatch.setattr(optimizer_module, 'solve_truck_assignment', record)
+    options = LoadingOptions(exact_assignment=True, assignment_time_limit=5.0)
+
+    optimizer._optimize_truck_assignment(commands(0), fleet(), options, deadline=time.monotonic() + 0.5)
+    assert len(limits) == 1 and 0 < limits[0] <= 0.5
+
+    # Échéance dépassée : le solveur n'est pas lancé
+    optimizer._optimize_truck_assignment(commands(0), fleet(), options, deadline=time.monotonic() - 1)
+    assert len(limits) == 1
+    assert "échéance atteinte" in capsys.readouterr().out
+
+
+def test_split_puts_a_palette_in_the_first_opened_truck_that_can_carry_it(optimizer):
+    trucks = [make_truck(1, CamionType.FOURGON, 300.0), make_truck(2, CamionType.SEMI_STANDARD, 1200.0)]
+    heavy, medium, light = (make_palette(i, weight=w, height=1.0) for i, w in ((1, 23000.0), (2, 2800.0), (3, 1000.0)))
+    assignments = {}
+
+    # Le semi, ouvert pour la palette lourde, ne peut pas porter la moyenne : le fourgon
+    # est ouvert ; la légère va dans le semi (2000 kg restants), premier camion ouvert
+    leftovers = optimizer._split_between_trucks([light, medium, heavy], FleetMatrix(trucks), assignments)
+
+    assert leftovers == []
+    assert {t: [p.id for p in ps] for t, ps in assignments.items()} == {2: [1, 3], 1: [2]}
+
+
+def test_split_returns_what_no_free_truck_can_carry(optimizer):
+    trucks = [make_truck(1, CamionType.FOURGON, 300.0), make_truck(2, CamionType.FOURGON, 300.0)]
+    taken = [make_palette(9, weight=100.0, height=1.0)]
+    assignments = {2: taken}
+    palettes = [make_palette(1, weight=3000.0, height=1.0), make_palette(2, weight=4000.0, height=1.0),
+                make_palette(3, weight=1000.0, height=1.0)]
+
+    leftovers = optimizer._split_between_trucks(palettes, FleetMatrix(trucks), assignments)
+
+    # Trop lourde pour la flotte, puis sans place dans le seul camion libre
+    assert [p.id for p in leftovers] == [2, 3]
+    assert [p.id for p in assignments[1]] == [1]
+    assert assignments[2] is taken
+
+
+def linear_first_fit(palettes, fleet, closed):
+    """First-fit décroissant de référence : parcours linéaire des camions ouverts puis libres."""
+    kinds = [PALETTE_KINDS.index(p.palette_type.value) for p in palettes]
+    levels = np.floor(fleet.height / min(p.height for p in palettes))
+    volume, payload, slots = fleet.volume.copy(), fleet.payload.copy(), levels.copy()
+    max_volume, max_payload = fleet.volume[np.isfinite(fleet.volume)].max(), fleet.payload.max()
+    order = sorted(range(len(palettes)),
+                   key=lambda i: -max(palettes[i].volume / max_volume, palettes[i].weight / max_payload))
+
+    def fits(i, t):
+        capacity = fleet.capacities[t, kinds[i]]
+        return (capacity > 0 and palettes[i].volume <= volume[t] and palettes[i].weight <= payload[t] and
+                1 / capacity <= slots[t] + 1e-9)
+
+    opened, loads, leftovers = [], {}, []
+    unused = [t for t, truck in enumerate(fleet.trucks) if truck.id not in closed]
+    for i in order:
+        target = next((t for t in opened if fits(i, t)), None)
+        if target is None:
+            target = next((t for t in unused if fits(i, t)), None)
+            if target is None:
+                leftovers.append(palettes[i].id)
+                continue
+            unused.remove(target)
+            opened.append(target)
+            loads[fleet.trucks[target].id] = []
+        loads[fleet.trucks[target].id].append(palettes[i].id)
+        volume[target] -= palettes[i].volume
+        payload[target] -= palettes[i].weight
+        slots[target] -= 1 / fleet.capacities[target, kinds[i]]
+    return loads, leftovers
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_split_matches_a_linear_first_fit(optimizer, seed):
+    rng = random.Random(seed)
+    trucks = [make_truck(i, rng.choice([CamionType.FOURGON, CamionType.PORTEUR_MOYEN, CamionType.SEMI_STANDARD]),
+                         rng.uniform(200, 1200)) for i in range(1, 9)]
+    palettes = random_palettes(80, seed)
+    for palette in palettes:
+        palette.weight *= rng.choice((1, 4))
+    fleet = FleetMatrix(trucks).by_cost_efficiency()
+    closed = {trucks[0].id: []}
+
+    assignments = dict(closed)
+    leftovers = optimizer._split_between_trucks(palettes, fleet, assignments)
+
+    loads, expected_leftovers = linear_first_fit(palettes, fleet, closed)
+    assert {t: [p.id for p in ps] for t, ps in assignments.items() if t not in closed} == loads
+    assert [p.id for p in leftovers] == expected_leftovers
+
+
+def test_capacity_tree_finds_the_leftmost_slot_covering_every_dimension():
+    tree = CapacityTree(5, 2)
+    for slot, capacities in enumerate([(5, 1), (1, 5), (4, 4), (6, 6), (2, 2)]):
+        tree.set(slot, capacities)
+
+    assert tree.first_fit((3, 3)) == 2
+    assert tree.first_fit((1, 2)) == 1
+    assert tree.first_fit((5, 5)) == 3
+    tree.remove(3)
+    assert tree.first_fit((5, 5)) is None
+    assert tree.first_fit((2, 2)) == 2
+
+
+@pytest.fixture
+def segregated_optimizer(tmp_path):
+    """Optimiseur dont la configuration interdit de transporter Food avec Chemicals."""
+    products = tmp_path / 'products.json'
+    products.write_text(json.dumps({'product_types': [
+        {'type': 'Food', 'incompatible_types': ['Chemicals']},
+        {'type': 'Chemicals', 'incompatible_types': []},
+    ]}))
+    return TruckLoadingOptimizer(None, str(products))
+
+
+def test_infeasible_greedy_assignment_is_neither_hint_nor_reference(segregated_optimizer, monkeypatch):
+    optimizer = segregated_optimizer
+    food = [make_palette(i, product='Food', weight=400.0, height=1.0) for i in range(4)]
+    chemicals = [make_palette(10 + i, product='Chemicals', weight=400.0, height=1.0) for i in range(4)]
+    trucks = [make_truck(1, CamionType.SEMI_STANDARD, 1000.0), make_truck(2, CamionType.SEMI_STANDARD, 1000.0)]
+    hints = []
+
+    def record(groups, suitable, conflicts, time_limit, hint=None):
+        hints.append(hint)
+        return solve_truck_assignment(groups, suitable, conflicts, time_limit, hint)
+
+    monkeypatch.setattr(optimizer_module, 'solve_truck_assignment', record)
+    # Les deux groupes dans le même camion : moins cher, mais infaisable
+    greedy = {1: food + chemicals}
+    fleet_matrix = FleetMatrix(trucks)
+    assert optimizer._infeasible_trucks(greedy, fleet_matrix) == {1}
+
+    exact = optimizer._exact_truck_assignment([food, chemicals], fleet_matrix, greedy,
+                                              LoadingOptions(exact_assignment=True))
+
+    assert hints == [None]
+    assert sorted(exact) == [1, 2]
+    for palettes in exact.values():
+        assert len({p.product.type for p in palettes}) == 1
+    assert optimizer.unassigned_palettes == []
+
+    command = SimpleNamespace(palettes=food + chemicals)
+    assigned = optimizer._optimize_truck_assignment([command], trucks, LoadingOptions(exact_assignment=True))
+    assert all(len({p.product.type for p in palettes}) == 1 for palettes in assigned.values())
+    assert sorted(p.id for palettes in assigned.values() for p in palettes) == sorted(p.id for p in food + chemicals)
+
+
+def test_greedy_assignment_never_reuses_a_truck_across_groups(segregated_optimizer):
+    optimizer = segregated_optimizer
+    food = [make_palette(i, product='Food', weight=400.0, height=1.0) for i in range(20)]
+    chemicals = [make_palette(100 + i, product='Chemicals', weight=400.0, height=1.0) for i in range(20)]
+    command = SimpleNamespace(palettes=food + chemicals)
+    trucks = [make_truck(1, CamionType.SEMI_STANDARD, 1000.0), make_truck(2, CamionType.SEMI_STANDARD, 1000.0)]
+
+    assigned = optimizer._optimize_truck_assignment([command], trucks, LoadingOptions())
+
+    assert sorted(assigned) == [1, 2]
+    assert optimizer._infeasible_trucks(assigned, FleetMatrix(trucks)) == set()
+    assert optimizer.unassigned_palettes == []
+
+    # Un seul camion : le second groupe reste à quai au lieu d'y être ajouté
+    assigned = optimizer._optimize_truck_assignment([command], trucks[:1], LoadingOptions())
+    assert [p.id for p in assigned[1]] == [p.id for p in food]
+    assert [p.id for p in optimizer.unassigned_palettes] == [p.id for p in chemicals]
@@ -0,0 +1,30 @@
+import json
+
+from app.scripts.benchmark_loading import compare, main
+
+
+def test_single_scenario_run_writes_its_summary(tmp_path, capsys):
+    output = tmp_path / 'bench.json'
+
+    main(['--seeds', '1', '--no-memory', '--scenario', 'porteur_moyen', '--output', str(output)])
+
+    report = json.loads(output.read_text())
+    assert list(report['scenarios']) == ['porteur_moyen']
+    assert [(r['scenario'], r['seed']) for r in report['results']] == [('porteur_moyen', 0)]
+    assert report['results'][0]['peak_memory_bytes'] is None
+    summary = report['summary']['porteur_moyen']
+    assert summary['runs'] == 1 and summary['loaded_ratio'] == 1.0
+    assert summary['max_peak_memory_bytes'] is None
+    assert 0 < summary['mean_space_utilization'] <= 1
+    assert f"Résultats écrits dans {output}" in capsys.readouterr().out
+
+
+def test_compare_skips_scenarios_missing_from_the_baseline(capsys):
+    current = {'porteur_moyen': {'runs': 1, 'mean_wall_time_s': 0.2}}
+
+    compare(current, {'eur_floor_semi': {'runs': 3, 'mean_wall_time_s': 0.1}})
+    assert capsys.readouterr().out == ''
+
+    compare(current, {'porteur_moyen': {'runs': 1, 'mean_wall_time_s': 0.1}})
+    out = capsys.readouterr().out
+    assert 'porteur_moyen' in out and '+100.0%' in out
@@ -0,0 +1,56 @@
+import itertools
+
+import pytest
+
+from app.services.loading_optimizer.compatibility import CompatibilityTable
+from app.services.loading_optimizer.models import ProductTypeConstraints
+from app.services.loading_optimizer.registry import DEFAULT_PRODUCTS_PATH, get_constraint_registry
+
+
+def constraint(name, incompatible=(), low=None, high=None):
+    return ProductTypeConstraints.from_dict({'type': name, 'incompatible_types': list(incompatible),
+                                             'min_temperature': low, 'max_temperature': high})
+
+
+@pytest.fixture
+def table():
+    return CompatibilityTable({
+        'Chemicals': constraint('Chemicals', incompatible=('Food', 'Unknown')),
+        'Food': constraint('Food', low=0, high=8),
+        'Frozen': constraint('Frozen', low=-25, high=-18),
+        'Textile': constraint('Textile'),
+    })
+
+
+def test_incompatibility_is_symmetric_and_ignores_unknown_names(table):
+    assert not table.is_compatible('Food', table.mask('Chemicals'))
+    assert not table.is_compatible('Chemicals', table.mask('Food'))
+    assert table.is_compatible('Textile', table.mask('Chemicals'))
+    assert 'Unknown' not in table.type_ids
+
+
+def test_combined_mask_accumulates_the_load(table):
+    load = table.combined_mask(['Textile', 'Food'])
+    assert not table.is_compatible('Chemicals', load)
+    assert table.is_compatible('Frozen', load)
+    assert table.combined_mask([]) == 0
+
+
+def test_can_group_adds_the_temperature_ranges(table):
+    assert not table.can_group('Food', 'Frozen')
+    assert not table.can_group('Chemicals', 'Food')
+    # Sans plage de température : compatible avec tout ce qui n'est pas interdit
+    assert table.can_group('Textile', 'Frozen')
+    assert table.can_group('Frozen', 'Frozen')
+
+
+def test_bitmasks_match_the_pairwise_rules_of_the_configuration():
+    constraints = get_constraint_registry(DEFAULT_PRODUCTS_PATH).constraints
+    table = CompatibilityTable(constraints)
+    for first, second in itertools.product(constraints, repeat=2):
+        a, b = constraints[first], constraints[second]
+        incompatible = second in a.incompatible_types or first in b.incompatible_types
+        low = max(t for t in (a.min_temperature, b.min_temperature, float('-inf')) if t is not None)
+        high = min(t for t in (a.max_temperature, b.max_temperature, float('inf')) if t is not None)
+        assert table.is_compatible(second, table.mask(first)) == (not incompatible)
+        assert table.can_group(first, second) == (not incompatible and low <= high)
@@ -0,0 +1,60 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.loading_optimizer import optimizer as optimizer_module
+from app.services.loading_optimizer.models import LoadingOptions
+from tests.conftest import make_truck, random_palettes
+
+
+def make_command(destination, palettes):
+    return SimpleNamespace(destination=destination, delivery_date=datetime(2025, 1, 6), palettes=palettes)
+
+
+def test_route_grouping_stops_requesting_distances_at_the_deadline(optimizer, monkeypatch):
+    calls = []
+
+    def slow_distance(origins, destinations):
+        calls.append((origins[0], destinations[0]))
+        time.sleep(0.05)
+        return [10.0]
+
+    monkeypatch.setattr(optimizer_module, 'get_route_distance', slow_distance)
+    commands = [make_command(f"D{i}", []) for i in range(4)]
+
+    groups = optimizer._group_by_route_compatibility(commands, deadline=time.monotonic() + 0.02)
+
+    # La première paire dépasse l'échéance : aucune autre distance n'est demandée
+    assert len(calls) == 1
+    assert sorted(len(group) for group in groups) == [1, 1, 2]
+
+
+def test_route_grouping_without_deadline_requests_every_pair(optimizer, monkeypatch):
+    calls = []
+    monkeypatch.setattr(optimizer_module, 'get_route_distance',
+                        lambda origins, destinations: calls.append(1) or [10.0])
+    commands = [make_command(f"D{i}", []) for i in range(4)]
+
+    groups = optimizer._group_by_route_compatibility(commands)
+
+    assert len(calls) == 6
+    assert [len(group) for group in groups] == [4]
+
+
+def test_exhausted_budget_returns_plans_marked_not_fully_optimized(optimizer, monkeypatch):
+    monkeypatch.setattr(optimizer_module, 'get_route_distance', lambda origins, destinations: [10.0])
+    palettes = random_palettes(12, seed=0)
+    commands = [make_command('A', palettes)]
+    trucks = [make_truck(1), make_truck(2, cost=1500.0)]
+    # Sans plan de plancher tabulé : les palettes passent par le placement glouton
+    options = LoadingOptions(use_floor_patterns=False)
+
+    plans = optimizer.optimize_loading(commands, trucks, options, time_budget_ms=0)
+
+    assert plans
+    assert all(not plan.fully_optimized for plan in plans.values())
+    placed = sorted(lp.palette_id for plan in plans.values() for lp in plan.loaded_palettes)
+    assert placed == sorted(p.id for p in palettes)
+
+    plans = optimizer.optimize_loading(commands, trucks, options)
+    assert all(plan.fully_optimized for plan in plans.values())
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from tests.conftest import make_palette, plan_defects, random_palettes
+
+
+def test_first_placement_creates_corner_points(optimizer, truck):
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    palette = make_palette(1)
+    optimizer._place_palette(state, optimizer._make_loaded_palette(palette, Position3D(0, 0, 0, 0)))
+
+    assert (0.0, 0.0, 0.0) not in state.extreme_points
+    assert {(1.2, 0.0, 0.0), (0.0, 0.8, 0.0), (0.0, 0.0, 1.2)} <= set(state.extreme_points)
+
+
+def test_point_above_a_lower_palette_is_not_used_in_mid_air(optimizer, truck):
+    # Une palette de 0.8 m à côté d'une de 1.4 m : le coin haut de la seconde,
+    # projeté le long de x, tombe à z=1.4 au-dessus de la première
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    optimizer._place_palette(state, optimizer._make_loaded_palette(make_palette(1, height=0.8, weight=900),
+                                                                   Position3D(0, 0, 0, 0)))
+    optimizer._place_palette(state, optimizer._make_loaded_palette(make_palette(2, height=1.4, weight=900),
+                                                                   Position3D(1.2, 0, 0, 0)))
+    assert (0.0, 0.0, 1.4) in state.extreme_points
+
+    dims = optimizer._get_palette_dimensions(make_palette(3, height=0.8))
+    supported = dict(zip(state.extreme_points, optimizer._supported_mask(state.extreme_points, dims, state)))
+    assert not supported[(0.0, 0.0, 1.4)]
+    assert supported[(0.0, 0.0, 0.8)]
+
+
+@pytest.mark.parametrize('space_mode', ['voxel', 'heightmap'])
+@pytest.mark.parametrize('first_fit', [False, True])
+def test_random_orderings_never_float(optimizer, truck, space_mode, first_fit):
+    options = LoadingOptions(space_mode=space_mode, use_floor_patterns=False)
+    palettes = random_palettes(40, seed=3, heights=(0.6, 0.8, 1.0, 1.4))
+    rng = random.Random(3)
+    for _ in range(30):
+        rng.shuffle(palettes)
+        state = optimizer._initialize_loading_state(truck, options)
+        for palette in palettes:
+            position = optimizer._find_optimal_position(palette, state, truck, first_fit, options)
+            if position is not None:
+                optimizer._place_palette(state, optimizer._make_loaded_palette(palette, position))
+        plan = optimizer._build_loading_suggestion(state, truck)
+        defects = [d for d in plan_defects(plan, truck, optimizer.product_constraints) if "en l'air" in d]
+        assert defects == []
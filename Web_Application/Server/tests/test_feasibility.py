@@ -0,0 +1,111 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.loading_optimizer import feasibility
+from app.services.loading_optimizer.feasibility import (
+    batch_constraint_masks, batch_feasibility_mask, palettes_to_arrays
+)
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from tests.conftest import make_palette
+
+# Coordonnées sur une grille de 0.25 m et hauteurs exactes en binaire : aucune face
+# n'est en contact à 1e-6 près sans l'être exactement, les deux versions doivent coïncider
+GRID = 0.25
+HEIGHTS = (0.5, 1.0)
+
+
+def random_load(optimizer, rng, product, count):
+    loaded = []
+    for i in range(count):
+        palette = make_palette(100 + i, product=product, weight=rng.choice((200.0, 500.0, 800.0)),
+                               height=rng.choice(HEIGHTS))
+        position = Position3D(rng.randrange(40) * GRID, rng.randrange(7) * GRID, rng.randrange(3) * 0.5, 0)
+        loaded.append(optimizer._make_loaded_palette(palette, position))
+    return loaded
+
+
+@pytest.mark.parametrize('product', ['Industrial_Machinery', 'Pharmaceuticals'])
+@pytest.mark.parametrize('seed', range(4))
+def test_batch_mask_matches_the_scalar_checks(optimizer, truck, product, seed):
+    rng = random.Random(seed)
+    optimizer._initialize_loading_state(truck, LoadingOptions())
+    loaded = random_load(optimizer, rng, product, 25)
+    palette = make_palette(1, product=product, weight=500.0, height=rng.choice(HEIGHTS))
+    dims = optimizer._get_palette_dimensions(palette)
+    candidates = [(rng.randrange(56) * GRID, rng.randrange(10) * GRID, rng.randrange(6) * 0.5)
+                  for _ in range(400)]
+
+    batch = optimizer._batch_position_validity(candidates, dims, palette, palettes_to_arrays(loaded))
+    scalar = [optimizer._is_position_valid(c, dims, palette, loaded) for c in candidates]
+
+    assert batch.tolist() == scalar
+    assert 0 < batch.sum() < len(candidates)
+
+
+def test_rule_masks_combine_to_the_feasibility_mask():
+    rng = np.random.default_rng(0)
+    origins = np.column_stack([rng.integers(0, 40, 30) * GRID, rng.integers(0, 7, 30) * GRID,
+                               rng.integers(0, 3, 30) * 0.5])
+    sizes = np.tile([1.2, 0.8, 0.5], (30, 1))
+    weights = rng.choice([200.0, 500.0, 800.0], 30)
+    candidates = np.column_stack([rng.integers(0, 56, 500) * GRID, rng.integers(0, 10, 500) * GRID,
+                                  rng.integers(0, 6, 500) * 0.5])
+    arguments = (candidates, (1.2, 0.8, 0.5), 500.0, True, (13.6, 2.45, 2.7), origins, sizes, weights)
+
+    rules = batch_constraint_masks(*arguments)
+    combined = np.logical_and.reduce([mask for _, mask, _ in rules])
+
+    assert [name for name, _, _ in rules] == ['bounds', 'collision', 'weight_stack', 'fragility']
+    assert combined.tolist() == batch_feasibility_mask(*arguments).tolist()
+
+
+def test_rule_masks_are_computed_by_chunks(monkeypatch):
+    rng = np.random.default_rng(1)
+    origins = np.column_stack([rng.integers(0, 40, 30) * GRID, rng.integers(0, 7, 30) * GRID,
+                               rng.integers(0, 3, 30) * 0.5])
+    sizes = np.tile([1.2, 0.8, 0.5], (30, 1))
+    weights = rng.choice([200.0, 500.0, 800.0], 30)
+    candidates = np.column_stack([rng.integers(0, 56, 500) * GRID, rng.integers(0, 10, 500) * GRID,
+                                  rng.integers(0, 6, 500) * 0.5])
+    arguments = (candidates, (1.2, 0.8, 0.5), 500.0, True, (13.6, 2.45, 2.7), origins, sizes, weights)
+    whole = batch_constraint_masks(*arguments)
+
+    monkeypatch.setattr(feasibility, 'CHUNK_SIZE', 64)
+    chunked = batch_constraint_masks(*arguments)
+
+    assert [name for name, _, _ in chunked] == [name for name, _, _ in whole]
+    for (_, mask, elapsed), (_, expected, _) in zip(chunked, whole):
+        assert mask.tolist() == expected.tolist() and elapsed > 0
+    assert [name for name, _, _ in batch_constraint_masks(np.zeros((0, 3)), *arguments[1:])] == [
+        'bounds', 'collision', 'weight_stack', 'fragility']
+
+
+def test_empty_load_only_checks_the_bounds():
+    empty = np.zeros((0, 3))
+    mask = batch_feasibility_mask([(0, 0, 0), (13.0, 0, 0), (0, 2.0, 0)], (1.2, 0.8, 1.0), 500.0, False,
+                                  (13.6, 2.45, 2.7), empty, empty, np.zeros(0))
+    assert mask.tolist() == [True, False, False]
+
+
+@pytest.mark.parametrize('product', ['Industrial_Machinery', 'Pharmaceuticals'])
+@pytest.mark.parametrize('seed', range(4))
+def test_spatial_index_restricts_the_batch_mask_without_changing_it(optimizer, truck, product, seed):
+    rng = random.Random(seed)
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    for loaded_palette in random_load(optimizer, rng, product, 25):
+        state.add(loaded_palette)
+    palette = make_palette(1, product=product, weight=500.0, height=rng.choice(HEIGHTS))
+    dims = optimizer._get_palette_dimensions(palette)
+    # Candidats d'un voisinage (raffinement), puis de tout le camion
+    x = rng.randrange(40) * GRID
+    local = [(x + rng.randrange(8) * GRID, rng.randrange(10) * GRID, rng.randrange(6) * 0.5) for _ in range(100)]
+    spread = [(rng.randrange(56) * GRID, rng.randrange(10) * GRID, rng.randrange(6) * 0.5) for _ in range(400)]
+
+    for candidates in (local, spread):
+        full = optimizer._batch_position_validity(candidates, dims, palette, state.store.arrays())
+        indexed = optimizer._batch_position_validity(candidates, dims, palette, state.store.arrays(),
+                                                     spatial_index=state.spatial_index)
+        assert indexed.tolist() == full.tolist()
+    assert len(state.spatial_index.neighbour_ids(local, dims['length'], dims['width'])) < len(state)
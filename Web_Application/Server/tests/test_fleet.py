@@ -0,0 +1,96 @@
+import pytest
+
+from app.models import CamionType
+from app.services.loading_optimizer import optimizer as optimizer_module
+from app.services.loading_optimizer.fleet import REJECT_ORDER, TARGET_UTILIZATION, FleetMatrix
+from app.services.loading_optimizer.prefilter import check_truck_bounds, compute_load_bounds
+from tests.conftest import make_palette, make_truck, random_palettes
+
+PRODUCTS = ('Industrial_Machinery', 'FMCG_Food', 'Pharmaceuticals', 'CPG_Electronics', 'Recyclable_Plastic')
+
+
+def all_trucks():
+    trucks = [make_truck(i, truck_type, 100.0 + 50 * i) for i, truck_type in enumerate(CamionType, start=1)]
+    trucks[2].temperature = 5  # Consigne réglée sur un camion frigorifique
+    return trucks
+
+
+def reference_score(palettes, truck):
+    """Score d'adéquation calculé camion par camion, comme la boucle d'origine."""
+    specs = truck.specifications
+    volume, weight = sum(p.volume for p in palettes), sum(p.weight for p in palettes)
+    if volume > specs['volume'] or weight > specs['charge_utile']:
+        return None
+    volume_score = 1 - abs(TARGET_UTILIZATION - volume / specs['volume'])
+    weight_score = 1 - abs(TARGET_UTILIZATION - weight / specs['charge_utile'])
+    cost_score = 1 / (1 + truck.transport_cost / (specs['volume'] * specs['charge_utile']))
+    return 0.4 * volume_score + 0.4 * weight_score + 0.2 * cost_score
+
+
+def groups():
+    return [random_palettes(count, seed, heights=(0.6, 1.0, 1.4, 2.0), products=PRODUCTS[:1 + seed % 5])
+            for seed, count in enumerate((1, 3, 8, 14, 25, 40))]
+
+
+def test_reject_reasons_match_check_truck_bounds(optimizer):
+    trucks = all_trucks()
+    bounds = [compute_load_bounds(group, optimizer.product_constraints) for group in groups()]
+    reasons = FleetMatrix(trucks).reject_reasons(bounds)
+
+    assert reasons.shape == (len(bounds), len(trucks))
+    for g, group_bounds in enumerate(bounds):
+        for t, truck in enumerate(trucks):
+            expected = check_truck_bounds(group_bounds, truck)
+            assert (None if reasons[g, t] < 0 else REJECT_ORDER[reasons[g, t]]) == expected
+
+
+def test_fit_scores_match_the_per_truck_score():
+    trucks = [truck for truck in all_trucks() if truck.specifications['volume'] is not None]
+    fleet = FleetMatrix(trucks)
+    scores = fleet.fit_scores([sum(p.volume for p in g) for g in groups()], [sum(p.weight for p in g) for g in groups()])
+
+    for g, group in enumerate(groups()):
+        for t, truck in enumerate(trucks):
+            expected = reference_score(group, truck)
+            assert scores[g, t] == (-float('inf') if expected is None else pytest.approx(expected))
+
+
+def test_best_skips_disallowed_and_overloaded_trucks():
+    scores = [0.5, float('-inf'), 0.9, 0.9]
+    assert FleetMatrix.best(scores) == 2  # Premier en cas d'égalité
+    assert FleetMatrix.best(scores, allowed=[True, True, False, True]) == 3
+    assert FleetMatrix.best(scores, allowed=[False, True, False, False]) is None
+    assert FleetMatrix.best([]) is None
+
+
+def test_take_and_cost_ordering_keep_columns_aligned():
+    trucks = [make_truck(1, CamionType.SEMI_STANDARD, 1200.0), make_truck(2, CamionType.FOURGON, 300.0),
+              make_truck(3, CamionType.FOURGON, 300.0), make_truck(4, CamionType.PORTEUR_MOYEN, 700.0)]
+    fleet = FleetMatrix(trucks)
+
+    subset = fleet.take([3, 1])
+    assert [truck.id for truck in subset.trucks] == [4, 2]
+    assert list(subset.payload) == [trucks[3].specifications['charge_utile'], trucks[1].specifications['charge_utile']]
+
+    ordered = fleet.by_cost_efficiency()
+    ratios = [t.transport_cost / t.specifications['volume'] for t in ordered.trucks]
+    assert ratios == sorted(ratios)
+    assert [t.id for t in ordered.trucks if t.type_camion == CamionType.FOURGON] == [2, 3]  # Ordre stable
+    assert list(ordered.cost) == [t.transport_cost for t in ordered.trucks]
+
+
+def test_wrappers_reuse_the_given_fleet(optimizer, monkeypatch):
+    trucks = [make_truck(1, CamionType.FOURGONNETTE, 100.0), make_truck(2, CamionType.SEMI_FRIGO, 900.0),
+              make_truck(3, CamionType.SEMI_STANDARD, 800.0)]
+    palettes = [make_palette(i, weight=300.0, height=1.0) for i in range(6)]
+    fleet = FleetMatrix(trucks)
+
+    def no_rebuild(*args):
+        raise AssertionError('matrice de flotte reconstruite')
+
+    monkeypatch.setattr(optimizer_module, 'FleetMatrix', no_rebuild)
+    rejections = {}
+    suitable = optimizer._find_suitable_trucks(palettes, trucks, rejections, fleet=fleet)
+    assert [truck.id for truck in suitable] == [2, 3]
+    assert set(rejections) == {1}
+    assert optimizer._find_best_fitting_truck(palettes, suitable, fleet=fleet.take([1, 2])) in suitable
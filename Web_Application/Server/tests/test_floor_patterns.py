@@ -0,0 +1,69 @@
+from collections import Counter
+
+import pytest
+
+from app.models import Camion, CamionType, PaletteType
+from app.services.loading_optimizer.floor_patterns import PALETTE_FOOTPRINTS, floor_patterns, lookup_floor_pattern
+from app.services.loading_optimizer.models import LoadingOptions
+from tests.conftest import make_palette, plan_defects
+
+EPS = 1e-6
+
+
+@pytest.mark.parametrize('camion_type', list(CamionType))
+def test_every_pattern_fits_in_the_truck_without_overlap(camion_type):
+    dimensions = Camion(type_camion=camion_type).dimensions
+    for us, pattern in floor_patterns(camion_type).items():
+        boxes = []
+        for palette_type, x, y, rotation in pattern.slots:
+            length, width = PALETTE_FOOTPRINTS[palette_type]
+            if rotation == 90:
+                length, width = width, length
+            assert x >= -EPS and y >= -EPS
+            assert x + length <= dimensions['longueur'] + EPS and y + width <= dimensions['largeur'] + EPS
+            boxes.append((x, y, length, width))
+        for i, (x, y, length, width) in enumerate(boxes):
+            for ox, oy, o_length, o_width in boxes[i + 1:]:
+                assert (min(x + length, ox + o_length) - max(x, ox) <= EPS or
+                        min(y + width, oy + o_width) - max(y, oy) <= EPS)
+
+        # Au moins autant d'emplacements que de palettes annoncées, par type
+        slots = Counter(palette_type for palette_type, *_ in pattern.slots)
+        assert pattern.counts['american'] == us
+        assert all(slots[palette_type] >= count for palette_type, count in pattern.counts.items())
+
+
+@pytest.mark.parametrize('camion_type, euro, us', [
+    (CamionType.SEMI_STANDARD, 34, 26),
+    (CamionType.PORTEUR_GRAND, 20, 16),
+    (CamionType.FOURGON, 12, 10),
+])
+def test_pure_loads_reach_the_known_floor_optima(camion_type, euro, us):
+    patterns = floor_patterns(camion_type)
+    assert patterns[0].counts['european'] == euro
+    assert max(patterns) == us
+    assert lookup_floor_pattern(camion_type, {'european': euro, 'american': 0}) is not None
+    assert lookup_floor_pattern(camion_type, {'european': euro + 1, 'american': 0}) is None
+    assert lookup_floor_pattern(camion_type, {'european': 0, 'american': us + 1}) is None
+
+
+def test_patterns_are_built_on_first_lookup_only():
+    floor_patterns.cache_clear()
+    lookup_floor_pattern(CamionType.FOURGON, {'european': 3, 'american': 2})
+    lookup_floor_pattern(CamionType.FOURGON, {'european': 1, 'american': 0})
+    assert floor_patterns.cache_info().currsize == 1
+    assert floor_patterns.cache_info().misses == 1
+
+
+@pytest.mark.parametrize('euro, us', [(34, 0), (0, 26), (20, 8)])
+def test_floor_pattern_plan_is_valid(optimizer, truck, euro, us):
+    palettes = ([make_palette(i, weight=300.0 + i, height=1.2) for i in range(euro)] +
+                [make_palette(euro + i, PaletteType.AMERICAN, weight=300.0 + i, height=1.2) for i in range(us)])
+    options = LoadingOptions(use_floor_patterns=True)
+    assert optimizer._arrange_from_floor_pattern(palettes, truck, options) is not None
+
+    plan = optimizer._optimize_loading_arrangement(palettes, truck, options)
+
+    assert sorted(lp.palette_id for lp in plan.loaded_palettes) == sorted(p.id for p in palettes)
+    assert all(lp.position.z == 0 for lp in plan.loaded_palettes)
+    assert plan_defects(plan, truck, optimizer.product_constraints) == []
@@ -0,0 +1,62 @@
+from dataclasses import replace
+
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from tests.conftest import make_palette, plan_defects, random_palettes
+
+PRODUCTS = ('Industrial_Machinery', 'FMCG_Food', 'Recyclable_Plastic')
+
+
+def physical_defects(plan, truck, constraints):
+    # La règle de fragilité ne porte que sur la palette placée, pas sur celles posées ensuite
+    return [d for d in plan_defects(plan, truck, constraints) if 'fragile' not in d]
+
+
+def test_plan_validation_rejects_floating_and_heavier_on_lighter(optimizer, truck):
+    base = optimizer._make_loaded_palette(make_palette(1, weight=300, height=1.0), Position3D(0, 0, 0, 0))
+    on_top = optimizer._make_loaded_palette(make_palette(2, weight=200, height=1.0), Position3D(0, 0, 1.0, 0))
+    assert optimizer._is_plan_valid([base, on_top], truck)
+
+    assert not optimizer._is_plan_valid([base, replace(on_top, weight=400)], truck)
+    assert not optimizer._is_plan_valid([base, replace(on_top, position=Position3D(0, 0, 1.2, 0))], truck)
+    assert not optimizer._is_plan_valid([base, replace(on_top, position=Position3D(0.6, 0, 0.5, 0))], truck)
+    assert not optimizer._is_plan_valid([replace(base, position=Position3D(13.0, 0, 0, 0))], truck)
+
+
+def test_no_heavier_palette_is_left_resting_on_a_new_one(optimizer, truck):
+    # Palette lourde en porte-à-faux : une palette plus légère ne peut pas venir dessous
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    for palette, position in ((make_palette(1, weight=900, height=1.0), Position3D(0, 0, 0, 0)),
+                              (make_palette(2, weight=800, height=1.0), Position3D(0.6, 0, 1.0, 0))):
+        optimizer._place_palette(state, optimizer._make_loaded_palette(palette, position))
+    light = make_palette(3, weight=100, height=1.0)
+    dims = optimizer._get_palette_dimensions(light)
+
+    valid = optimizer._batch_position_validity([(1.2, 0, 0)], dims, light, state.store.arrays())
+    assert not valid[0]
+    assert not optimizer._is_position_valid((1.2, 0, 0), dims, light, state.store.to_loaded_palettes())
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_ruin_and_recreate_keeps_plans_valid(optimizer, truck, seed):
+    palettes = random_palettes(30, seed, heights=(0.6, 0.8, 1.0, 1.4), products=PRODUCTS)
+    options = LoadingOptions(seed=seed)
+    plan = optimizer._pack_palettes(optimizer._sort_palettes_for_loading(palettes), truck, options)
+    assert plan is not None and optimizer._is_plan_valid(plan.loaded_palettes, truck)
+
+    improved = optimizer._improve_plan(plan, palettes, truck, options, budget=1.0)
+
+    assert sorted(lp.palette_id for lp in improved.loaded_palettes) == sorted(p.id for p in palettes)
+    assert physical_defects(improved, truck, optimizer.product_constraints) == []
+    assert optimizer._plan_objective(improved, truck) >= optimizer._plan_objective(plan, truck)
+
+
+def test_empty_plan_is_returned_unchanged(optimizer, truck):
+    options = LoadingOptions(improvement_budget=0.1)
+    plan = optimizer._pack_palettes([], truck, options)
+    assert plan.loaded_palettes == []
+
+    assert optimizer._improve_plan(plan, [], truck, options, budget=0.1) is plan
+    assert optimizer._plan_objective(plan, truck) >= 0
+    assert optimizer._optimize_loading_arrangement([], truck, options).loaded_palettes == []
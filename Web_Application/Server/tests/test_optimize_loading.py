@@ -0,0 +1,76 @@
+from dataclasses import replace
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import CamionType
+from app.services.loading_optimizer import optimizer as optimizer_module
+from app.services.loading_optimizer.models import LoadingOptions
+from tests.conftest import make_palette, make_truck, plan_defects, random_palettes
+
+OPTIONS = LoadingOptions(use_floor_patterns=False)
+
+
+def route_commands(groups, per_group):
+    """Une commande par destination, les destinations étant trop éloignées pour partager un camion."""
+    commands = []
+    for g in range(groups):
+        palettes = [make_palette(100 * g + i, weight=300.0 + i, height=1.0, destination=f"D{g}")
+                    for i in range(per_group)]
+        commands.append(SimpleNamespace(destination=f"D{g}", delivery_date=datetime(2025, 1, 6),
+                                        palettes=palettes))
+    return commands
+
+
+@pytest.fixture(autouse=True)
+def distant_routes(monkeypatch):
+    monkeypatch.setattr(optimizer_module, 'get_route_distance', lambda origins, destinations: [500.0])
+
+
+def test_each_route_group_gets_its_own_truck(optimizer):
+    commands = route_commands(4, 20)
+    trucks = [make_truck(i, cost=1000.0 + i) for i in range(1, 8)]
+
+    plans = optimizer.optimize_loading(commands, trucks, OPTIONS)
+
+    assert len(plans) == 4
+    for truck_id, plan in plans.items():
+        truck = next(t for t in trucks if t.id == truck_id)
+        assert len({lp.destination for lp in plan.loaded_palettes}) == 1
+        assert plan_defects(plan, truck, optimizer.product_constraints) == []
+    placed = sorted(lp.palette_id for plan in plans.values() for lp in plan.loaded_palettes)
+    assert placed == sorted(p.id for command in commands for p in command.palettes)
+    assert optimizer.unassigned_palettes == []
+
+
+def test_palettes_beyond_the_fleet_are_reported(optimizer):
+    commands = route_commands(4, 20)
+    trucks = [make_truck(1), make_truck(2, CamionType.FOURGON, cost=400.0)]
+
+    plans = optimizer.optimize_loading(commands, trucks, OPTIONS)
+
+    placed = [lp.palette_id for plan in plans.values() for lp in plan.loaded_palettes]
+    unassigned = [p.id for p in optimizer.unassigned_palettes]
+    assert len(placed) == len(set(placed))
+    assert sorted(placed + unassigned) == sorted(p.id for command in commands for p in command.palettes)
+    assert len(plans) <= 2 and unassigned
+
+
+def test_parallel_and_serial_arrangements_are_identical(optimizer, capsys):
+    arrangements = [
+        (random_palettes(count, seed), make_truck(seed + 1, truck_type))
+        for seed, (count, truck_type) in enumerate(((25, CamionType.SEMI_STANDARD), (12, CamionType.PORTEUR_GRAND),
+                                                    (5, CamionType.FOURGON)))
+    ]
+
+    serial = optimizer._arrange_trucks(arrangements, replace(OPTIONS, truck_workers=1))
+    parallel = optimizer._arrange_trucks(arrangements, replace(OPTIONS, truck_workers=3))
+
+    # Arrangés dans le pool, sans repli en série
+    assert "exécution en série" not in capsys.readouterr().out
+    assert len(serial) == len(parallel) == len(arrangements)
+    for serial_plan, parallel_plan, (_, truck) in zip(serial, parallel, arrangements):
+        assert serial_plan is not None and parallel_plan is not None
+        assert parallel_plan.truck_id == serial_plan.truck_id == truck.id
+        assert parallel_plan.loaded_palettes == serial_plan.loaded_palettes
@@ -0,0 +1,77 @@
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions
+from app.services.loading_optimizer.parallel import map_in_processes, resolve_workers
+from tests.conftest import make_palette, random_palettes
+
+CALLS = []
+
+# Introuvable par son nom dans le module : pickle lève PicklingError
+increment = lambda value: value + 10
+
+
+def square(value):
+    CALLS.append(value)
+    return value * value
+
+
+def fail(value):
+    CALLS.append(value)
+    raise TypeError(f"valeur refusée: {value}")
+
+
+def test_resolve_workers_is_bounded_by_tasks():
+    assert resolve_workers(8, 3) == 3
+    assert resolve_workers(1, 3) == 1
+    assert resolve_workers(4, 0) == 1
+
+
+def test_results_keep_the_task_order():
+    CALLS.clear()
+    assert map_in_processes(square, [(i,) for i in range(6)], 2) == [0, 1, 4, 9, 16, 25]
+    # Exécutées dans les processus du pool, pas dans celui-ci
+    assert CALLS == []
+
+
+def test_unpicklable_function_falls_back_to_serial(capsys):
+    assert map_in_processes(increment, [(1,), (2,)], 2) == [11, 12]
+    assert "exécution en série de 2 tâches" in capsys.readouterr().out
+
+
+def test_error_raised_by_the_function_is_not_rerun_serially(capsys):
+    CALLS.clear()
+    with pytest.raises(TypeError, match="valeur refusée"):
+        map_in_processes(fail, [(1,), (2,)], 2)
+    assert CALLS == []
+    assert "exécution en série" not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_multi_start_is_at_least_as_good_as_a_single_start(optimizer, truck, seed):
+    palettes = optimizer._sort_palettes_for_loading(random_palettes(40, seed))
+    single = optimizer._pack_palettes(palettes, truck, LoadingOptions(starts=1))
+
+    best = optimizer._multi_start_arrangement(palettes, truck, LoadingOptions(starts=4, max_workers=2, seed=seed))
+
+    assert best is not None
+    assert len(best.loaded_palettes) >= len(single.loaded_palettes)
+    assert optimizer._plan_objective(best, truck) >= optimizer._plan_objective(single, truck) - 1e-9
+
+
+def test_palette_orderings_are_distinct_and_reproducible(optimizer):
+    palettes = optimizer._sort_palettes_for_loading(random_palettes(12, 0))
+
+    orderings = optimizer._palette_orderings(palettes, 8, seed=3)
+
+    ids = [tuple(p.id for p in ordering) for ordering in orderings]
+    assert len(ids) == 8 and len(set(ids)) == 8
+    assert ids[0] == tuple(p.id for p in palettes)
+    assert all(sorted(ordering) == sorted(ids[0]) for ordering in ids)
+    assert [tuple(p.id for p in o) for o in optimizer._palette_orderings(palettes, 8, seed=3)] == ids
+    assert [tuple(p.id for p in o) for o in optimizer._palette_orderings(palettes, 8, seed=4)] != ids
+
+
+def test_orderings_of_identical_palettes_are_merged(optimizer):
+    palettes = [make_palette(i) for i in range(6)]
+    assert len(optimizer._palette_orderings(palettes, 5, merge_identical=True)) == 1
+    assert len(optimizer._palette_orderings(palettes, 5)) == 5
@@ -0,0 +1,84 @@
+from dataclasses import replace
+
+import pytest
+
+from app.models import CamionType
+from app.services.loading_optimizer.models import LoadingOptions
+from app.services.loading_optimizer.optimizer import TruckLoadingOptimizer
+from app.services.loading_optimizer.plan_cache import PlanCache, canonical_signature
+from app.services.loading_optimizer.registry import DEFAULT_PRODUCTS_PATH
+from tests.conftest import make_palette, make_truck, random_palettes
+
+
+@pytest.fixture
+def cache(tmp_path):
+    plan_cache = PlanCache(str(tmp_path / 'plans.db'), max_entries=3)
+    yield plan_cache
+    plan_cache.close()
+
+
+def test_round_trip_stats_and_eviction(cache):
+    assert cache.get('a') is None
+    cache.put('a', [(0.0, 0.0, 0.0, 0), (1.2, 0.0, 0.0, 90)])
+    assert cache.get('a') == [(0.0, 0.0, 0.0, 0), (1.2, 0.0, 0.0, 90)]
+
+    for key in 'bcd':
+        cache.put(key, [])
+    assert cache.get('a') is None  # Le moins récemment utilisé est évincé
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'evictions': 1, 'entries': 3, 'hit_rate': 1 / 3}
+
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+    with pytest.raises(ValueError):
+        PlanCache(cache.path, max_entries=0)
+
+
+def test_signature_ignores_order_and_destination_names(truck):
+    palettes = random_palettes(10, seed=1)
+    key, canonical = canonical_signature(palettes, truck, LoadingOptions(), 'digest')
+    renamed = [replace(p, command=replace(p.command, destination=p.command.destination + '-bis'))
+               for p in reversed(palettes)]
+    assert canonical_signature(renamed, truck, LoadingOptions(), 'digest')[0] == key
+    assert sorted(p.id for p in canonical) == sorted(p.id for p in palettes)
+
+    # Changement de contraintes, d'options de placement ou de camion : nouvelle clé
+    assert canonical_signature(palettes, truck, LoadingOptions(), 'other')[0] != key
+    assert canonical_signature(palettes, truck, LoadingOptions(space_mode='heightmap'), 'digest')[0] != key
+    assert canonical_signature(palettes, make_truck(2, CamionType.SEMI_FRIGO), LoadingOptions(), 'digest')[0] != key
+    # Options sans effet sur le plan : même clé
+    assert canonical_signature(palettes, truck, LoadingOptions(max_workers=4), 'digest')[0] == key
+
+
+def test_hit_on_a_fresh_or_reused_optimizer_scores_like_the_original(cache, truck):
+    options = LoadingOptions(use_floor_patterns=False)
+    palettes = random_palettes(12, seed=2)
+    original = TruckLoadingOptimizer(None, DEFAULT_PRODUCTS_PATH, cache)
+    plan = original._optimize_loading_arrangement(palettes, truck, options)
+    assert cache.stats()['entries'] == 1
+
+    fresh = TruckLoadingOptimizer(None, DEFAULT_PRODUCTS_PATH, cache)
+    reused = TruckLoadingOptimizer(None, DEFAULT_PRODUCTS_PATH, cache)
+    reused._optimize_loading_arrangement(palettes[:3], make_truck(2, CamionType.PORTEUR_MOYEN), options)
+    for optimizer in (fresh, reused):
+        hits = cache.hits
+        cached = optimizer._optimize_loading_arrangement(palettes, truck, options)
+        assert cache.hits == hits + 1
+        assert cached.weight_distribution_score == pytest.approx(plan.weight_distribution_score)
+        assert cached.space_utilization == pytest.approx(plan.space_utilization)
+        assert sorted(lp.palette_id for lp in cached.loaded_palettes) == sorted(p.id for p in palettes)
+
+
+def test_hit_stacking_heavier_on_lighter_is_a_miss(cache, truck):
+    optimizer = TruckLoadingOptimizer(None, DEFAULT_PRODUCTS_PATH, cache)
+    options = LoadingOptions()
+    # Même tranche de poids (400-449 kg) : la clé ne distingue pas les deux charges
+    low, high = make_palette(1, weight=445, height=1.0), make_palette(2, weight=405, height=0.6)
+    key, canonical = canonical_signature([low, high], truck, options, optimizer.constraints_digest)
+    stacked = [(0.0, 0.0, 0.0, 0) if p is low else (0.0, 0.0, 1.0, 0) for p in canonical]
+    cache.put(key, stacked)
+    assert optimizer._cached_arrangement([low, high], truck, options)[2] is not None
+
+    light_low, heavy_high = replace(low, weight=405), replace(high, weight=445)
+    key2, canonical2 = canonical_signature([light_low, heavy_high], truck, options, optimizer.constraints_digest)
+    assert key2 == key
+    assert optimizer._cached_arrangement([light_low, heavy_high], truck, options)[2] is None
@@ -0,0 +1,55 @@
+import pytest
+
+from app.models import CamionType
+from app.services.loading_optimizer.models import TruckRejectReason
+from app.services.loading_optimizer.prefilter import check_truck_bounds, compute_load_bounds
+from tests.conftest import make_palette, make_truck
+
+
+def palettes(count, product='Industrial_Machinery', weight=100.0, height=1.4, start=0):
+    return [make_palette(start + i, product=product, weight=weight, height=height) for i in range(count)]
+
+
+# (palettes, type de camion, consigne du camion, motif attendu)
+SCENARIOS = {
+    'ok': (palettes(20), CamionType.SEMI_STANDARD, None, None),
+    'refrigeration': (palettes(2, 'Pharmaceuticals'), CamionType.SEMI_STANDARD, None,
+                      TruckRejectReason.REFRIGERATION),
+    'range': (palettes(2, 'Luxury_Goods'), CamionType.SEMI_FRIGO, None, TruckRejectReason.TEMPERATURE),
+    'setpoint': (palettes(2, 'FMCG_Food'), CamionType.SEMI_FRIGO, 5, TruckRejectReason.TEMPERATURE),
+    'weight': (palettes(3, weight=500.0), CamionType.FOURGONNETTE, None, TruckRejectReason.WEIGHT),
+    'volume': (palettes(3, weight=200.0), CamionType.FOURGONNETTE, None, TruckRejectReason.VOLUME),
+    'oversize': (palettes(1, height=2.0), CamionType.FOURGONNETTE, None, TruckRejectReason.OVERSIZE),
+    'capacity': (palettes(13), CamionType.FOURGON, None, TruckRejectReason.PALETTE_CAPACITY),
+    'fragile': (palettes(13, 'CPG_Electronics', height=0.6), CamionType.FOURGON_FRIGO, None,
+                TruckRejectReason.FLOOR_AREA),
+    'tall': (palettes(13) + palettes(1, height=0.6, start=13), CamionType.FOURGON, None,
+             TruckRejectReason.FLOOR_AREA),
+    'no_capacity': (palettes(1), CamionType.BENNE, None, TruckRejectReason.PALETTE_CAPACITY),
+}
+
+
+def scenario_truck(truck_type, setpoint):
+    truck = make_truck(1, truck_type)
+    truck.temperature = setpoint
+    return truck
+
+
+@pytest.mark.parametrize('name', SCENARIOS)
+def test_first_failing_bound_is_reported(optimizer, name):
+    group, truck_type, setpoint, expected = SCENARIOS[name]
+    bounds = compute_load_bounds(group, optimizer.product_constraints)
+    assert check_truck_bounds(bounds, scenario_truck(truck_type, setpoint)) == expected
+
+
+def test_load_bounds_aggregate_the_group(optimizer):
+    group = palettes(2, 'FMCG_Food', height=1.0) + palettes(1, 'Pharmaceuticals', height=0.6, start=2)
+    bounds = compute_load_bounds(group, optimizer.product_constraints)
+
+    assert bounds.total_weight == 300.0
+    assert bounds.counts == {'european': 3}
+    assert bounds.min_height == 0.6
+    assert bounds.fragile_counts == {'european': 1}
+    assert bounds.needs_refrigeration
+    assert bounds.temperature_range == (2, 8)
+    assert bounds.min_temperature == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions
+from tests.conftest import random_palettes
+
+PRODUCTS = ('Industrial_Machinery', 'Pharmaceuticals', 'FMCG_Food')
+CHECKS = ('compatibility', 'bounds', 'collision', 'weight_stack', 'fragility', 'support',
+          'candidate_generation', 'scoring', 'stability', 'bound_pruning')
+
+
+@pytest.mark.parametrize('space_mode', ['voxel', 'heightmap'])
+@pytest.mark.parametrize('candidate_mode', ['extreme_points', 'grid'])
+def test_profiled_pack_reports_every_instrumented_check(optimizer, truck, space_mode, candidate_mode):
+    palettes = random_palettes(20, 0, products=PRODUCTS)
+    options = LoadingOptions(space_mode=space_mode, candidate_mode=candidate_mode, resolutions=(0.4, 0.1),
+                             use_floor_patterns=False, profile_constraints=True)
+
+    plan = optimizer._optimize_loading_arrangement(palettes, truck, options)
+
+    stats = plan.constraint_stats
+    assert set(CHECKS) <= set(stats)
+    for name in CHECKS:
+        assert stats[name]['calls'] > 0
+        assert 0 <= stats[name]['rejects'] <= stats[name]['checked']
+        assert stats[name]['ns'] >= 0
+    # Une vérification de compatibilité par palette placée
+    assert stats['compatibility']['calls'] == len(palettes)
+    assert sum(stats[name]['ns'] for name in CHECKS) > 0
+    assert list(stats) == sorted(stats, key=lambda name: -stats[name]['ns'])
+
+
+def test_no_stats_without_the_flag(optimizer, truck):
+    palettes = random_palettes(20, 0, products=PRODUCTS)
+    plan = optimizer._optimize_loading_arrangement(palettes, truck, LoadingOptions(use_floor_patterns=False))
+    assert plan is not None and plan.constraint_stats is None
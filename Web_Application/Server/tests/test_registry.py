@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from app.services.loading_optimizer.registry import ProductConstraintRegistry, get_constraint_registry
+
+
+def write_config(path, product_types, mtime_ns):
+    path.write_text(json.dumps({'product_types': product_types}))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / 'products.json'
+    write_config(path, [{'type': 'Food', 'fragility': False}], 1_000_000_000)
+    return path
+
+
+def test_file_is_parsed_once_while_its_mtime_is_unchanged(config):
+    registry = ProductConstraintRegistry(str(config))
+    constraints, compatibility = registry.constraints, registry.compatibility
+
+    # Contenu modifié mais date identique : pas de nouvelle lecture
+    write_config(config, [{'type': 'Food', 'fragility': True}], 1_000_000_000)
+    assert registry.constraints is constraints
+    assert registry.compatibility is compatibility
+    assert not registry.get('Food').fragility
+
+
+def test_mtime_change_reloads_constraints_table_and_digest(config):
+    registry = ProductConstraintRegistry(str(config))
+    digest, compatibility = registry.digest, registry.compatibility
+
+    write_config(config, [{'type': 'Food', 'fragility': True}, {'type': 'Glass', 'incompatible_types': ['Food']}],
+                 2_000_000_000)
+
+    assert registry.get('Food').fragility
+    assert registry.compatibility is not compatibility
+    assert not registry.compatibility.can_group('Food', 'Glass')
+    assert registry.digest != digest
+    assert registry.get('Unknown') is None
+
+
+def test_one_shared_registry_per_path(config):
+    assert get_constraint_registry(str(config)) is get_constraint_registry(str(config.parent / '.' / config.name))
+
+
+def test_snapshot_keeps_constraints_table_and_digest_of_one_version(config):
+    registry = ProductConstraintRegistry(str(config))
+    before = registry.snapshot()
+
+    write_config(config, [{'type': 'Food'}, {'type': 'Glass', 'incompatible_types': ['Food']}], 2_000_000_000)
+    after = registry.snapshot()
+
+    # L'instantané déjà pris n'est pas modifié par le rechargement
+    assert set(before.constraints) == {'Food'}
+    assert before.digest != after.digest
+    assert set(after.constraints) == {'Food', 'Glass'}
+    assert not after.compatibility.can_group('Food', 'Glass')
+    assert after.digest == hashlib.sha1(config.read_bytes()).hexdigest()
+    assert registry.snapshot() is after
@@ -0,0 +1,44 @@
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('plotly')
+
+ROUTE_OPTIM = (Path(__file__).resolve().parents[3] / "Our Innovative Optimized Algorithms"
+               / "Optimisation d'itinéraire" / "route_optim.py")
+TRUCK = (10, 3, 3)
+
+
+@pytest.fixture(scope='module')
+def route_optim():
+    spec = importlib.util.spec_from_file_location('route_optim', ROUTE_OPTIM)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_orders(route_optim, seed, count=12):
+    rng = random.Random(seed)
+    return [
+        route_optim.Commande(i, f"Client_{i}", "alimentaire", rng.uniform(50, 300), rng.choice((0.8, 1.0, 1.2)),
+                             rng.choice((0.6, 0.8)), rng.choice((0.4, 0.5, 0.6)), i, (48.85, 2.35))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('common', [0, 1, 5, 11, 12])
+def test_repack_gives_the_positions_of_a_full_pack(route_optim, seed, common):
+    orders = make_orders(route_optim, seed)
+    route_optim.pack_orders(orders, *TRUCK)
+    # Nouvel itinéraire : les `common` premières commandes inchangées, la suite mélangée
+    tail = orders[common:]
+    random.Random(seed).shuffle(tail)
+    new_route = orders[:common] + tail
+
+    repacked = [cmd.pos for cmd in route_optim.repack_orders(orders, new_route, *TRUCK)]
+    full = [cmd.pos for cmd in route_optim.pack_orders(new_route, *TRUCK)]
+
+    assert repacked == full
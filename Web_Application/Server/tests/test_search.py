@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from tests.conftest import make_palette, plan_defects, random_palettes
+
+PRODUCTS = ('Industrial_Machinery', 'FMCG_Food', 'Recyclable_Plastic')
+
+
+def search_steps(optimizer, truck, options, seed, count=30):
+    """(palette, dimensions, positions valides, état) à chaque étape d'un chargement glouton."""
+    palettes = optimizer._sort_palettes_for_loading(
+        random_palettes(count, seed, heights=(0.6, 0.8, 1.0, 1.4), products=PRODUCTS))
+    state = optimizer._initialize_loading_state(truck, options)
+    for palette in palettes:
+        dims = optimizer._get_palette_dimensions(palette)
+        positions = state.extreme_points
+        valid = optimizer._batch_position_validity(positions, dims, palette, state.store.arrays(), state.truck_space)
+        valid &= optimizer._supported_mask(positions, dims, state)
+        yield palette, dims, [positions[i] for i in np.flatnonzero(valid)], state
+        position = optimizer._find_optimal_position(palette, state, truck, options=options)
+        if position is None:
+            return
+        optimizer._place_palette(state, optimizer._make_loaded_palette(palette, position))
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('keep', [1, 4])
+def test_bound_pruning_keeps_the_best_scores_of_a_full_scan(optimizer, truck, seed, keep):
+    options = LoadingOptions(symmetry_breaking=False)
+    for palette, dims, positions, state in search_steps(optimizer, truck, options, seed):
+        if not positions:
+            continue
+        full = [optimizer._evaluate_position(pos, dims, palette, state, truck) for pos in positions]
+        pruned = optimizer._score_positions(positions, dims, palette, state, truck, keep)
+
+        exact = dict((i, score) for score, i in pruned)
+        for i, score in exact.items():
+            assert score == pytest.approx(full[i])
+        assert sorted(exact.values(), reverse=True)[:keep] == pytest.approx(sorted(full, reverse=True)[:keep])
+        # Même position retenue qu'un parcours complet (la première en cas d'égalité)
+        assert max(pruned, key=lambda item: (item[0], -item[1]))[1] == int(np.argmax(full))
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_indexed_batch_stability_matches_the_full_scan(optimizer, truck, seed):
+    for palette, dims, positions, state in search_steps(optimizer, truck, LoadingOptions(), seed):
+        for start in range(0, len(positions), 4):
+            batch = positions[start:start + 4]
+            indexed = optimizer._batch_stability(batch, dims, state.store, state.spatial_index)
+            assert indexed.tolist() == pytest.approx(optimizer._batch_stability(batch, dims, state.store).tolist())
+
+
+@pytest.mark.parametrize('pairs', [0, 1, 3])
+def test_mirror_symmetry_breaking_keeps_the_best_score(optimizer, truck, pairs):
+    # Chargement symétrique : paires de palettes identiques de part et d'autre de l'axe du camion
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    width = optimizer.truck_dimensions['width']
+    for i in range(pairs):
+        for y in (0.0, width - 0.8):
+            palette = make_palette(10 + len(state), weight=600.0, height=1.0)
+            optimizer._place_palette(state, optimizer._make_loaded_palette(palette, Position3D(1.2 * i, y, 0, 0)))
+    assert state.is_width_symmetric()
+
+    palette = make_palette(1, weight=500.0, height=1.0)
+    dims = optimizer._get_palette_dimensions(palette)
+    grid = [(x * 0.4, y, z) for x in range(31) for y in (0.0, 0.4, 0.825, 1.25, width - 0.8) for z in (0.0, 1.0)]
+    valid = optimizer._batch_position_validity(grid, dims, palette, state.store.arrays(), state.truck_space)
+    valid &= optimizer._supported_mask(grid, dims, state)
+    positions = [grid[i] for i in np.flatnonzero(valid)]
+
+    kept = optimizer._break_symmetries(positions, dims, palette, state)
+    assert set(kept) < set(positions)
+    scores = {pos: optimizer._evaluate_position(pos, dims, palette, state, truck) for pos in positions}
+    assert max(scores[pos] for pos in kept) == pytest.approx(max(scores.values()))
+    # Chaque position écartée a un miroir gardé au moins aussi bon
+    for x, y, z in set(positions) - set(kept):
+        mirror = next(pos for pos in kept if pos[0] == x and pos[2] == z and abs(pos[1] - (width - 0.8 - y)) < 1e-6)
+        assert scores[mirror] >= scores[(x, y, z)] - 1e-9
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_symmetry_breaking_gives_the_same_plan(optimizer, truck, seed):
+    palettes = optimizer._sort_palettes_for_loading(random_palettes(30, seed, products=PRODUCTS))
+    plans = [
+        optimizer._pack_palettes(palettes, truck, LoadingOptions(symmetry_breaking=flag))
+        for flag in (False, True)
+    ]
+    assert optimizer._plan_objective(plans[1], truck) == pytest.approx(optimizer._plan_objective(plans[0], truck))
+
+
+@pytest.mark.parametrize('resolutions, cell', [((0.1,), 0.1), ((0.4, 0.1), 0.1), ((0.2,), 0.1),
+                                               ((0.25,), 0.05), ((0.5, 0.25), 0.05), ((0.15,), 0.05)])
+def test_space_cell_divides_every_grid_step(optimizer, resolutions, cell):
+    assert optimizer._space_resolution(resolutions) == pytest.approx(cell)
+
+
+def test_grid_steps_without_a_common_cell_are_rejected(optimizer, truck):
+    with pytest.raises(ValueError):
+        optimizer._initialize_loading_state(truck, LoadingOptions(candidate_mode='grid', resolutions=(0.4, 0.07)))
+
+
+@pytest.mark.parametrize('space_mode', ['voxel', 'heightmap'])
+@pytest.mark.parametrize('resolutions', [(0.25,), (0.5, 0.25), (0.15,)])
+@pytest.mark.parametrize('seed', range(2))
+def test_grid_steps_off_the_10_cm_cell_give_valid_plans(optimizer, truck, space_mode, resolutions, seed):
+    palettes = optimizer._sort_palettes_for_loading(random_palettes(16, seed))
+    options = LoadingOptions(candidate_mode='grid', resolutions=resolutions, space_mode=space_mode)
+
+    plan = optimizer._pack_palettes(palettes, truck, options)
+
+    assert plan is not None
+    assert plan_defects(plan, truck, optimizer.product_constraints) == []
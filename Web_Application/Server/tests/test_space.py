@@ -0,0 +1,117 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from app.services.loading_optimizer.space import HeightMap, TruckSpace
+from tests.conftest import make_palette
+
+BOX = {'length': 1.2, 'width': 0.8, 'height': 1.0}
+
+
+def filled_truck_space(seed):
+    rng = random.Random(seed)
+    space = TruckSpace(6.0, 2.4, 2.6)
+    for _ in range(8):
+        space.occupy((rng.randrange(50) / 10, rng.randrange(17) / 10, rng.randrange(3) / 2), BOX)
+    return space, rng
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_summed_area_table_matches_the_grid(seed):
+    space, rng = filled_truck_space(seed)
+    assert np.array_equal(space.prefix[1:, 1:, 1:], space.grid.cumsum(0).cumsum(1).cumsum(2))
+
+    for _ in range(200):
+        x0, y0, z0 = rng.randrange(60), rng.randrange(24), rng.randrange(26)
+        x1, y1, z1 = rng.randrange(x0, 61), rng.randrange(y0, 25), rng.randrange(z0, 27)
+        assert space.occupied_count(x0, x1, y0, y1, z0, z1) == int(space.grid[x0:x1, y0:y1, z0:z1].sum())
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_free_mask_matches_box_queries(seed):
+    space, rng = filled_truck_space(seed)
+    positions = [(rng.randrange(50) / 10, rng.randrange(17) / 10, rng.randrange(17) / 10) for _ in range(300)]
+
+    free = space.free_mask(positions, (1.2, 0.8, 1.0))
+
+    assert free.tolist() == [space.is_box_free(position, BOX) for position in positions]
+    for position, is_free in zip(positions, free):
+        x0, x1, y0, y1, z0, z1 = space._box_cells(position, BOX)
+        assert is_free == (not space.grid[x0:x1, y0:y1, z0:z1].any())
+
+
+def test_truck_space_support_reads_the_layer_below():
+    space = TruckSpace(6.0, 2.4, 2.6)
+    space.occupy((0, 0, 0), BOX)
+    positions = [(0, 0, 0), (0.6, 0, 1.0), (1.2, 0, 1.0), (0, 0, 1.4)]
+    assert space.supported_mask(positions, (1.2, 0.8, 1.0)).tolist() == [True, True, False, False]
+
+
+def test_heightmap_box_is_free_above_the_surface_only():
+    space = HeightMap(4.0, 2.4, 2.6)
+    space.occupy((0, 0, 0), BOX, weight=400)
+
+    assert not space.is_box_free((0.6, 0, 0), BOX)
+    assert space.is_box_free((0.6, 0, 1.0), BOX)
+    assert space.is_box_free((1.2, 0, 0), BOX)
+    positions = [(0.6, 0, 0), (0.6, 0, 1.0), (1.2, 0, 0)]
+    assert space.free_mask(positions, (1.2, 0.8, 1.0)).tolist() == [False, True, True]
+
+
+def test_heightmap_support_and_stacking_masks():
+    space = HeightMap(4.0, 2.4, 2.6)
+    space.occupy((0, 0, 0), BOX, weight=400)
+    size = (1.2, 0.8, 1.0)
+
+    positions = [(0, 0, 1.0), (0, 0, 1.4), (1.2, 0, 0), (1.2, 0, 1.0)]
+    assert space.supported_mask(positions, size).tolist() == [True, False, True, False]
+    assert space.stacking_mask([(0, 0, 1.0)], size, weight=300).tolist() == [True]
+    assert space.stacking_mask([(0, 0, 1.0)], size, weight=500).tolist() == [False]
+
+
+@pytest.mark.parametrize('position', [(0.0, 0.0, 1.0), (0.6, 0.0, 1.0), (0.6, 0.4, 1.0), (0.0, 0.0, 0.0)])
+def test_stability_is_the_same_in_both_space_modes(optimizer, truck, position):
+    scores = []
+    for space_mode in ('voxel', 'heightmap'):
+        state = optimizer._initialize_loading_state(truck, LoadingOptions(space_mode=space_mode))
+        for i, x in enumerate((0.0, 1.2)):
+            palette = make_palette(i, weight=900, height=1.0)
+            optimizer._place_palette(state, optimizer._make_loaded_palette(palette, Position3D(x, 0, 0, 0)))
+        dims = optimizer._get_palette_dimensions(make_palette(9))
+        single = optimizer._evaluate_stability(position, dims, state.store, state.spatial_index)
+        batch = optimizer._batch_stability([position], dims, state.store)
+        assert single == pytest.approx(float(batch[0]))
+        scores.append(single)
+
+    assert scores[0] == pytest.approx(scores[1])
+    if position[2] == 0:
+        assert scores[0] == 1.0
+    elif position[1] == 0.4:
+        # Moitié de l'empreinte en porte-à-faux : 0.5 x 0.5 + 0.3 x 1 + 0.2 x 2/4
+        assert scores[0] == pytest.approx(0.65)
+    else:
+        assert scores[0] == pytest.approx(1.0)
+
+
+def test_compare_space_models_reports_both_models(optimizer, truck):
+    palettes = [make_palette(i, weight=900 - 100 * i, height=1.0) for i in range(4)]
+
+    report = optimizer.compare_space_models(palettes, truck)
+
+    assert set(report) == {'voxel', 'heightmap', 'savings'}
+    for space_mode in ('voxel', 'heightmap'):
+        assert set(report[space_mode]) == {'memory_bytes', 'seconds', 'space_utilization'}
+    assert report['voxel']['space_utilization'] == pytest.approx(report['heightmap']['space_utilization'])
+    assert report['savings']['memory_bytes'] == report['voxel']['memory_bytes'] - report['heightmap']['memory_bytes']
+    assert report['savings']['memory_bytes'] > 0
+
+    # Sans porte-à-faux ni fragilité, les deux modèles placent les palettes au même endroit
+    placements = []
+    for space_mode in ('voxel', 'heightmap'):
+        plan = optimizer._optimize_loading_arrangement(palettes, truck, LoadingOptions(space_mode=space_mode))
+        placements.append({lp.palette_id: (lp.position.x, lp.position.y, lp.position.z, lp.position.rotation)
+                           for lp in plan.loaded_palettes})
+    assert placements[0] == placements[1]
+    assert set(placements[0]) == {p.id for p in palettes}
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from app.services.loading_optimizer.state import REAR_AXLE_RATIO
+from tests.conftest import random_palettes
+
+
+def recomputed_totals(loaded_palettes, truck_length):
+    """Totaux recalculés en parcourant toutes les palettes."""
+    weight = sum(lp.weight for lp in loaded_palettes)
+    rear = sum(lp.weight * (lp.position.x + lp.dimensions['length'] / 2) for lp in loaded_palettes)
+    rear /= REAR_AXLE_RATIO * truck_length
+    return {
+        'weight': weight,
+        'center_of_gravity': (sum(lp.weight * lp.position.x for lp in loaded_palettes) / weight,
+                              sum(lp.weight * lp.position.y for lp in loaded_palettes) / weight),
+        'axle_loads': (weight - rear, rear),
+        'volume': sum(lp.dimensions['length'] * lp.dimensions['width'] * lp.dimensions['height']
+                      for lp in loaded_palettes),
+    }
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_running_totals_match_a_full_recompute(optimizer, truck, seed):
+    rng = random.Random(seed)
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    for palette in random_palettes(20, seed, products=('Industrial_Machinery', 'FMCG_Food', 'Pharmaceuticals')):
+        position = Position3D(rng.randrange(120) / 10, rng.randrange(16) / 10, 0.0, rng.choice((0, 90)))
+        state.add(optimizer._make_loaded_palette(palette, position))
+        if rng.random() < 0.4:
+            removed = state.remove(rng.choice(state.store.palette_ids))
+            assert removed.palette_id not in state.store.palette_ids
+
+        loaded = state.loaded_palettes
+        if not loaded:
+            assert state.total_weight == pytest.approx(0.0, abs=1e-6)
+            continue
+        expected = recomputed_totals(loaded, truck.specifications['longueur'])
+        assert state.total_weight == pytest.approx(expected['weight'])
+        assert state.center_of_gravity() == pytest.approx(expected['center_of_gravity'])
+        assert state.axle_loads() == pytest.approx(expected['axle_loads'])
+        assert state.used_volume == pytest.approx(expected['volume'])
+        assert sum(state.axle_loads()) == pytest.approx(state.total_weight)
+        assert state.incompatible_mask == optimizer.compatibility.combined_mask(lp.product_type for lp in loaded)
+        for destination, positions in state.destination_positions.items():
+            assert positions == sorted(lp.position.x for lp in loaded if lp.destination == destination)
+
+
+def test_removing_the_mirror_palette_breaks_the_symmetry(optimizer, truck):
+    state = optimizer._initialize_loading_state(truck, LoadingOptions())
+    palette, mirror = random_palettes(1, 0)[0], random_palettes(1, 0)[0]
+    mirror.id = 1
+    width = state.truck_dimensions['width']
+    state.add(optimizer._make_loaded_palette(palette, Position3D(0, 0, 0, 0)))
+    state.add(optimizer._make_loaded_palette(mirror, Position3D(0, width - palette.width, 0, 0)))
+    assert state.is_width_symmetric()
+
+    state.remove(1)
+    assert not state.is_width_symmetric()
+    state.remove(0)
+    assert state.is_width_symmetric()
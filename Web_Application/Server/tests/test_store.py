@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.loading_optimizer.models import LoadedPalette, Position3D
+from app.services.loading_optimizer.store import LoadedPaletteStore
+
+
+def loaded_palette(palette_id, rng):
+    rotation = rng.choice((0, 90))
+    length, width = (0.8, 1.2) if rotation == 90 else (1.2, 0.8)
+    return LoadedPalette(
+        palette_id=palette_id,
+        position=Position3D(x=rng.randrange(120) / 10, y=rng.randrange(16) / 10, z=rng.randrange(3) / 2,
+                            rotation=rotation),
+        weight=float(rng.randrange(100, 900)),
+        dimensions={'length': length, 'width': width, 'height': rng.choice((0.8, 1.0, 1.4))},
+        product_type=rng.choice(('FMCG_Food', 'Industrial_Machinery')),
+        destination=f"D{rng.randrange(3)}",
+        is_rotated=rotation == 90
+    )
+
+
+def assert_in_sync(store, expected):
+    """Colonnes et objets reconstruits identiques aux palettes attendues, dans l'ordre."""
+    assert len(store) == len(expected)
+    assert store.to_loaded_palettes() == expected
+    origins, sizes, weights = store.arrays()
+    assert origins.tolist() == [[lp.position.x, lp.position.y, lp.position.z] for lp in expected]
+    assert sizes.tolist() == [[lp.dimensions['length'], lp.dimensions['width'], lp.dimensions['height']]
+                              for lp in expected]
+    assert weights.tolist() == [lp.weight for lp in expected]
+    assert store.palette_ids == [lp.palette_id for lp in expected]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_columns_stay_in_sync_with_appends_and_removals(seed):
+    rng = random.Random(seed)
+    # Petite capacité : les colonnes sont agrandies en cours de route
+    store, expected = LoadedPaletteStore(capacity=2), []
+    for palette_id in range(40):
+        palette = loaded_palette(palette_id, rng)
+        assert store.append(palette) == len(expected)
+        expected.append(palette)
+        if rng.random() < 0.3:
+            i = rng.randrange(len(expected))
+            assert store.index(expected[i].palette_id) == i
+            assert store.remove(i) == expected.pop(i)
+        assert_in_sync(store, expected)
+
+    while expected:
+        assert store.remove(0) == expected.pop(0)
+        assert_in_sync(store, expected)
+
+
+def test_array_views_share_the_store_memory():
+    store = LoadedPaletteStore()
+    store.append(loaded_palette(1, random.Random(0)))
+    origins, _, weights = store.arrays()
+    assert np.shares_memory(origins, store.origins) and np.shares_memory(weights, store.weights)
+
+
+def test_placement_records_use_slots():
+    position = Position3D(x=0.0, y=0.0, z=0.0, rotation=0)
+    palette = loaded_palette(1, random.Random(0))
+    for record in (position, palette):
+        assert not hasattr(record, '__dict__')
+        with pytest.raises(AttributeError):
+            record.unknown_field = 1
+    palette.weight = 250.0
+    assert palette.weight == 250.0
@@ -0,0 +1,93 @@
+import pytest
+
+from app.services.loading_optimizer.models import LoadingOptions, Position3D
+from tests.conftest import make_palette, plan_defects, random_palettes
+
+OPTIONS = LoadingOptions(use_floor_patterns=False)
+
+
+def positions(plan):
+    return {lp.palette_id: (lp.position.x, lp.position.y, lp.position.z, lp.position.rotation)
+            for lp in plan.loaded_palettes}
+
+
+def stacked_plan(optimizer, truck):
+    """Palette 2 à cheval sur 1 et 4, palette 3 posée sur 2, palette 5 isolée."""
+    layout = [
+        (make_palette(1, weight=900, height=0.8), Position3D(0, 0, 0, 0)),
+        (make_palette(4, weight=900, height=0.8), Position3D(1.2, 0, 0, 0)),
+        (make_palette(2, weight=700, height=0.8), Position3D(0.6, 0, 0.8, 0)),
+        (make_palette(3, weight=500, height=0.8), Position3D(0.6, 0, 1.6, 0)),
+        (make_palette(5, weight=400, height=0.8), Position3D(0, 1.6, 0, 0)),
+    ]
+    palettes = [palette for palette, _ in layout]
+    placements = [(p.x, p.y, p.z, p.rotation) for _, p in layout]
+    return palettes, optimizer._plan_from_placements(palettes, placements, truck, OPTIONS)
+
+
+def test_removing_a_bottom_palette_lifts_its_stack_transitively(optimizer, truck):
+    _, plan = stacked_plan(optimizer, truck)
+    assert plan_defects(plan, truck, optimizer.product_constraints) == []
+
+    assert optimizer._unsupported_palettes(plan.loaded_palettes, {1}) == {2, 3}
+    assert optimizer._unsupported_palettes(plan.loaded_palettes, {4}) == {2, 3}
+    assert optimizer._unsupported_palettes(plan.loaded_palettes, {2}) == {3}
+    assert optimizer._unsupported_palettes(plan.loaded_palettes, {5}) == set()
+
+
+def test_removal_replaces_only_the_lifted_palettes(optimizer, truck):
+    palettes, plan = stacked_plan(optimizer, truck)
+    before = positions(plan)
+
+    repaired = optimizer.update_loading_plan(plan, truck, palettes, removed_ids=[1], options=OPTIONS)
+
+    after = positions(repaired)
+    assert set(after) == {2, 3, 4, 5}
+    assert after[4] == before[4] and after[5] == before[5]
+    assert plan_defects(repaired, truck, optimizer.product_constraints) == []
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_added_palettes_fill_the_freed_space(optimizer, truck, seed):
+    palettes = random_palettes(30, seed)
+    plan = optimizer._pack_palettes(optimizer._sort_palettes_for_loading(palettes), truck, OPTIONS)
+    removed = [lp.palette_id for lp in plan.loaded_palettes[::5]]
+    added = random_palettes(8, seed + 100)
+    for i, palette in enumerate(added):
+        palette.id = 1000 + i
+
+    repaired = optimizer.update_loading_plan(plan, truck, palettes, removed, added, OPTIONS)
+
+    lifted = optimizer._unsupported_palettes(plan.loaded_palettes, set(removed))
+    expected = {p.id for p in palettes} - set(removed) | {p.id for p in added}
+    assert set(positions(repaired)) == expected
+    before, after = positions(plan), positions(repaired)
+    assert all(after[i] == before[i] for i in before if i not in removed and i not in lifted)
+    assert plan_defects(repaired, truck, optimizer.product_constraints) == []
+
+
+def test_failed_repair_rebuilds_the_whole_load(optimizer, truck):
+    # 10 rangées de 3 palettes espacées de 10 cm : ni les interstices ni les 70 cm
+    # restant au fond ne reçoivent une palette, et rien ne s'empile (2 m de haut)
+    palettes = [make_palette(i, weight=500, height=2.0) for i in range(30)]
+    placements = [(1.3 * (i // 3), 0.8 * (i % 3), 0.0, 0) for i in range(30)]
+    plan = optimizer._plan_from_placements(palettes, placements, truck, OPTIONS)
+    added = [make_palette(100 + i, weight=500, height=2.0) for i in range(3)]
+    state = optimizer._initialize_loading_state(truck, OPTIONS)
+    for loaded_palette in plan.loaded_palettes:
+        optimizer._place_palette(state, loaded_palette)
+    assert optimizer._find_optimal_position(added[0], state, truck, options=OPTIONS) is None
+
+    repaired = optimizer.update_loading_plan(plan, truck, palettes, added_palettes=added, options=OPTIONS)
+
+    assert repaired is not None
+    assert set(positions(repaired)) == {p.id for p in palettes + added}
+    # Reconstruction : les palettes déjà chargées ont été déplacées
+    assert any(positions(repaired)[p.id] != positions(plan)[p.id] for p in palettes)
+    assert plan_defects(repaired, truck, optimizer.product_constraints) == []
+
+
+def test_unknown_removed_palette_is_rejected(optimizer, truck):
+    palettes, plan = stacked_plan(optimizer, truck)
+    with pytest.raises(ValueError):
+        optimizer.update_loading_plan(plan, truck, palettes, removed_ids=[42], options=OPTIONS)